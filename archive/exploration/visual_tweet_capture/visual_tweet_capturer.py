@@ -23,9 +23,23 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import base64
+import copy
+import io
 import json
+import random
+import re
+import shutil
+import struct
+import subprocess
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
+from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -36,32 +50,259 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
+import numpy as np
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json
+    orjson = None
+
+try:
+    import cv2
+except ImportError:  # fall back to Pillow paste for combining
+    cv2 = None
+
+try:
+    import pyvips
+except (ImportError, OSError):  # fall back to OpenCV or Pillow for combining; OSError means libvips is missing
+    pyvips = None
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv()
 
+# Keep webdriver-manager's driver cache next to the project and silence its logging
+os.environ.setdefault('WDM_LOCAL', '1')
+os.environ.setdefault('WDM_LOG_LEVEL', '0')
+
 # Add lambdas to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas'))
 
 from shared.tweet_services import TweetFetcher
 
+# Matches https://twitter.com/<user>/status/<id> and the x.com equivalent
+_TWEET_URL_RE = re.compile(r'(?:twitter|x)\.com/([^/]+)/status/(\d+)')
+
+# 19-digit tweet ID anywhere in a path or URL
+_TWEET_ID_RE = re.compile(r'(\d{19})')
+
+# Browser setup errors that might resolve with retry
+_TRANSIENT_BROWSER_ERRORS = [
+    'timeout', 'connection', 'network', 'temporary', 'busy',
+    'resource temporarily unavailable', 'address already in use',
+    'chromedriver', 'webdriver', 'session not created'
+]
+_TRANSIENT_RE = re.compile("|".join(map(re.escape, _TRANSIENT_BROWSER_ERRORS)))
+
+# Browser setup errors that won't resolve with retry
+_PERMANENT_BROWSER_ERRORS = [
+    'chrome not found', 'executable not found', 'no such file',
+    'permission denied', 'access denied', 'not installed',
+    'unsupported chrome version'
+]
+_PERMANENT_RE = re.compile("|".join(map(re.escape, _PERMANENT_BROWSER_ERRORS)))
+
+# WebDriver errors meaning the browser itself is gone and must be recreated
+_DRIVER_DEAD_RE = re.compile(r'crashed|disconnected')
+
+# Retry delay ceiling (seconds) and attempt limit for uncategorized setup errors
+_MAX_RETRY_DELAY = 30.0
+_MAX_UNKNOWN_ERROR_ATTEMPTS = 2
+
+# Reads scroll offset, viewport height and page height in a single WebDriver round trip
+_SCROLL_STATE_JS = "return [window.pageYOffset, window.innerHeight, document.body.scrollHeight]"
+
+# Scrolls by arguments[0] and returns [offset before, offset after, page height, article count]
+# in one round trip
+_SCROLL_AND_MEASURE_JS = (
+    "var before = window.pageYOffset; window.scrollBy(0, arguments[0]); "
+    "return [before, window.pageYOffset, document.body.scrollHeight, "
+    "document.getElementsByTagName('article').length];"
+)
+
+# Page height and rendered article count, polled while waiting for a scroll to load content
+_CONTENT_STATE_JS = "return [document.body.scrollHeight, document.getElementsByTagName('article').length]"
+
+# Media requests blocked when block_media is set (tweet photos, video and previews)
+_BLOCKED_MEDIA_URLS = ["*.jpg", "*.jpeg", "*.mp4", "*.webp", "*video*"]
+
+# Seconds allowed for oxipng to recompress a combined PNG before the original is kept
+_POST_OPTIMIZE_TIMEOUT = 60
+
+# Tallest page (px) captured in one CDP screenshot; longer pages use the scroll loop
+_MAX_FULL_PAGE_HEIGHT = 8000
+
+# Set to force the scroll loop for pages that only lazy-load on real scroll events
+_SCROLL_ONLY_ENV = "VISUAL_CAPTURE_SCROLL_ONLY"
+
+# Pillow encoder name for each supported screenshot output format
+_OUTPUT_FORMATS = {'png': 'PNG', 'webp': 'WEBP'}
+
+# Histogram entropy (bits) above which a combined image is treated as photo-heavy and
+# left in RGB; text-only tweet pages sit well below this
+_PHOTO_ENTROPY_BITS = 5.0
+
+# Side of the difference-hash grid; 16x16 gives 256 bits, enough to register a
+# change inside the narrow content column of a wide page
+_DHASH_SIZE = 16
+
+
+@lru_cache(maxsize=2)  # a frame is hashed when checked and again when stored
+def _dhash(png_bytes: bytes, crop: Optional[Tuple[float, float, float, float]] = None) -> int:
+    """
+    Difference hash of a PNG, used to spot visually identical screenshots.
+    
+    Args:
+        crop: (left, top, right, bottom) fractions of the image to hash, so static
+            sidebars outside the kept region don't dominate the hash
+    """
+    img = Image.open(io.BytesIO(png_bytes))
+    if crop is not None:
+        width, height = img.size
+        img = img.crop((int(width * crop[0]), int(height * crop[1]), int(width * crop[2]), int(height * crop[3])))
+    px = np.asarray(img.convert("L").resize((_DHASH_SIZE + 1, _DHASH_SIZE)))
+    return int.from_bytes(np.packbits(px[:, :-1] > px[:, 1:]).tobytes(), 'big')
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Bytes per pixel for 8-bit non-palette PNG colour types (grey, RGB, grey+alpha, RGBA)
+_PNG_BYTES_PER_PIXEL = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+def _read_png_chunks(path: str) -> List[tuple]:
+    """Return a PNG file's chunks as (type, data) pairs."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if not raw.startswith(_PNG_SIGNATURE):
+        raise ValueError(f"Not a PNG file: {path}")
+    
+    chunks = []
+    pos = len(_PNG_SIGNATURE)
+    while pos < len(raw):
+        length, chunk_type = struct.unpack('>I4s', raw[pos:pos + 8])
+        chunks.append((chunk_type, raw[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+
+def _write_png_chunk(f, chunk_type: bytes, data: bytes):
+    f.write(struct.pack('>I', len(data)) + chunk_type + data)
+    f.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+
+def _stitch_pngs(paths: List[str], out_path: str, compress_level: int) -> bool:
+    """
+    Stack same-format PNGs vertically by joining their filtered scanlines, without decoding pixels.
+    
+    Only the first scanline of each image needs touching: its filter was applied
+    against an implicit all-zero previous row, so Up/Paeth/Average filters are
+    rewritten to equivalents that don't depend on the row above.
+    
+    Returns:
+        bool: False if the inputs can't be stitched (different widths, formats,
+        interlacing or bit depth); nothing is written in that case
+    """
+    sources = [_read_png_chunks(path) for path in paths]
+    headers = [struct.unpack('>IIBBBBB', chunks[0][1]) for chunks in sources]
+    width, _, bit_depth, color_type, _, _, interlace = headers[0]
+    
+    if bit_depth != 8 or color_type not in _PNG_BYTES_PER_PIXEL or interlace != 0:
+        return False
+    if any((h[0], h[2], h[3], h[6]) != (width, bit_depth, color_type, interlace) for h in headers):
+        return False
+    
+    bpp = _PNG_BYTES_PER_PIXEL[color_type]
+    row_length = 1 + width * bpp
+    total_height = sum(h[1] for h in headers)
+    
+    compressor = zlib.compressobj(compress_level)
+    idat = []
+    for chunks in sources:
+        scanlines = bytearray(zlib.decompress(b''.join(data for chunk_type, data in chunks if chunk_type == b'IDAT')))
+        
+        filter_type = scanlines[0]
+        if filter_type == 2:    # Up with a zero row above is None
+            scanlines[0] = 0
+        elif filter_type == 4:  # Paeth with a zero row above is Sub
+            scanlines[0] = 1
+        elif filter_type == 3:  # Average with a zero row above: reconstruct, store as None
+            for i in range(1 + bpp, row_length):
+                scanlines[i] = (scanlines[i] + (scanlines[i - bpp] >> 1)) & 0xff
+            scanlines[0] = 0
+        
+        idat.append(compressor.compress(bytes(scanlines)))
+    idat.append(compressor.flush())
+    
+    ihdr = struct.pack('>IIBBBBB', width, total_height, bit_depth, color_type, 0, 0, 0)
+    with open(out_path, 'wb') as f:
+        f.write(_PNG_SIGNATURE)
+        _write_png_chunk(f, b'IHDR', ihdr)
+        # Keep colour-space chunks (sRGB, gAMA, pHYs, ...) from the first image
+        for chunk_type, data in sources[0]:
+            if chunk_type == b'IDAT':
+                break
+            if chunk_type != b'IHDR':
+                _write_png_chunk(f, chunk_type, data)
+        _write_png_chunk(f, b'IDAT', b''.join(idat))
+        _write_png_chunk(f, b'IEND', b'')
+    return True
+
+
 class VisualTweetCapturer:
     """Visual tweet capturer using browser automation and screenshots."""
     
+    # Chromedriver path resolved once per process and shared by all instances
+    _chromedriver_path_cache: Optional[str] = None
+    
+    # One Chrome shared by capturers created with share_browser=True; each gets its own tab
+    _shared_driver = None
+    _shared_driver_lock = threading.Lock()
+    
     def __init__(self, headless=True, crop_enabled=False, crop_x1=0, crop_y1=0, crop_x2=100, crop_y2=100, 
-                 max_browser_retries=3, retry_delay=2.0, retry_backoff=2.0):
+                 max_browser_retries=3, retry_delay=2.0, retry_backoff=2.0, debug=False,
+                 persist_individual=True, combine_enabled=False, block_media=False,
+                 output_format="png", png_compress_level=1, post_optimize_png=False,
+                 disable_images=False, verbose=True, combine_mode="RGB", share_browser=False,
+                 api_cache_dir=None, palette_quantize=False):
+        # Progress output; a no-op when quiet so long headless runs skip stdout formatting and locking
+        self._log = print if verbose else (lambda *args, **kwargs: None)
         self.api_fetcher = TweetFetcher()
+        self._api_cache = {}  # Tweet ID -> API metadata fetched during this session
+        self.api_cache_dir = Path(api_cache_dir).expanduser() if api_cache_dir else None  # Cross-run JSON cache, e.g. ~/.cache/visual_tweet_capturer
         self.headless = headless
+        self.debug = debug  # Pretty-print metadata JSON when True
+        self.disable_images = disable_images  # Skip image downloads for layout-only captures
+        self.block_media = block_media  # Block photo/video requests via CDP for text-only captures
+        self.persist_individual = persist_individual  # Write each screenshot PNG, not just the combined image
+        self.combine_enabled = combine_enabled  # Also write a combined image alongside individual files
+        if combine_mode not in ('RGB', 'L'):
+            raise ValueError(f"Unsupported combine mode: {combine_mode}. Must be 'RGB' or 'L'")
+        self.combine_mode = combine_mode  # 'L' writes an 8-bit grayscale combined image for text/OCR use
+        if output_format not in _OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}. Must be one of {list(_OUTPUT_FORMATS)}")
+        self.output_format = output_format  # File format for saved screenshots and combined images
+        self.png_compress_level = png_compress_level  # zlib level 0-9; 1 favours speed, 6-9 smaller files
+        self.post_optimize_png = post_optimize_png  # Recompress combined PNGs with oxipng
+        self.palette_quantize = palette_quantize  # Save text-only combined PNGs as 256-colour palette images
         self.driver = None
+        self._owns_driver = True  # False while a shared browser spans several captures
+        self.share_browser = share_browser  # Open a tab in the class-wide browser instead of launching Chrome
+        self._tab_handle = None  # This capturer's tab while attached to the shared browser
         self.screenshots = []
+        self._images = []  # Cropped screenshots kept in memory when not persisting individual files
+        self.screenshot_meta = []  # (path, width, height) of each stored screenshot, recorded at capture time
+        self._last_dhash = None  # Hash of the last screenshot stored, for duplicate detection
+        self._cdp_screenshots = True  # Cleared once Chrome rejects a CDP screenshot
         
         # Browser retry configuration
         self.max_browser_retries = max_browser_retries
         self.retry_delay = retry_delay  # Initial delay in seconds
         self.retry_backoff = retry_backoff  # Backoff multiplier
+        self.error_counts = {'transient': 0, 'permanent': 0, 'unknown': 0}
+        self.zoom_percent = 100  # Zoom of the current browser, reused when recreating it
         
         # Cropping parameters
         self.crop_enabled = crop_enabled
@@ -69,6 +310,8 @@ class VisualTweetCapturer:
         self.crop_y1 = crop_y1  # Top boundary as percentage (0-100) 
         self.crop_x2 = crop_x2  # Right boundary as percentage (0-100)
         self.crop_y2 = crop_y2  # Bottom boundary as percentage (0-100)
+        self._crop_box = None  # Pixel crop box, cached per screenshot size
+        self._crop_box_size = None
         
         # Validate crop parameters
         if self.crop_enabled:
@@ -76,7 +319,8 @@ class VisualTweetCapturer:
         
         # Create base output directory
         self.base_output_dir = "visual_captures"
-        os.makedirs(self.base_output_dir, exist_ok=True)
+        self._ensured_dirs = set()  # Directories already created by this capturer
+        self._ensure_dir(Path(self.base_output_dir))
         
         # Current conversation output directory (will be set per conversation)
         self.output_dir = self.base_output_dir
@@ -88,7 +332,21 @@ class VisualTweetCapturer:
         if not (0 <= self.crop_y1 < self.crop_y2 <= 100):
             raise ValueError(f"Invalid crop Y coordinates: y1={self.crop_y1}, y2={self.crop_y2}. Must be 0 <= y1 < y2 <= 100")
         
-        print(f"✂️ Cropping enabled: ({self.crop_x1}%, {self.crop_y1}%) to ({self.crop_x2}%, {self.crop_y2}%)")
+        self._log(f"✂️ Cropping enabled: ({self.crop_x1}%, {self.crop_y1}%) to ({self.crop_x2}%, {self.crop_y2}%)")
+    
+    def _get_crop_box(self, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """
+        Pixel crop box for a screenshot size, computed once per distinct size.
+        
+        Screenshots within a capture share the viewport size, so this is
+        normally computed once per capture.
+        """
+        if self._crop_box_size != size:
+            width, height = size
+            self._crop_box = (int(width * self.crop_x1 / 100), int(height * self.crop_y1 / 100),
+                              int(width * self.crop_x2 / 100), int(height * self.crop_y2 / 100))
+            self._crop_box_size = size
+        return self._crop_box
     
     def crop_image(self, image_path: str, output_path: str = None) -> str:
         """
@@ -106,38 +364,90 @@ class VisualTweetCapturer:
         
         try:
             with Image.open(image_path) as img:
-                width, height = img.size
+                crop_box = self._get_crop_box(img.size)
                 
-                # Calculate pixel coordinates from percentages
-                left = int(width * self.crop_x1 / 100)
-                top = int(height * self.crop_y1 / 100)
-                right = int(width * self.crop_x2 / 100)
-                bottom = int(height * self.crop_y2 / 100)
+                # Full-image crop box - nothing to do
+                if crop_box == (0, 0) + img.size:
+                    return image_path
                 
                 # Crop the image
-                cropped_img = img.crop((left, top, right, bottom))
+                cropped_img = img.crop(crop_box)
                 
                 # Save the cropped image
                 crop_output_path = output_path or image_path
-                cropped_img.save(crop_output_path, 'PNG', optimize=True)
+                cropped_img.save(crop_output_path, 'PNG', compress_level=self.png_compress_level)
                 
                 return crop_output_path
                 
         except Exception as e:
-            print(f"⚠️ Error cropping image {image_path}: {e}")
+            self._log(f"⚠️ Error cropping image {image_path}: {e}")
             return image_path  # Return original path if cropping fails
     
+    @classmethod
+    def _get_chromedriver_path(cls) -> str:
+        """
+        Resolve the chromedriver path, hitting webdriver-manager only on first use.
+        
+        A preinstalled driver named by CHROME_DRIVER (set in the Fargate image) skips
+        webdriver-manager entirely.
+        """
+        if cls._chromedriver_path_cache is None:
+            cls._chromedriver_path_cache = os.environ.get('CHROME_DRIVER') or ChromeDriverManager().install()
+        return cls._chromedriver_path_cache
+    
+    @classmethod
+    def shared_browser(cls, headless=True):
+        """
+        Return the process-wide browser, launching Chrome on first use.
+        
+        Capturers attached to it must run one at a time: they share a single
+        WebDriver session and only switch between their own tabs.
+        
+        Returns:
+            WebDriver: The shared driver, or None if Chrome could not be started
+        """
+        with cls._shared_driver_lock:
+            if cls._shared_driver is not None:
+                try:
+                    cls._shared_driver.window_handles  # Cheap liveness check
+                except Exception:
+                    cls._shared_driver = None
+            if cls._shared_driver is None:
+                launcher = cls(headless=headless, verbose=False)
+                if launcher.setup_browser_with_fallback():
+                    cls._shared_driver = launcher.driver
+            return cls._shared_driver
+    
+    @classmethod
+    def close_shared_browser(cls):
+        """Quit the process-wide browser, if one was launched."""
+        with cls._shared_driver_lock:
+            if cls._shared_driver is not None:
+                try:
+                    cls._shared_driver.quit()
+                finally:
+                    cls._shared_driver = None
+    
     def _cleanup_failed_driver(self):
         """Clean up any existing driver instance that may have failed during setup."""
+        if self._tab_handle is not None:
+            # Never quit the shared browser from one of its tabs; just detach
+            self.driver = None
+            self._tab_handle = None
+            return
         if self.driver:
             try:
                 self.driver.quit()
-                print("   🧹 Cleaned up failed browser instance")
+                self._log("   🧹 Cleaned up failed browser instance")
             except Exception as e:
-                print(f"   ⚠️ Error during browser cleanup: {e}")
+                self._log(f"   ⚠️ Error during browser cleanup: {e}")
             finally:
                 self.driver = None
     
+    def _jittered_delay(self, delay: float) -> float:
+        """Cap a retry delay and spread it randomly to avoid synchronized retries."""
+        return min(_MAX_RETRY_DELAY, delay) * random.uniform(0.5, 1.5)
+    
     def _categorize_browser_error(self, error: Exception) -> str:
         """
         Categorize browser setup errors to determine retry strategy.
@@ -150,33 +460,19 @@ class VisualTweetCapturer:
         """
         error_str = str(error).lower()
         
-        # Transient errors that might resolve with retry
-        transient_indicators = [
-            'timeout', 'connection', 'network', 'temporary', 'busy',
-            'resource temporarily unavailable', 'address already in use',
-            'chromedriver', 'webdriver', 'session not created'
-        ]
+        if _TRANSIENT_RE.search(error_str):
+            return 'transient'
         
-        # Permanent errors that won't resolve with retry
-        permanent_indicators = [
-            'chrome not found', 'executable not found', 'no such file',
-            'permission denied', 'access denied', 'not installed',
-            'unsupported chrome version'
-        ]
-        
-        for indicator in transient_indicators:
-            if indicator in error_str:
-                return 'transient'
-        
-        for indicator in permanent_indicators:
-            if indicator in error_str:
-                return 'permanent'
+        if _PERMANENT_RE.search(error_str):
+            return 'permanent'
         
         return 'unknown'  # Default to retry for unknown errors
     
     def setup_browser(self, zoom_percent=100):
         """Set up Chrome browser with optimal settings and retry mechanism."""
-        print("🔧 Setting up browser...")
+        self._log("🔧 Setting up browser...")
+        self.zoom_percent = zoom_percent
+        unknown_failures = 0
         
         for attempt in range(1, self.max_browser_retries + 1):
             try:
@@ -184,7 +480,7 @@ class VisualTweetCapturer:
                 self._cleanup_failed_driver()
                 
                 if attempt > 1:
-                    print(f"   🔄 Retry attempt {attempt}/{self.max_browser_retries}")
+                    self._log(f"   🔄 Retry attempt {attempt}/{self.max_browser_retries}")
                 
                 chrome_options = Options()
                 
@@ -196,6 +492,7 @@ class VisualTweetCapturer:
                 chrome_options.add_argument("--disable-dev-shm-usage")
                 chrome_options.add_argument("--disable-gpu")
                 chrome_options.add_argument("--window-size=1920,1080")  # Standard size
+                chrome_options.add_argument("--force-device-scale-factor=1")  # Never capture at retina 2x pixel counts
                 chrome_options.add_argument("--disable-extensions")
                 chrome_options.add_argument("--disable-plugins")
                 chrome_options.add_argument("--disable-web-security")  # May help with some setup issues
@@ -204,56 +501,81 @@ class VisualTweetCapturer:
                 # Set user agent to avoid detection
                 chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
                 
+                # Block video autoplay (a common source of long waits on Twitter) and optionally images
+                chrome_options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2 if self.disable_images else 1,
+                    "profile.default_content_setting_values.media_stream": 2,
+                    "profile.default_content_setting_values.autoplay": 2,
+                    "profile.default_content_setting_values.notifications": 2
+                })
+                chrome_options.add_argument("--autoplay-policy=document-user-activation-required")
+                if self.disable_images:
+                    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+                    # Layout-only captures wait for their own elements, not for every subresource
+                    chrome_options.page_load_strategy = 'eager'
+                
                 # Use webdriver-manager to automatically handle chromedriver
-                print(f"   📥 Installing/updating ChromeDriver...")
-                service = Service(ChromeDriverManager().install())
+                self._log(f"   📥 Installing/updating ChromeDriver...")
+                service = Service(self._get_chromedriver_path())
                 
-                print(f"   🚀 Starting Chrome browser...")
+                self._log(f"   🚀 Starting Chrome browser...")
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
                 
+                if self.block_media:
+                    self.driver.execute_cdp_cmd("Network.enable", {})
+                    self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_MEDIA_URLS})
+                
                 # Test that the browser is working by navigating to a simple page
-                print(f"   🧪 Testing browser functionality...")
+                self._log(f"   🧪 Testing browser functionality...")
                 self.driver.get("data:text/html,<html><body><h1>Browser Test</h1></body></html>")
                 
                 # Set page zoom level if different from 100%
                 if zoom_percent != 100:
                     zoom_level = zoom_percent / 100.0
                     self.driver.execute_script(f"document.body.style.zoom='{zoom_level}'")
-                    print(f"✅ Chrome browser initialized with {zoom_percent}% page zoom (attempt {attempt})")
+                    self._log(f"✅ Chrome browser initialized with {zoom_percent}% page zoom (attempt {attempt})")
                 else:
-                    print(f"✅ Chrome browser initialized at standard size (attempt {attempt})")
+                    self._log(f"✅ Chrome browser initialized at standard size (attempt {attempt})")
                 
                 return True
                 
             except Exception as e:
                 error_category = self._categorize_browser_error(e)
-                print(f"   ❌ Browser setup failed (attempt {attempt}): {e}")
-                print(f"   🔍 Error category: {error_category}")
+                self.error_counts[error_category] += 1
+                self._log(f"   ❌ Browser setup failed (attempt {attempt}): {e}")
+                self._log(f"   🔍 Error category: {error_category}")
                 
                 # Clean up failed driver
                 self._cleanup_failed_driver()
                 
                 # Don't retry for permanent errors
                 if error_category == 'permanent':
-                    print(f"   🚫 Permanent error detected - not retrying")
+                    self._log(f"   🚫 Permanent error detected - not retrying")
                     break
                 
+                # Unrecognized errors get fewer attempts than known-transient ones
+                if error_category == 'unknown':
+                    unknown_failures += 1
+                    if unknown_failures >= _MAX_UNKNOWN_ERROR_ATTEMPTS:
+                        self._log(f"   🚫 Repeated unrecognized errors - not retrying")
+                        break
+                
                 # If this isn't the last attempt, wait before retrying
                 if attempt < self.max_browser_retries:
-                    delay = self.retry_delay * (self.retry_backoff ** (attempt - 1))
-                    print(f"   ⏱️ Waiting {delay:.1f} seconds before retry...")
+                    delay = self._jittered_delay(self.retry_delay * (self.retry_backoff ** (attempt - 1)))
+                    self._log(f"   ⏱️ Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 else:
-                    print(f"   🚫 Max retry attempts ({self.max_browser_retries}) reached")
+                    self._log(f"   🚫 Max retry attempts ({self.max_browser_retries}) reached")
         
         # All attempts failed
-        print("❌ Browser setup failed after all retry attempts")
-        print("💡 Troubleshooting suggestions:")
-        print("   • Ensure Chrome is installed: brew install --cask google-chrome")
-        print("   • Check Chrome version compatibility")
-        print("   • Try running without headless mode for debugging")
-        print("   • Check system resources (memory, CPU)")
-        print("   • Restart your system if issues persist")
+        self._log("❌ Browser setup failed after all retry attempts")
+        self._log("💡 Troubleshooting suggestions:")
+        self._log("   • Ensure Chrome is installed: brew install --cask google-chrome")
+        self._log("   • Check Chrome version compatibility")
+        self._log("   • Try running without headless mode for debugging")
+        self._log("   • Check system resources (memory, CPU)")
+        self._log("   • Restart your system if issues persist")
         
         return False
     
@@ -271,23 +593,23 @@ class VisualTweetCapturer:
         if self.setup_browser(zoom_percent):
             return True
         
-        print("🔄 Trying fallback browser configurations...")
+        self._log("🔄 Trying fallback browser configurations...")
         
         # Fallback 1: Try without headless mode (if currently headless)
         if self.headless:
-            print("   📱 Fallback 1: Trying non-headless mode...")
+            self._log("   📱 Fallback 1: Trying non-headless mode...")
             original_headless = self.headless
             self.headless = False
             
             if self.setup_browser(zoom_percent):
-                print("   ✅ Non-headless mode successful")
+                self._log("   ✅ Non-headless mode successful")
                 return True
             
             # Restore original headless setting
             self.headless = original_headless
         
         # Fallback 2: Try with minimal Chrome options
-        print("   ⚙️ Fallback 2: Trying minimal Chrome configuration...")
+        self._log("   ⚙️ Fallback 2: Trying minimal Chrome configuration...")
         try:
             self._cleanup_failed_driver()
             
@@ -297,22 +619,57 @@ class VisualTweetCapturer:
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
             
-            service = Service(ChromeDriverManager().install())
+            service = Service(self._get_chromedriver_path())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             
             # Test basic functionality
             self.driver.get("data:text/html,<html><body><h1>Minimal Test</h1></body></html>")
             
-            print("   ✅ Minimal configuration successful")
+            self._log("   ✅ Minimal configuration successful")
             return True
             
         except Exception as e:
-            print(f"   ❌ Minimal configuration failed: {e}")
+            self._log(f"   ❌ Minimal configuration failed: {e}")
             self._cleanup_failed_driver()
         
-        print("🚫 All browser setup options failed")
+        self._log("🚫 All browser setup options failed")
         return False
     
+    def _ensure_browser(self, zoom_percent=100) -> bool:
+        """Reuse the open browser when its zoom matches, otherwise set one up."""
+        if self.driver is not None and self.zoom_percent == zoom_percent:
+            return True
+        if self.share_browser and self.driver is None:
+            driver = type(self).shared_browser(headless=self.headless)
+            if driver is not None:
+                # A new tab costs a fraction of a Chrome launch
+                driver.switch_to.new_window('tab')
+                self.driver = driver
+                self._tab_handle = driver.current_window_handle
+                self.zoom_percent = zoom_percent
+                self._log(f"🔧 Opened tab in shared browser")
+                return True
+            self._log("⚠️ Shared browser unavailable - launching a private one")
+        return self.setup_browser_with_fallback(zoom_percent=zoom_percent)
+    
+    def _teardown_browser(self):
+        """Quit the browser, if any, so the next capture starts a fresh one."""
+        if self._tab_handle is not None:
+            # Close only our tab; the shared browser stays up for other capturers
+            try:
+                self.driver.close()
+                self.driver.switch_to.window(self.driver.window_handles[0])
+            except Exception as e:
+                self._log(f"   ⚠️ Error closing shared browser tab: {e}")
+            self.driver = None
+            self._tab_handle = None
+            self._log("🔧 Tab closed")
+            return
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+            self._log("🔧 Browser closed")
+    
     def setup_conversation_folder(self, conversation_id: str, main_tweet_id: str, tweet_type: str = "tweet", account_name: str = "unknown") -> str:
         """
         Create a conversation-specific folder using the account name, then tweet type and ID.
@@ -334,20 +691,22 @@ class VisualTweetCapturer:
         else:  # Default to "tweet" prefix
             folder_name = f"tweet_{main_tweet_id}"
         
-        # Create account-specific folder first
-        account_folder = os.path.join(self.base_output_dir, account_name.lower())
-        os.makedirs(account_folder, exist_ok=True)
-        
-        # Create the content folder within the account folder
-        conversation_folder = os.path.join(account_folder, folder_name)
-        os.makedirs(conversation_folder, exist_ok=True)
+        # Create the content folder (and its account folder) within the base folder
+        conversation_folder = str(self._ensure_dir(Path(self.base_output_dir, account_name.lower(), folder_name)))
         
         # Update the current output directory
         self.output_dir = conversation_folder
         
-        print(f"📁 Created {tweet_type} folder: {account_name}/{folder_name}")
+        self._log(f"📁 Created {tweet_type} folder: {account_name}/{folder_name}")
         return conversation_folder
     
+    def _ensure_dir(self, path: Path) -> Path:
+        """Create a directory (and parents) once; later calls for the same path skip the filesystem."""
+        if path not in self._ensured_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(path)
+        return path
+    
     def _detect_tweet_type(self, api_data: dict) -> str:
         """
         Detect the type of tweet based on API data.
@@ -381,26 +740,55 @@ class VisualTweetCapturer:
         Returns:
             Username without @ symbol, or "unknown" if extraction fails
         """
-        import re
-        # Pattern to match Twitter URL: https://twitter.com/username/status/tweet_id
-        match = re.search(r'twitter\.com/([^/]+)/status/', tweet_url)
-        if match:
-            return match.group(1)
+        return self._parse_tweet_url(tweet_url)[1]
+    
+    def _fetch_api_data(self, tweet_url: str) -> Optional[dict]:
+        """
+        Fetch tweet API metadata, reusing earlier responses for the same tweet ID.
         
-        # Also try x.com format
-        match = re.search(r'x\.com/([^/]+)/status/', tweet_url)
-        if match:
-            return match.group(1)
+        Responses are cached in memory for the session and, when api_cache_dir
+        is set, as one JSON file per tweet for reuse across runs.
+        """
+        tweet_id, _ = self._parse_tweet_url(tweet_url)
+        if tweet_id in self._api_cache:
+            return self._api_cache[tweet_id]
+        
+        cache_path = self.api_cache_dir / f"{tweet_id}.json" if self.api_cache_dir and tweet_id != 'unknown' else None
+        if cache_path is not None and cache_path.exists():
+            with open(cache_path, 'rb') as f:
+                api_data = orjson.loads(f.read()) if orjson is not None else json.loads(f.read())
+        else:
+            api_data = self.api_fetcher.fetch_tweet_by_url(tweet_url)
+            if api_data and cache_path is not None:
+                self.api_cache_dir.mkdir(parents=True, exist_ok=True)
+                self._write_json(str(cache_path), api_data)
+        
+        if api_data:
+            self._api_cache[tweet_id] = api_data
+        return api_data
+    
+    def _parse_tweet_url(self, tweet_url: str) -> Tuple[str, str]:
+        """
+        Parse tweet ID and username from a tweet URL in one pass.
         
-        return "unknown"
+        Args:
+            tweet_url: Tweet URL in format https://twitter.com/username/status/tweet_id
+            
+        Returns:
+            (tweet_id, username), with "unknown" for parts that can't be extracted
+        """
+        match = _TWEET_URL_RE.search(tweet_url)
+        if match:
+            return match.group(2), match.group(1)
+        return self._extract_tweet_id(tweet_url), "unknown"
     
-    def _get_account_name(self, api_data: dict, tweet_url: str = None) -> str:
+    def _get_account_name(self, api_data: dict, url_username: str = None) -> str:
         """
         Extract account name from API data or tweet URL as fallback.
         
         Args:
             api_data: Tweet data from API
-            tweet_url: Tweet URL as fallback source for username
+            url_username: Username parsed from the tweet URL, used as fallback
             
         Returns:
             Account username (without @)
@@ -411,44 +799,73 @@ class VisualTweetCapturer:
             if username != 'unknown':
                 return username
         
-        # Fallback to extracting from URL
-        if tweet_url:
-            username = self._extract_username_from_url(tweet_url)
-            if username != 'unknown':
-                print(f"📝 Extracted account name from URL: @{username}")
-                return username
+        # Fallback to the username from the URL
+        if url_username and url_username != 'unknown':
+            self._log(f"📝 Extracted account name from URL: @{url_username}")
+            return url_username
         
         return "unknown"
     
-    def capture_tweet_visually(self, tweet_url: str, zoom_percent: int = 100) -> dict:
+    def capture_many(self, tweet_urls: List[str], zoom_percent: int = 100, max_workers: int = 8) -> List[Optional[dict]]:
+        """
+        Capture several tweets, fetching all API metadata up front.
+        
+        The Twitter API calls run in parallel before any browser work starts, so
+        the browser captures no longer wait on one API round trip each.
+        
+        Args:
+            tweet_urls: URLs of the tweets to capture
+            zoom_percent: Browser zoom percentage (default: 100)
+            max_workers: Parallel API metadata requests
+        
+        Returns:
+            list: Capture result (or None on failure) for each URL, in input order
+        """
+        self._log(f"📡 Prefetching API metadata for {len(tweet_urls)} tweets...")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            metadata = dict(zip(tweet_urls, executor.map(self._fetch_api_data, tweet_urls)))
+        
+        # An empty dict marks "fetched but unavailable" so capture_tweet_visually won't refetch
+        return [
+            self.capture_tweet_visually(url, zoom_percent=zoom_percent, api_data=metadata[url] or {})
+            for url in tweet_urls
+        ]
+    
+    def capture_tweet_visually(self, tweet_url: str, zoom_percent: int = 100, api_data: Optional[dict] = None) -> dict:
         """
         Capture complete visual representation of a tweet thread.
         
         Args:
             tweet_url: URL of the tweet to capture
             zoom_percent: Browser zoom percentage (default: 100)
+            api_data: Prefetched API metadata; fetched here when None
         
         Returns:
             dict: Information about captured images and metadata
         """
         # Reset screenshots list for this capture to prevent accumulation from previous captures
         self.screenshots = []
+        self._images = []
+        self.screenshot_meta = []
         
-        print(f"📸 VISUAL TWEET CAPTURER")
-        print(f"🔗 URL: {tweet_url}")
+        self._log(f"📸 VISUAL TWEET CAPTURER")
+        self._log(f"🔗 URL: {tweet_url}")
         if zoom_percent != 100:
-            print(f"🔍 Browser zoom: {zoom_percent}%")
+            self._log(f"🔍 Browser zoom: {zoom_percent}%")
+        
+        # Parse the URL once; the ID and username are reused by every later step
+        tweet_id_from_url, username_from_url = self._parse_tweet_url(tweet_url)
         
         # Step 1: Get API data for metadata
-        print(f"\n1️⃣ Fetching API metadata...")
-        api_data = self.api_fetcher.fetch_tweet_by_url(tweet_url)
+        if api_data is None:
+            self._log(f"\n1️⃣ Fetching API metadata...")
+            api_data = self._fetch_api_data(tweet_url)
+        else:
+            self._log(f"\n1️⃣ Using prefetched API metadata")
         
         if not api_data:
-            print("⚠️ Could not fetch API metadata, proceeding with visual capture only")
-            # Extract tweet ID and username from URL as fallback
-            tweet_id_from_url = self._extract_tweet_id(tweet_url)
-            username_from_url = self._extract_username_from_url(tweet_url)
-            
+            self._log("⚠️ Could not fetch API metadata, proceeding with visual capture only")
+            # Use tweet ID and username from URL as fallback
             api_data = {
                 'id': tweet_id_from_url,
                 'author': {'username': username_from_url}, 
@@ -456,45 +873,43 @@ class VisualTweetCapturer:
             }
             
             if username_from_url != 'unknown':
-                print(f"📝 Extracted username from URL: @{username_from_url}")
+                self._log(f"📝 Extracted username from URL: @{username_from_url}")
         
         # Step 1.5: Set up conversation-specific folder
         conversation_id = api_data.get('conversation_id', api_data['id'])
         main_tweet_id = api_data['id']
         tweet_type = self._detect_tweet_type(api_data)
-        account_name = self._get_account_name(api_data, tweet_url)
+        account_name = self._get_account_name(api_data, username_from_url)
         self.setup_conversation_folder(conversation_id, main_tweet_id, tweet_type, account_name)
         
         # Step 2: Set up browser with specified zoom and retry mechanism
-        print(f"\n2️⃣ Setting up browser with retry mechanism...")
-        if not self.setup_browser_with_fallback(zoom_percent=zoom_percent):
-            print("❌ Failed to set up browser after all retry attempts and fallbacks")
+        self._log(f"\n2️⃣ Setting up browser with retry mechanism...")
+        if not self._ensure_browser(zoom_percent=zoom_percent):
+            self._log("❌ Failed to set up browser after all retry attempts and fallbacks")
             return None
         
         try:
             # Step 3: Navigate to tweet with retry logic
-            print(f"\n3️⃣ Loading tweet page...")
+            self._log(f"\n3️⃣ Loading tweet page...")
             if not self._navigate_to_page_with_retry(tweet_url):
-                print("❌ Failed to load tweet page after retries")
+                self._log("❌ Failed to load tweet page after retries")
                 return None
             
             # Step 4: Capture screenshots while scrolling
-            print(f"\n4️⃣ Capturing visual content...")
-            self.capture_scrolling_screenshots(tweet_url)
+            self._log(f"\n4️⃣ Capturing visual content...")
+            self.capture_scrolling_screenshots(tweet_url, tweet_id_from_url)
             
             # Step 5: Process and combine screenshots
-            print(f"\n5️⃣ Processing captured images...")
+            self._log(f"\n5️⃣ Processing captured images...")
             result = self.process_screenshots(api_data, tweet_url)
             
             return result
             
         except Exception as e:
-            print(f"❌ Capture error: {e}")
+            self._log(f"❌ Capture error: {e}")
             return None
         finally:
-            if self.driver:
-                self.driver.quit()
-                print("🔧 Browser closed")
+            self._teardown_browser()
     
     def _navigate_to_page_with_retry(self, url: str, max_retries: int = 3) -> bool:
         """
@@ -510,7 +925,7 @@ class VisualTweetCapturer:
         for attempt in range(1, max_retries + 1):
             try:
                 if attempt > 1:
-                    print(f"   🔄 Page load retry {attempt}/{max_retries}")
+                    self._log(f"   🔄 Page load retry {attempt}/{max_retries}")
                 
                 # Navigate to the page
                 self.driver.get(url)
@@ -527,33 +942,43 @@ class VisualTweetCapturer:
                 # Additional wait for dynamic content to fully load
                 time.sleep(2 + attempt)  # Slightly longer wait on retries
                 
-                print(f"✅ Page loaded successfully (attempt {attempt})")
+                self._log(f"✅ Page loaded successfully (attempt {attempt})")
                 return True
                 
             except TimeoutException as e:
-                print(f"   ⏱️ Page load timeout on attempt {attempt}: {e}")
+                self._log(f"   ⏱️ Page load timeout on attempt {attempt}: {e}")
+                self.error_counts['transient'] += 1
                 if attempt < max_retries:
-                    delay = 2.0 * attempt  # Progressive delay
-                    print(f"   ⏱️ Waiting {delay} seconds before retry...")
+                    delay = self._jittered_delay(2.0 * attempt)  # Progressive delay
+                    self._log(f"   ⏱️ Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 
             except WebDriverException as e:
-                print(f"   🌐 WebDriver error on attempt {attempt}: {e}")
+                self._log(f"   🌐 WebDriver error on attempt {attempt}: {e}")
+                self.error_counts[self._categorize_browser_error(e)] += 1
+                if _DRIVER_DEAD_RE.search(str(e).lower()):
+                    # Retrying get() on a dead driver cannot succeed - start a fresh browser
+                    self._log(f"   💥 Browser is no longer responsive - recreating it")
+                    if not self.setup_browser_with_fallback(self.zoom_percent):
+                        break
+                    continue
                 if attempt < max_retries:
-                    delay = 3.0 * attempt  # Longer delay for WebDriver issues
-                    print(f"   ⏱️ Waiting {delay} seconds before retry...")
+                    delay = self._jittered_delay(3.0 * attempt)  # Longer delay for WebDriver issues
+                    self._log(f"   ⏱️ Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 
             except Exception as e:
-                print(f"   ❌ Unexpected error on attempt {attempt}: {e}")
+                self._log(f"   ❌ Unexpected error on attempt {attempt}: {e}")
+                self.error_counts['unknown'] += 1
                 if attempt < max_retries:
-                    print(f"   ⏱️ Waiting 5 seconds before retry...")
-                    time.sleep(5.0)
+                    delay = self._jittered_delay(5.0)
+                    self._log(f"   ⏱️ Waiting {delay:.1f} seconds before retry...")
+                    time.sleep(delay)
         
-        print(f"❌ Failed to load page after {max_retries} attempts")
+        self._log(f"❌ Failed to load page after {max_retries} attempts")
         return False
     
-    def capture_scrolling_screenshots(self, tweet_url: str):
+    def capture_scrolling_screenshots(self, tweet_url: str, tweet_id: str = None):
         """Capture screenshots while scrolling down to get the complete thread with dynamic loading."""
         screenshot_count = 0
         last_scroll_position = 0
@@ -561,110 +986,315 @@ class VisualTweetCapturer:
         max_screenshots = 20  # Prevent infinite scrolling
         
         # Get initial page info
-        tweet_id = self._extract_tweet_id(tweet_url)
+        if tweet_id is None:
+            tweet_id = self._extract_tweet_id(tweet_url)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        print(f"📸 Starting screenshot capture...")
+        self._log(f"📸 Starting screenshot capture...")
         if self.crop_enabled:
-            print(f"✂️ Will crop screenshots to ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
+            self._log(f"✂️ Will crop screenshots to ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
         
-        # Take initial screenshot at top of page
-        screenshot_path = f"{self.output_dir}/{tweet_id}_{timestamp}_page_{screenshot_count:02d}.png"
-        self.driver.save_screenshot(screenshot_path)
+        # Render the whole document in one shot when Chrome supports it; no scrolling or sleeps.
+        # Taller pages would decode to a huge bitmap, so they use the scroll loop instead
+        full_page_png = self.capture_full_page_png(max_height=_MAX_FULL_PAGE_HEIGHT)
+        if full_page_png is not None:
+            screenshot_path = self._store_screenshot(full_page_png, f"{self.output_dir}/{tweet_id}_{timestamp}_page_00.{self.output_format}")
+            self._log(f"   📸 Full-page screenshot: {os.path.basename(screenshot_path)}")
+            self._log(f"✅ Captured {len(self.screenshots)} unique screenshots")
+            return
         
-        # Apply cropping if enabled
-        cropped_path = self.crop_image(screenshot_path)
-        self.screenshots.append(cropped_path)
+        self._log(f"   🔄 Falling back to scrolling capture...")
+        
+        # Take initial screenshot at top of page
+        png = self._grab_png()
+        screenshot_path = self._store_screenshot(
+            png, f"{self.output_dir}/{tweet_id}_{timestamp}_page_{screenshot_count:02d}.{self.output_format}"
+        )
+        self._last_dhash = self._frame_hash(png)
         
         # Get initial scroll position and page info
-        current_scroll_position = self.driver.execute_script("return window.pageYOffset")
-        viewport_height = self.driver.execute_script("return window.innerHeight")
+        current_scroll_position, viewport_height, current_page_height = self.driver.execute_script(_SCROLL_STATE_JS)
         
-        print(f"   📸 Screenshot {screenshot_count + 1}: {os.path.basename(cropped_path)} (top of page)")
-        if self.crop_enabled and cropped_path != screenshot_path:
-            print(f"   ✂️ Applied cropping")
-        print(f"   📊 Viewport: {viewport_height}px, Initial scroll: {current_scroll_position}px")
+        self._log(f"   📸 Screenshot {screenshot_count + 1}: {os.path.basename(screenshot_path)} (top of page)")
+        if self.crop_enabled:
+            self._log(f"   ✂️ Applied cropping")
+        self._log(f"   📊 Viewport: {viewport_height}px, Initial scroll: {current_scroll_position}px")
         
         screenshot_count += 1
         last_scroll_position = current_scroll_position
         
         while screenshot_count < max_screenshots:
+            # Already at the bottom (or the page fits on one screen): skip the scroll, wait and screenshot
+            if last_scroll_position + viewport_height >= current_page_height:
+                self._log(f"   ✅ Reached absolute bottom of page")
+                break
+            
             # Scroll down by 80% of viewport height
             scroll_amount = int(viewport_height * 0.8)
-            self.driver.execute_script(f"window.scrollBy(0, {scroll_amount})")
+            _, new_scroll_position, previous_height, article_count = self.driver.execute_script(
+                _SCROLL_AND_MEASURE_JS, scroll_amount
+            )
             
-            # Wait for content to load and any animations
-            time.sleep(2.0)
+            # Wait for new content to load rather than a fixed sleep; the wait's last poll
+            # doubles as the page height measurement (the offset and viewport don't change)
+            current_page_height = self._wait_for_new_content(previous_height, article_count)
             
-            # Get new scroll position
-            new_scroll_position = self.driver.execute_script("return window.pageYOffset")
-            current_page_height = self.driver.execute_script("return document.body.scrollHeight")
-            max_scroll = current_page_height - viewport_height
-            
-            print(f"   🔄 Scrolled by {scroll_amount}px: {last_scroll_position}px → {new_scroll_position}px (page: {current_page_height}px)")
+            self._log(f"   🔄 Scrolled by {scroll_amount}px: {last_scroll_position}px → {new_scroll_position}px (page: {current_page_height}px)")
             
             # Check if scrolling actually worked
             if new_scroll_position <= last_scroll_position:
                 consecutive_same_positions += 1
-                print(f"   ⚠️ No scroll progress (attempt {consecutive_same_positions})")
+                self._log(f"   ⚠️ No scroll progress (attempt {consecutive_same_positions})")
+                
+                # Neither the position nor the pixels moved: the page is done, no need to retry
+                png = self._grab_png()
+                if self._is_duplicate(png):
+                    self._log(f"   ✅ Reached end of scrollable content (frame unchanged)")
+                    break
                 
+                # New content rendered in place - keep the frame
+                screenshot_path = self._store_screenshot(
+                    png, f"{self.output_dir}/{tweet_id}_{timestamp}_page_{screenshot_count:02d}.{self.output_format}"
+                )
+                self._last_dhash = self._frame_hash(png)
+                self._log(f"   📸 Screenshot {screenshot_count + 1}: {os.path.basename(screenshot_path)} (content changed in place)")
+                screenshot_count += 1
                 if consecutive_same_positions >= 2:
-                    print(f"   ✅ Reached end of scrollable content")
+                    self._log(f"   ✅ Reached end of scrollable content")
                     break
             else:
                 consecutive_same_positions = 0
                 
-                # Only take screenshot if we actually scrolled
-                screenshot_path = f"{self.output_dir}/{tweet_id}_{timestamp}_page_{screenshot_count:02d}.png"
-                self.driver.save_screenshot(screenshot_path)
-                
-                # Apply cropping if enabled
-                cropped_path = self.crop_image(screenshot_path)
-                self.screenshots.append(cropped_path)
+                # The page moved, so the frame shows new content even if its hash matches the
+                # last one (static sidebars and repetitive feeds can hash alike); only frames at
+                # an unchanged offset are checked for duplicates
+                png = self._grab_png()
+                screenshot_path = self._store_screenshot(
+                    png, f"{self.output_dir}/{tweet_id}_{timestamp}_page_{screenshot_count:02d}.{self.output_format}"
+                )
+                self._last_dhash = self._frame_hash(png)
                 
-                print(f"   📸 Screenshot {screenshot_count + 1}: {os.path.basename(cropped_path)}")
-                if self.crop_enabled and cropped_path != screenshot_path:
-                    print(f"   ✂️ Applied cropping")
+                self._log(f"   📸 Screenshot {screenshot_count + 1}: {os.path.basename(screenshot_path)}")
+                if self.crop_enabled:
+                    self._log(f"   ✂️ Applied cropping")
                 screenshot_count += 1
             
             last_scroll_position = new_scroll_position
-            
-            # Safety check: if we're at the bottom of the page
-            if new_scroll_position >= max_scroll:
-                print(f"   ✅ Reached absolute bottom of page")
-                break
         
-        print(f"✅ Captured {len(self.screenshots)} unique screenshots")
+        self._log(f"✅ Captured {len(self.screenshots)} unique screenshots")
+        if self.crop_enabled:
+            self._log(f"✂️ All screenshots cropped to region: ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
+    
+    def _wait_scroll_settled(self, timeout: float = 3.0, interval: float = 0.1):
+        """
+        Wait until scroll offset and page height stop changing between two samples.
+        
+        Returns as soon as the page is stable instead of sleeping a fixed time;
+        gives up after timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        previous = None
+        while time.monotonic() < deadline:
+            current = self.driver.execute_script("return [window.pageYOffset, document.body.scrollHeight]")
+            if current == previous:
+                return
+            previous = current
+            time.sleep(interval)
+    
+    def _wait_for_new_content(self, previous_height: int, article_count: int, timeout: float = 3.0) -> int:
+        """
+        Wait for a scroll to load more content instead of sleeping a fixed time.
+        
+        Returns as soon as the page grows or more articles render; if neither
+        happens within timeout seconds, pauses briefly for trailing layout.
+        
+        Returns:
+            int: Page height from the final poll, so callers need not measure it again
+        """
+        def content_loaded(driver):
+            height, articles = driver.execute_script(_CONTENT_STATE_JS)
+            return height if height > previous_height or articles > article_count else False
+        
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(content_loaded)
+        except TimeoutException:
+            time.sleep(0.5)
+            return self.driver.execute_script(_CONTENT_STATE_JS)[0]
+    
+    def _grab_png(self) -> bytes:
+        """
+        Grab the viewport as PNG bytes via Chrome DevTools, letting Chrome favour encode speed.
+        
+        Falls back to Selenium's screenshot for the rest of the session if CDP is unavailable.
+        """
+        if self._cdp_screenshots:
+            try:
+                data = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "png", "optimizeForSpeed": True
+                })["data"]
+                return base64.b64decode(data)
+            except Exception as e:
+                self._log(f"   ⚠️ CDP screenshot unavailable, using WebDriver screenshots: {e}")
+                self._cdp_screenshots = False
+        return self.driver.get_screenshot_as_png()
+    
+    def _frame_hash(self, png: bytes) -> int:
+        """Difference hash of the part of a screenshot that is kept (the crop box when cropping)."""
         if self.crop_enabled:
-            print(f"✂️ All screenshots cropped to region: ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
+            return _dhash(png, (self.crop_x1 / 100, self.crop_y1 / 100, self.crop_x2 / 100, self.crop_y2 / 100))
+        return _dhash(png)
+    
+    def _is_duplicate(self, png: bytes) -> bool:
+        """
+        Whether a screenshot looks identical to the last one stored; doesn't change any state.
+        
+        Only meaningful for frames taken at the same scroll offset as the last one.
+        """
+        # Exact match: at an unchanged offset, a re-render of the same pixels hashes identically,
+        # while a small in-place change (an expanded reply, a new count) may flip only a bit or two
+        return self._frame_hash(png) == self._last_dhash
+    
+    def _store_screenshot(self, png: bytes, screenshot_path: str) -> str:
+        """
+        Decode and crop a screenshot, writing it to disk if persisting individual files.
+        
+        Screenshots are only kept in memory when they aren't written to disk; persisted
+        ones are released after saving and combined from their files.
+        
+        Returns:
+            str: Path of the screenshot (written only when persist_individual is set)
+        """
+        img = self._write_screenshot(png, screenshot_path if self.persist_individual else None)
+        self.screenshots.append(screenshot_path)
+        self.screenshot_meta.append((screenshot_path,) + img.size)
+        if not self.persist_individual:
+            self._images.append(img)
+        return screenshot_path
+    
+    def _write_screenshot(self, png: bytes, screenshot_path: Optional[str]) -> Image.Image:
+        """
+        Crop a screenshot in memory when enabled and write it once in the configured output format.
+        
+        Args:
+            png: Screenshot PNG bytes from Chrome
+            screenshot_path: Where to write the screenshot, or None to only crop it
+        
+        Returns:
+            Image.Image: The cropped screenshot, opened lazily so pixels are only decoded if needed
+        """
+        img = Image.open(io.BytesIO(png))
+        cropped = False
+        if self.crop_enabled:
+            crop_box = self._get_crop_box(img.size)
+            if crop_box != (0, 0) + img.size:
+                img = img.crop(crop_box)
+                cropped = True
+        
+        if screenshot_path is not None:
+            if not cropped and self.output_format == 'png':
+                # Chrome's PNG is already the file we want - write it without decoding or re-encoding
+                with open(screenshot_path, 'wb') as f:
+                    f.write(png)
+            else:
+                self._save_image(img, screenshot_path)
+        return img
+    
+    def _save_image(self, img: Image.Image, path: str):
+        """Save a screenshot in the configured output format, favouring encode speed."""
+        if self.output_format == 'webp':
+            # Lossless keeps rendered text crisp; typically 25-35% smaller than PNG
+            img.save(path, 'WEBP', lossless=True, method=4)
+        else:
+            img.save(path, 'PNG', compress_level=self.png_compress_level)
+    
+    def capture_full_page_png(self, max_height: int = None) -> Optional[bytes]:
+        """
+        Capture the entire rendered document as a single PNG via the Chrome DevTools Protocol.
+        
+        Args:
+            max_height: Skip pages taller than this many pixels
+        
+        Returns:
+            bytes: PNG data, or None if the caller should fall back to scrolling
+                (always None when VISUAL_CAPTURE_SCROLL_ONLY is set)
+        """
+        if os.environ.get(_SCROLL_ONLY_ENV):
+            return None
+        
+        try:
+            # Visit the bottom once so lazy-loaded replies render, then return to the top
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
+            self._wait_scroll_settled()
+            self.driver.execute_script("window.scrollTo(0, 0)")
+            
+            # Layout metrics give the document size without another script round trip
+            metrics = self.driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+            content_size = metrics.get('cssContentSize', metrics['contentSize'])
+            width = int(content_size['width'])
+            full_height = int(content_size['height'])
+            if max_height is not None and full_height > max_height:
+                self._log(f"   📏 Page is {full_height}px tall - too long for a single capture")
+                return None
+            
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "mobile": False, "width": width, "height": 1080, "deviceScaleFactor": 1
+            })
+            try:
+                data = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "png",
+                    "captureBeyondViewport": True,
+                    "clip": {"x": 0, "y": 0, "width": width, "height": full_height, "scale": 1}
+                })["data"]
+            finally:
+                self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+            
+            self._log(f"   📐 Full page rendered: {width}x{full_height}px")
+            return base64.b64decode(data)
+            
+        except Exception as e:
+            self._log(f"   ⚠️ Full-page capture unavailable: {e}")
+            return None
     
     def process_screenshots(self, api_data: dict, tweet_url: str) -> dict:
         """Process captured screenshots without combining them."""
         if not self.screenshots:
-            print("❌ No screenshots to process")
+            self._log("❌ No screenshots to process")
             return None
         
-        print(f"🔄 Processing {len(self.screenshots)} screenshots...")
+        self._log(f"🔄 Processing {len(self.screenshots)} screenshots...")
         
-        # Calculate total dimensions from individual screenshots
+        # Calculate total dimensions from the sizes recorded at capture time, or from the
+        # file headers for screenshots that were not captured by this instance
         total_height = 0
         max_width = 0
         
-        for screenshot_path in self.screenshots:
-            try:
-                with Image.open(screenshot_path) as img:
-                    width, height = img.size
-                    total_height += height
-                    max_width = max(max_width, width)
-            except Exception as e:
-                print(f"⚠️ Error reading {screenshot_path}: {e}")
+        if self.screenshot_meta:
+            total_height = sum(height for _, _, height in self.screenshot_meta)
+            max_width = max(width for _, width, _ in self.screenshot_meta)
+        else:
+            for screenshot_path in self.screenshots:
+                try:
+                    with Image.open(screenshot_path) as img:
+                        width, height = img.size
+                        total_height += height
+                        max_width = max(max_width, width)
+                except Exception as e:
+                    self._log(f"⚠️ Error reading {screenshot_path}: {e}")
+        
+        # Combining re-encodes every screenshot, so only do it when asked for or when
+        # there are no individual files on disk (the combined image is then the only output)
+        combined_path = None
+        if self.combine_enabled or not self.persist_individual:
+            combined_path = self.combine_screenshots()
         
         # Create result metadata with cropping information
         result = {
             'tweet_url': tweet_url,
             'capture_timestamp': datetime.now().isoformat(),
             'screenshots': {
-                'individual_files': [os.path.basename(path) for path in self.screenshots],
+                'individual_files': [os.path.basename(path) for path in self.screenshots] if self.persist_individual else [],
+                'combined_file': os.path.basename(combined_path) if combined_path else None,
+                'format': self.output_format,
                 'count': len(self.screenshots),
                 'total_dimensions': {
                     'width': max_width,
@@ -686,134 +1316,316 @@ class VisualTweetCapturer:
         
         # Save metadata
         metadata_path = f"{self.output_dir}/capture_metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        self._write_json(metadata_path, result)
         
-        print(f"✅ Processing complete!")
-        print(f"   📁 Conversation folder: {self.output_dir}")
-        print(f"   📸 Individual screenshots: {len(self.screenshots)}")
-        print(f"   📊 Total dimensions: {max_width}x{total_height}")
+        self._log(f"✅ Processing complete!")
+        self._log(f"   📁 Conversation folder: {self.output_dir}")
+        self._log(f"   📸 Individual screenshots: {len(self.screenshots)}")
+        self._log(f"   📊 Total dimensions: {max_width}x{total_height}")
         if self.crop_enabled:
-            print(f"   ✂️ Cropping applied: ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
-        print(f"   💾 Metadata saved: {os.path.basename(metadata_path)}")
+            self._log(f"   ✂️ Cropping applied: ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
+        self._log(f"   💾 Metadata saved: {os.path.basename(metadata_path)}")
         
         return result
     
+    def _write_json(self, path: str, data: dict):
+        """Write metadata JSON, compact unless running in debug mode."""
+        if orjson is not None:
+            with open(path, 'wb') as f:
+                option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if self.debug else 0)
+                f.write(orjson.dumps(data, option=option))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                if self.debug:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                else:
+                    json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+    
     def combine_screenshots(self) -> str:
         """Combine individual screenshots into a single long image."""
         if not self.screenshots:
             return None
         
-        print(f"🔗 Combining screenshots...")
+        self._log(f"🔗 Combining screenshots...")
         
         try:
-            # Load all images
-            images = []
-            total_height = 0
-            max_width = 0
-            
-            for screenshot_path in self.screenshots:
-                img = Image.open(screenshot_path)
-                images.append(img)
-                width, height = img.size
-                total_height += height
-                max_width = max(max_width, width)
-            
-            # Create combined image
-            combined_image = Image.new('RGB', (max_width, total_height), color='white')
-            
-            # Paste images vertically
-            y_offset = 0
-            for img in images:
-                combined_image.paste(img, (0, y_offset))
-                y_offset += img.size[1]
-            
-            # Save combined image
             tweet_id = self._extract_tweet_id(self.screenshots[0])
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            combined_path = f"{self.output_dir}/{tweet_id}_{timestamp}_combined.png"
+            combined_path = f"{self.output_dir}/{tweet_id}_{timestamp}_combined.{self.output_format}"
             
-            combined_image.save(combined_path, 'PNG', optimize=True)
+            if self._images:
+                self._save_image(self._quantize(self._combine_in_memory(self._images)), combined_path)
+            elif self.palette_quantize:
+                # Quantizing needs decoded pixels, so skip the byte-level and OpenCV paths
+                self._save_image(self._quantize(self._combine_from_disk(self.screenshots)), combined_path)
+            elif self.output_format == 'png' and self.combine_mode == 'RGB' and _stitch_pngs(self.screenshots, combined_path, self.png_compress_level):
+                pass  # Stitched at the scanline level, no pixel decode needed
+            elif pyvips is not None:
+                self._write_combined_vips(self.screenshots, combined_path)
+            elif cv2 is not None:
+                self._write_combined_cv2(self.screenshots, combined_path)
+            else:
+                self._save_image(self._combine_from_disk(self.screenshots), combined_path)
             
-            # Clean up individual images
-            for img in images:
-                img.close()
+            self._post_optimize(combined_path)
             
-            print(f"✅ Combined image saved: {os.path.basename(combined_path)}")
+            self._log(f"✅ Combined image saved: {os.path.basename(combined_path)}")
             return combined_path
             
         except Exception as e:
-            print(f"❌ Error combining screenshots: {e}")
+            self._log(f"❌ Error combining screenshots: {e}")
             return None
     
+    def _quantize(self, img: Image.Image) -> Image.Image:
+        """
+        Reduce a combined RGB image to a 256-colour palette when palette_quantize is set.
+        
+        Tweet pages are mostly flat background, brand colours and anti-aliased text,
+        so a palette PNG is a fraction of the size. Images with photos (high histogram
+        entropy on a downsampled copy) are returned unchanged.
+        """
+        if not self.palette_quantize or self.output_format != 'png' or img.mode != 'RGB':
+            return img
+        
+        if img.reduce(8).entropy() > _PHOTO_ENTROPY_BITS:
+            self._log(f"   🖼️ Photo content detected - keeping full colour")
+            return img
+        
+        # No dithering: it adds noise around glyphs and compresses worse
+        return img.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    
+    def _post_optimize(self, png_path: str):
+        """Recompress a saved PNG with oxipng, swapping the result in only once it is complete."""
+        if not self.post_optimize_png or self.output_format != 'png':
+            return
+        
+        if shutil.which("oxipng") is None:
+            self._log(f"   ⚠️ oxipng not found - skipping PNG post-optimization")
+            return
+        
+        # Write to a side file and rename it over the original, so readers of png_path
+        # never see a partly written image and a failed run leaves the original untouched
+        optimized_path = f"{png_path}.oxipng.tmp"
+        try:
+            subprocess.run(["oxipng", "-o", "2", "--strip", "safe", "--out", optimized_path, png_path],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=_POST_OPTIMIZE_TIMEOUT, check=True)
+            os.replace(optimized_path, png_path)
+            self._log(f"   🗜️ Optimized {os.path.basename(png_path)}")
+        except (subprocess.SubprocessError, OSError) as e:
+            self._log(f"   ⚠️ PNG post-optimization failed, keeping original: {e}")
+            if os.path.exists(optimized_path):
+                os.remove(optimized_path)
+    
+    def _combine_in_memory(self, images: List[Image.Image]) -> Image.Image:
+        """Stack already-decoded screenshots vertically."""
+        mode = self.combine_mode
+        widths = {img.size[0] for img in images}
+        
+        if len(widths) == 1:
+            # Same-width screenshots (the normal case): copy each source into its row block of
+            # one preallocated canvas, so only one converted source is alive at a time.
+            # The viewport is opaque, so drop any alpha channel.
+            shape = (sum(img.size[1] for img in images), widths.pop())
+            combined = np.empty(shape + ((3,) if mode == 'RGB' else ()), np.uint8)
+            y_offset = 0
+            for img in images:
+                height = img.size[1]
+                combined[y_offset:y_offset + height] = np.asarray(img.convert(mode))
+                y_offset += height
+            return Image.fromarray(combined, mode)
+        
+        # Mixed widths: paste onto a white canvas
+        combined_image = Image.new(mode, (max(widths), sum(img.size[1] for img in images)), color='white')
+        y_offset = 0
+        for img in images:
+            combined_image.paste(img.convert(mode), (0, y_offset))
+            y_offset += img.size[1]
+        return combined_image
+    
+    def _combine_from_disk(self, screenshot_paths: List[str]) -> Image.Image:
+        """
+        Stack screenshot files vertically, holding at most one decoded source at a time.
+        
+        The first pass reads only PNG headers for geometry; the second decodes,
+        pastes and closes each source in turn.
+        """
+        sizes = []
+        for screenshot_path in screenshot_paths:
+            with Image.open(screenshot_path) as img:
+                sizes.append(img.size)
+        
+        mode = self.combine_mode
+        widths = {w for w, _ in sizes}
+        
+        if len(widths) == 1:
+            # Same-width screenshots: bulk-copy each decoded source into one preallocated array
+            # instead of pasting onto a white-filled canvas
+            shape = (sum(h for _, h in sizes), widths.pop())
+            combined = np.empty(shape + ((3,) if mode == 'RGB' else ()), np.uint8)
+            y_offset = 0
+            for screenshot_path, (_, height) in zip(screenshot_paths, sizes):
+                with Image.open(screenshot_path) as img:
+                    img.draft(mode, img.size)
+                    combined[y_offset:y_offset + height] = np.asarray(img.convert(mode))
+                y_offset += height
+            return Image.fromarray(combined, mode)
+        
+        # Mixed widths: paste onto a white canvas
+        combined_image = Image.new(mode, (max(widths), sum(h for _, h in sizes)), color='white')
+        y_offset = 0
+        for screenshot_path, (_, height) in zip(screenshot_paths, sizes):
+            with Image.open(screenshot_path) as img:
+                img.draft(mode, img.size)
+                combined_image.paste(img.convert(mode), (0, y_offset))
+            y_offset += height
+        return combined_image
+    
+    def _write_combined_vips(self, screenshot_paths: List[str], combined_path: str):
+        """
+        Stack screenshot files with libvips, streaming rows from the sources to the output.
+        
+        libvips evaluates the join lazily in horizontal strips, so the full combined
+        image is never held in memory.
+        """
+        images = [pyvips.Image.new_from_file(path, access='sequential') for path in screenshot_paths]
+        # The viewport is opaque, so drop any alpha channel
+        images = [img[:3] if img.bands > 3 else img for img in images]
+        if self.combine_mode == 'L':
+            # Same ITU-R 601 luma as Pillow's convert('L'), rounded; libvips' 'b-w' colourspace
+            # goes through CIELAB and gives visibly different greys
+            images = [img.recomb([[0.299, 0.587, 0.114]]).linear(1, 0.5).cast('uchar') for img in images]
+        
+        # One column; narrower screenshots are left-aligned on a white background
+        combined = pyvips.Image.arrayjoin(images, across=1, halign='low', background=[255])
+        
+        if self.output_format == 'webp':
+            combined.write_to_file(combined_path, lossless=True)
+        else:
+            combined.write_to_file(combined_path, compression=self.png_compress_level)
+    
+    def _write_combined_cv2(self, screenshot_paths: List[str], combined_path: str):
+        """
+        Stack screenshot files by decoding each with OpenCV straight into a preallocated canvas.
+        
+        The canvas stays in OpenCV's native BGR order and is encoded by OpenCV
+        directly, so no colour conversion or Pillow copy of the full image is made.
+        """
+        # Geometry from headers only
+        sizes = []
+        for screenshot_path in screenshot_paths:
+            with Image.open(screenshot_path) as img:
+                sizes.append(img.size)
+        max_width = max(w for w, _ in sizes)
+        total_height = sum(h for _, h in sizes)
+        
+        # Grayscale decodes straight to one channel: a third of the canvas memory and encode work
+        grayscale = self.combine_mode == 'L'
+        shape = (total_height, max_width) if grayscale else (total_height, max_width, 3)
+        read_flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        
+        if all(w == max_width for w, _ in sizes):
+            # Uniform width (the normal case): every pixel gets overwritten, no fill needed
+            combined = np.empty(shape, np.uint8)
+        else:
+            # Narrower screenshots leave the white background showing on the right
+            combined = np.full(shape, 255, np.uint8)
+        row_offsets = np.cumsum([0] + [h for _, h in sizes[:-1]])
+        
+        def decode_into(screenshot_path, y_offset, size):
+            width, height = size
+            combined[y_offset:y_offset + height, :width] = cv2.imread(screenshot_path, read_flag)
+        
+        # cv2.imread releases the GIL, so PNG decodes run in parallel on a thread pool
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(decode_into, screenshot_paths, row_offsets, sizes))
+        
+        if self.output_format == 'webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, 101]  # >100 selects lossless
+        else:
+            params = [cv2.IMWRITE_PNG_COMPRESSION, self.png_compress_level]
+        if not cv2.imwrite(combined_path, combined, params):
+            raise IOError(f"OpenCV could not write {combined_path}")
+    
     def _extract_tweet_id(self, path_or_url: str) -> str:
         """Extract tweet ID from path or URL."""
-        import re
-        match = re.search(r'(\d{19})', path_or_url)
+        match = _TWEET_ID_RE.search(path_or_url)
         return match.group(1) if match else 'unknown'
 
-    def capture_thread_visually(self, thread_data: Dict[str, Any]) -> dict:
+    def capture_thread_visually(self, thread_data: Dict[str, Any], thread_workers: int = 1) -> dict:
         """
         Capture complete visual representation of a thread by capturing each tweet individually.
         
         Args:
             thread_data: Thread data dictionary with thread_tweets array
+            thread_workers: Browsers capturing tweets in parallel (default: 1, one shared browser)
             
         Returns:
             dict: Information about captured thread images and metadata
         """
         # Reset screenshots list for this capture
         self.screenshots = []
+        self._images = []
+        self.screenshot_meta = []
         
         if not thread_data.get('is_thread', False):
-            print("⚠️ Not a thread - falling back to single tweet capture")
-            return self.capture_tweet_visually(thread_data['url'])
+            self._log("⚠️ Not a thread - falling back to single tweet capture")
+            # The thread data already carries the API metadata for this tweet
+            return self.capture_tweet_visually(thread_data['url'], api_data=thread_data)
         
-        print(f"🧵 INDIVIDUAL TWEET THREAD CAPTURER")
-        print(f"📊 Thread: {thread_data['thread_tweet_count']} tweets")
-        print(f"💬 Conversation ID: {thread_data['conversation_id']}")
+        self._log(f"🧵 INDIVIDUAL TWEET THREAD CAPTURER")
+        self._log(f"📊 Thread: {thread_data['thread_tweet_count']} tweets")
+        self._log(f"💬 Conversation ID: {thread_data['conversation_id']}")
         
         # Step 1: Set up conversation-specific folder
         conversation_id = thread_data.get('conversation_id', thread_data['id'])
-        # Find the first tweet ID (chronologically earliest)
+        # Sort once by numeric ID; snowflake IDs increase with created_at, so the
+        # lowest ID is also the chronologically first tweet
         thread_tweets = thread_data.get('thread_tweets', [])
-        if thread_tweets:
-            # Sort by created_at to find the actual first tweet
-            sorted_tweets = sorted(thread_tweets, key=lambda x: x['created_at'])
-            first_tweet_id = sorted_tweets[0]['id']
-        else:
-            # Fallback to main thread ID
-            first_tweet_id = thread_data['id']
+        sorted_tweets = [tweet for _, tweet in sorted(((int(t['id']), t) for t in thread_tweets), key=lambda pair: pair[0])]
+        # Fallback to main thread ID
+        first_tweet_id = sorted_tweets[0]['id'] if sorted_tweets else thread_data['id']
         
         # Use "convo" prefix for conversation/thread folders
         account_name = thread_data['author']['username']
         self.setup_conversation_folder(conversation_id, first_tweet_id, "convo", account_name)
         
-        # Step 2: Get tweets ordered by ID (increasing order)
-        sorted_tweets = sorted(thread_tweets, key=lambda x: int(x['id']))
-        print(f"   📊 Processing {len(sorted_tweets)} tweets ordered by ID")
+        # Step 2: Tweets are already ordered by ID (increasing order)
+        self._log(f"   📊 Processing {len(sorted_tweets)} tweets ordered by ID")
         
         # Step 3: Capture each tweet individually
-        captured_tweets = []
+        thread_dir = Path(self.output_dir)
+        # Use the username from thread data instead of hardcoding
+        username = thread_data['author']['username']
         
+        jobs = []
         for i, tweet in enumerate(sorted_tweets, 1):
             tweet_id = tweet['id']
-            # Use the username from thread data instead of hardcoding
-            username = thread_data['author']['username']
             tweet_url = f"https://twitter.com/{username}/status/{tweet_id}"
             
-            print(f"\n   📸 Capturing tweet {i}/{len(sorted_tweets)}: {tweet_id}")
-            print(f"       🔗 URL: {tweet_url}")
-            print(f"       💬 Text: {tweet['text'][:100]}...")
-            
-            # Create tweet-specific subfolder
-            tweet_folder = os.path.join(self.output_dir, f"tweet_{tweet_id}")
-            os.makedirs(tweet_folder, exist_ok=True)
-            print(f"       📁 Created subfolder: tweet_{tweet_id}")
-            
-            # Capture this individual tweet at 60% zoom
-            tweet_capture_result = self.capture_individual_tweet(tweet_url, tweet_id, tweet_folder)
+            self._log(f"\n   📸 Queued tweet {i}/{len(sorted_tweets)}: {tweet_id}")
+            self._log(f"       🔗 URL: {tweet_url}")
+            self._log(f"       💬 Text: {tweet['text'][:100]}...")
             
+            # Create tweet-specific subfolder (the thread folder already exists)
+            tweet_path = self._ensure_dir(thread_dir / f"tweet_{tweet_id}")
+            self._log(f"       📁 Created subfolder: tweet_{tweet_id}")
+            jobs.append((tweet_url, tweet_id, str(tweet_path)))
+        
+        workers = min(thread_workers, len(jobs))
+        if workers > 1:
+            self._log(f"\n   🚀 Capturing {len(jobs)} tweets with {workers} browsers")
+            capture_results = self._capture_tweets_parallel(jobs, workers)
+        else:
+            # Reuse one browser for the whole thread, capturing each tweet at 60% zoom
+            with self._shared_browser(zoom_percent=60) as browser_ready:
+                if not browser_ready:
+                    self._log(f"   ❌ Failed to set up browser for thread - retrying on the first tweet")
+                capture_results = [self.capture_individual_tweet(*job) for job in jobs]
+        
+        captured_tweets = []
+        for i, (tweet, tweet_capture_result) in enumerate(zip(sorted_tweets, capture_results), 1):
+            tweet_id = tweet['id']
             if tweet_capture_result:
                 # Add tweet metadata to the result
                 tweet_capture_result.update({
@@ -822,9 +1634,9 @@ class VisualTweetCapturer:
                     'subfolder': f"tweet_{tweet_id}"
                 })
                 captured_tweets.append(tweet_capture_result)
-                print(f"       ✅ Captured {tweet_capture_result['screenshot_count']} screenshots")
+                self._log(f"   ✅ Tweet {tweet_id}: captured {tweet_capture_result['screenshot_count']} screenshots")
             else:
-                print(f"       ❌ Failed to capture tweet {tweet_id}")
+                self._log(f"   ❌ Failed to capture tweet {tweet_id}")
         
         # Step 4: Create comprehensive metadata without duplication
         # Remove thread_tweets from thread_data to avoid duplication with ordered_tweets
@@ -847,17 +1659,81 @@ class VisualTweetCapturer:
         
         # Save comprehensive metadata
         metadata_path = f"{self.output_dir}/metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        self._write_json(metadata_path, result)
         
-        print(f"\n✅ Thread processing complete!")
-        print(f"   📁 Conversation folder: {self.output_dir}")
-        print(f"   🧵 Tweets captured: {len(captured_tweets)}/{len(sorted_tweets)}")
-        print(f"   📂 Subfolders created: {len(captured_tweets)}")
-        print(f"   💾 Metadata saved: metadata.json")
+        self._log(f"\n✅ Thread processing complete!")
+        self._log(f"   📁 Conversation folder: {self.output_dir}")
+        self._log(f"   🧵 Tweets captured: {len(captured_tweets)}/{len(sorted_tweets)}")
+        self._log(f"   📂 Subfolders created: {len(captured_tweets)}")
+        self._log(f"   💾 Metadata saved: metadata.json")
         
         return result
     
+    def _worker_clone(self) -> "VisualTweetCapturer":
+        """Copy this capturer's settings into an independent instance without a browser."""
+        clone = copy.copy(self)
+        clone.driver = None
+        clone._owns_driver = False  # The parallel pool tears worker browsers down at the end
+        clone.share_browser = False  # Workers run concurrently, so each needs its own session
+        clone._tab_handle = None
+        clone.screenshots = []
+        clone._images = []
+        clone.screenshot_meta = []
+        clone._last_dhash = None
+        clone.error_counts = dict.fromkeys(self.error_counts, 0)
+        # copy.copy shares containers; workers mutate these, so each gets its own.
+        # api_fetcher stays shared: TweetFetcher already gates its calls across threads
+        clone._ensured_dirs = set(self._ensured_dirs)
+        clone._api_cache = dict(self._api_cache)
+        return clone
+    
+    def _capture_tweets_parallel(self, jobs: List[tuple], max_workers: int) -> List[Optional[dict]]:
+        """
+        Capture (tweet_url, tweet_id, tweet_folder) jobs with one browser per worker thread.
+        
+        Chrome runs out of process, so worker threads spend their time waiting on
+        WebDriver calls and parallelize without a process pool.
+        
+        Returns:
+            list: Capture result (or None on failure) for each job, in input order
+        """
+        local = threading.local()
+        capturers = []
+        launch_lock = threading.Lock()
+        
+        def capture(job):
+            capturer = getattr(local, 'capturer', None)
+            if capturer is None:
+                capturer = local.capturer = self._worker_clone()
+                capturers.append(capturer)
+                # Launch browsers one at a time to avoid a storm of simultaneous Chrome starts
+                with launch_lock:
+                    capturer._ensure_browser(zoom_percent=60)
+            return capturer.capture_individual_tweet(*job)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(capture, jobs))
+        finally:
+            for capturer in capturers:
+                capturer._teardown_browser()
+    
+    @contextmanager
+    def _shared_browser(self, zoom_percent: int = 100):
+        """
+        Keep one browser open for a batch of captures, quitting it once at the end.
+        
+        Yields:
+            bool: True if the browser was set up
+        """
+        ready = self._ensure_browser(zoom_percent=zoom_percent)
+        self._owns_driver = False  # Per-tweet captures must leave the shared driver running
+        try:
+            yield ready
+        finally:
+            self._owns_driver = True
+            self._teardown_browser()
+    
     def capture_individual_tweet(self, tweet_url: str, tweet_id: str, tweet_folder: str) -> Optional[dict]:
         """
         Capture an individual tweet with scrolling at 60% page zoom, avoiding duplicates.
@@ -870,92 +1746,117 @@ class VisualTweetCapturer:
         Returns:
             Dict with capture results or None if failed
         """
+        if self.driver is not None and not self._owns_driver:
+            # Reusing a shared browser - start each tweet from a clean cache, cookies and scroll
+            self.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            self.driver.delete_all_cookies()
+            self.driver.execute_script("window.scrollTo(0, 0)")
         # Set up browser at 60% zoom with retry mechanism
-        if not self.setup_browser_with_fallback(zoom_percent=60):
-            print(f"       ❌ Failed to set up browser for tweet {tweet_id} after all retries")
+        elif not self._ensure_browser(zoom_percent=60):
+            self._log(f"       ❌ Failed to set up browser for tweet {tweet_id} after all retries")
             return None
         
         try:
             # Navigate to tweet with retry logic
             if not self._navigate_to_page_with_retry(tweet_url):
-                print(f"       ❌ Failed to load tweet page for {tweet_id} after retries")
+                self._log(f"       ❌ Failed to load tweet page for {tweet_id} after retries")
                 return None
             
-            # Wait a bit more for dynamic content
-            time.sleep(3.0)
-            
-            # Capture with intelligent scrolling to avoid duplicates
-            screenshot_count = 0
-            max_screenshots = 10  # Reduced since 60% zoom shows more content
-            last_scroll_position = -1  # Initialize to impossible value
-            consecutive_same_positions = 0
-            
-            # Get viewport and page info
-            viewport_height = self.driver.execute_script("return window.innerHeight")
+            # Wait for the document to finish loading and the layout to stop growing
+            WebDriverWait(self.driver, 5).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            self._wait_scroll_settled()
             
-            # Take initial screenshot
-            screenshot_path = f"{tweet_folder}/page_{screenshot_count:02d}.png"
-            self.driver.save_screenshot(screenshot_path)
-            
-            # Apply cropping if enabled
-            cropped_path = self.crop_image(screenshot_path)
-            screenshot_count += 1
-            
-            while screenshot_count < max_screenshots:
-                # Get current scroll position before scrolling
-                current_scroll_position = self.driver.execute_script("return window.pageYOffset")
-                current_page_height = self.driver.execute_script("return document.body.scrollHeight")
-                max_scroll = current_page_height - viewport_height
+            # Short pages render in one CDP call; only very long pages need the scroll loop
+            full_page_png = self.capture_full_page_png(max_height=_MAX_FULL_PAGE_HEIGHT)
+            if full_page_png is not None:
+                self._write_screenshot(full_page_png, f"{tweet_folder}/page_00.{self.output_format}")
+                screenshot_count = 1
+                self._log(f"           📸 Full-page screenshot")
+            else:
+                # Capture with intelligent scrolling to avoid duplicates
+                screenshot_count = 0
+                max_screenshots = 10  # Reduced since 60% zoom shows more content
+                last_scroll_position = -1  # Initialize to impossible value
+                consecutive_same_positions = 0
                 
-                # Check if we've reached the bottom
-                if current_scroll_position >= max_scroll:
-                    print(f"           ✅ Reached bottom of page")
-                    break
+                # Get viewport and page info
+                viewport_height = self.driver.execute_script("return window.innerHeight")
                 
-                # Scroll down by a reasonable amount (since page is zoomed to 60%)
-                scroll_amount = int(viewport_height * 0.7)  # Larger scroll since content is smaller
-                self.driver.execute_script(f"window.scrollBy(0, {scroll_amount})")
+                # Bind the per-screenshot callables once for the loop
+                grab_png = self._grab_png
+                is_duplicate = self._is_duplicate
+                path_fmt = (tweet_folder + "/page_{:02d}." + self.output_format).format
                 
-                # Wait for content to load
-                time.sleep(2.5)
+                # Take initial screenshot, cropped in memory and written once
+                png = grab_png()
+                self._write_screenshot(png, path_fmt(screenshot_count))
+                self._last_dhash = self._frame_hash(png)
+                screenshot_count += 1
                 
-                # Get new scroll position
-                new_scroll_position = self.driver.execute_script("return window.pageYOffset")
+                # Scroll by a reasonable amount (since page is zoomed to 60%)
+                scroll_amount = int(viewport_height * 0.7)  # Larger scroll since content is smaller
                 
-                # Check if we actually scrolled
-                if new_scroll_position <= current_scroll_position:
-                    consecutive_same_positions += 1
-                    print(f"           ⚠️ No scroll progress (attempt {consecutive_same_positions})")
-                    
-                    if consecutive_same_positions >= 2:
-                        print(f"           ✅ Cannot scroll further - end of content")
+                while screenshot_count < max_screenshots:
+                    # Scroll and measure in a single WebDriver round trip
+                    current_scroll_position, new_scroll_position, current_page_height, _ = self.driver.execute_script(
+                        _SCROLL_AND_MEASURE_JS, scroll_amount
+                    )
+                    max_scroll = current_page_height - viewport_height
+                
+                    # Check if we were already at the bottom (the scroll above was then a no-op)
+                    if current_scroll_position >= max_scroll:
+                        self._log(f"           ✅ Reached bottom of page")
                         break
-                else:
-                    # We scrolled successfully, reset counter and take screenshot
-                    consecutive_same_positions = 0
+                
+                    # Wait for content to load
+                    self._wait_scroll_settled()
+                
+                    # Check if we actually scrolled
+                    if new_scroll_position <= current_scroll_position:
+                        consecutive_same_positions += 1
+                        self._log(f"           ⚠️ No scroll progress (attempt {consecutive_same_positions})")
                     
-                    # Only take screenshot if we made significant progress
-                    scroll_progress = new_scroll_position - current_scroll_position
-                    if scroll_progress > (viewport_height * 0.3):  # Only if scrolled more than 30% of viewport
-                        screenshot_path = f"{tweet_folder}/page_{screenshot_count:02d}.png"
-                        self.driver.save_screenshot(screenshot_path)
+                        # Neither the position nor the pixels moved: the page is done, no need to retry
+                        png = grab_png()
+                        if is_duplicate(png):
+                            self._log(f"           ✅ Cannot scroll further - frame unchanged")
+                            break
                         
-                        # Apply cropping if enabled
-                        cropped_path = self.crop_image(screenshot_path)
+                        # New content rendered in place - keep the frame
+                        self._write_screenshot(png, path_fmt(screenshot_count))
+                        self._last_dhash = self._frame_hash(png)
                         screenshot_count += 1
-                        print(f"           📸 Screenshot {screenshot_count}: scrolled {scroll_progress}px")
-                        if self.crop_enabled and cropped_path != screenshot_path:
-                            print(f"           ✂️ Applied cropping")
+                        self._log(f"           📸 Screenshot {screenshot_count}: content changed in place")
+                        if consecutive_same_positions >= 2:
+                            self._log(f"           ✅ Cannot scroll further - end of content")
+                            break
                     else:
-                        print(f"           ⏭️ Skipped screenshot - minimal scroll progress ({scroll_progress}px)")
+                        # We scrolled successfully, reset counter and take screenshot
+                        consecutive_same_positions = 0
+                    
+                        # Only take screenshot if we made significant progress; the page moved, so
+                        # the frame is new content and isn't checked for duplicates
+                        scroll_progress = new_scroll_position - current_scroll_position
+                        if scroll_progress > (viewport_height * 0.3):  # Only if scrolled more than 30% of viewport
+                            png = grab_png()
+                            self._write_screenshot(png, path_fmt(screenshot_count))
+                            self._last_dhash = self._frame_hash(png)
+                            screenshot_count += 1
+                            self._log(f"           📸 Screenshot {screenshot_count}: scrolled {scroll_progress}px")
+                            if self.crop_enabled:
+                                self._log(f"           ✂️ Applied cropping")
+                        else:
+                            self._log(f"           ⏭️ Skipped screenshot - minimal scroll progress ({scroll_progress}px)")
+                
+                    last_scroll_position = current_scroll_position
                 
-                last_scroll_position = current_scroll_position
-            
             return {
                 'tweet_id': tweet_id,
                 'tweet_url': tweet_url,
                 'screenshot_count': screenshot_count,
-                'screenshots': [f"page_{i:02d}.png" for i in range(screenshot_count)],
+                'screenshots': [f"page_{i:02d}.{self.output_format}" for i in range(screenshot_count)],
                 'capture_timestamp': datetime.now().isoformat(),
                 'cropping': {
                     'enabled': self.crop_enabled,
@@ -969,11 +1870,11 @@ class VisualTweetCapturer:
             }
             
         except Exception as e:
-            print(f"       ❌ Error capturing tweet {tweet_id}: {e}")
+            self._log(f"       ❌ Error capturing tweet {tweet_id}: {e}")
             return None
         finally:
-            if self.driver:
-                self.driver.quit()
+            if self._owns_driver:
+                self._teardown_browser()
 
 def test_visual_capture():
     """Test the visual capture approach with retry mechanism."""
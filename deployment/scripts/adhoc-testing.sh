@@ -218,6 +218,8 @@ check_digest_results() {
         '$latest_digest' --region '$AWS_REGION' | cat" 2>/dev/null; then
         
         echo "Downloaded latest digest. Summary:"
+        # Digests are stored gzip-encoded; -f passes through objects written before that
+        gzip -dcf "$latest_digest" > "$latest_digest.tmp" && mv "$latest_digest.tmp" "$latest_digest"
         if command -v jq > /dev/null; then
             jq -r '.generation_metadata.summary // .summary // "No summary available"' "$latest_digest" 2>/dev/null || echo "Could not parse summary"
             echo ""
@@ -80,6 +80,17 @@ for i in "${!FUNC_NAMES[@]}"; do
     echo "  Copying function code..."
     cp "${func_name}/lambda_function.py" "build/${func_name}/"
     
+    # boto3/botocore ship with the python3.11 Lambda runtime; bundling a second
+    # copy only adds bytes to download and import on cold start
+    echo "  Dropping bundled AWS SDK..."
+    rm -rf "build/${func_name}"/boto3* "build/${func_name}"/botocore* "build/${func_name}"/s3transfer*
+    
+    # Lambda's filesystem is read-only, so ship bytecode instead of compiling
+    # on every cold start. unchecked-hash pycs stay valid after zip rewrites mtimes.
+    echo "  Precompiling bytecode..."
+    python3.11 -m compileall -q --invalidation-mode unchecked-hash "build/${func_name}/" || \
+        python3 -m compileall -q --invalidation-mode unchecked-hash "build/${func_name}/"
+    
     # Create optimized package with the standard name for CloudFormation
     echo "  Creating package ${output_zip_name}..."
     cd "build/${func_name}"
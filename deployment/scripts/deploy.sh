@@ -200,7 +200,8 @@ deploy_infrastructure() {
   {"ParameterKey": "Environment", "ParameterValue": "${ENVIRONMENT}"},
   {"ParameterKey": "TwitterBearerToken", "ParameterValue": "${TWITTER_BEARER_TOKEN}"},
   {"ParameterKey": "GeminiApiKey", "ParameterValue": "${GEMINI_API_KEY}"},
-  {"ParameterKey": "FromEmail", "ParameterValue": "${FROM_EMAIL}"}
+  {"ParameterKey": "FromEmail", "ParameterValue": "${FROM_EMAIL}"},
+  {"ParameterKey": "SubscriberIndexRollout", "ParameterValue": "${SUBSCRIBER_INDEX_ROLLOUT:-full}"}
 ]
 EOF
     echo "Parameters file content being used by CloudFormation:"
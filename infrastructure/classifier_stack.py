@@ -11,6 +11,8 @@ from typing import Any
 try:
     import aws_cdk as cdk  # type: ignore
     from aws_cdk import (  # type: ignore
+        aws_applicationautoscaling as appscaling,
+        aws_ec2 as ec2,
         aws_ecs as ecs,
         aws_ecs_patterns as ecs_patterns,
         aws_ecr_assets as ecr_assets,
@@ -51,32 +53,46 @@ if cdk is not None:  # pragma: no cover – only executed when CDK present
             image = ecr_assets.DockerImageAsset(
                 self, "ClassifierImage", directory=".")
 
-            # Fargate service + cluster
-            cluster = ecs.Cluster(self, "ClassifierCluster")
-            task_def = ecs.FargateTaskDefinition(self, "TaskDef")
-            container = task_def.add_container(
-                "ClassifierContainer",
-                image=ecs.ContainerImage.from_docker_image_asset(image),
-                logging=ecs.LogDrivers.aws_logs(stream_prefix="Classifier"),
-                environment={
-                    "QUEUE_URL": queue.queue_url,
-                    "DDB_TABLE": table.table_name,
-                },
+            # Public-subnet VPC: tasks get public IPs, so no NAT gateway is needed
+            vpc = ec2.Vpc(
+                self,
+                "ClassifierVpc",
+                max_azs=2,
+                nat_gateways=0,
+                subnet_configuration=[
+                    ec2.SubnetConfiguration(name="public", subnet_type=ec2.SubnetType.PUBLIC),
+                ],
             )
-            container.add_port_mappings(ecs.PortMapping(container_port=8080))
+            cluster = ecs.Cluster(self, "ClassifierCluster", vpc=vpc)
 
-            ecs_patterns.ApplicationLoadBalancedFargateService(
+            # The classifier is a queue worker with no HTTP ingress; scale on
+            # queue depth (down to zero) instead of fronting it with an ALB
+            service = ecs_patterns.QueueProcessingFargateService(
                 self,
                 "Service",
                 cluster=cluster,
-                task_definition=task_def,
+                queue=queue,
+                image=ecs.ContainerImage.from_docker_image_asset(image),
+                log_driver=ecs.LogDrivers.aws_logs(stream_prefix="Classifier"),
+                environment={
+                    "QUEUE_URL": queue.queue_url,
+                    "DDB_TABLE": table.table_name,
+                },
                 assign_public_ip=True,
-                desired_count=1,
+                task_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PUBLIC),
+                min_scaling_capacity=0,
+                max_scaling_capacity=10,
+                # CDK's default steps only scale out at 100 visible messages, which would
+                # strand a smaller backlog with no running task; start one on the first
+                scaling_steps=[
+                    appscaling.ScalingInterval(upper=0, change=-1),
+                    appscaling.ScalingInterval(lower=1, change=+1),
+                    appscaling.ScalingInterval(lower=500, change=+5),
+                ],
             )
 
-            # Permissions
-            queue.grant_consume_messages(task_def.task_role)
-            table.grant_write_data(task_def.task_role)
+            # Permissions (queue consume is granted by the pattern)
+            table.grant_write_data(service.task_definition.task_role)
 
             # --- Outputs ---
             cdk.CfnOutput(self, "QueueUrl", value=queue.queue_url)
@@ -3,9 +3,11 @@ Lambda function for handling email verification.
 Triggered by API Gateway GET requests to /verify endpoint.
 """
 
+import html
 import json
 import sys
 import os
+from urllib.parse import urlencode
 
 # Add the src directory to the Python path for local development
 # sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -13,82 +15,9 @@ import os
 from src.shared.email_verification_service import EmailVerificationService
 from src.shared.config import config
 
-def lambda_handler(event, context):
-    """
-    Handle email verification requests from API Gateway.
-    
-    Expected event structure:
-    {
-        "queryStringParameters": {
-            "token": "verification-token-uuid"
-        }
-    }
-    """
-    
-    # CORS headers
-    headers = {
-        'Content-Type': 'text/html',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type',
-        'Access-Control-Allow-Methods': 'GET, OPTIONS'
-    }
-    
-    try:
-        # Handle preflight OPTIONS request
-        if event.get('httpMethod') == 'OPTIONS':
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({'message': 'CORS preflight'})
-            }
-        
-        # Validate environment variables
-        if not config.validate_required_env_vars():
-            return {
-                'statusCode': 500,
-                'headers': headers,
-                'body': get_error_html('Server configuration error')
-            }
-        
-        # Get verification token from query parameters
-        query_params = event.get('queryStringParameters') or {}
-        verification_token = query_params.get('token')
-        
-        if not verification_token:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': get_error_html('Verification token is required')
-            }
-        
-        # Verify the email
-        verification_service = EmailVerificationService()
-        result = verification_service.verify_email(verification_token)
-        
-        if result['success']:
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': get_success_html(result['email'])
-            }
-        else:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': get_error_html(result['message'])
-            }
-    
-    except Exception as e:
-        print(f"Error in verification handler: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': get_error_html('Internal server error')
-        }
-
-def get_success_html(email: str) -> str:
-    """Generate success HTML page."""
-    return f"""
+# Page markup is built once per container; requests only substitute the
+# escaped email or error message.
+_SUCCESS_HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -164,9 +93,7 @@ def get_success_html(email: str) -> str:
     </html>
     """
 
-def get_error_html(error_message: str) -> str:
-    """Generate error HTML page."""
-    return f"""
+_ERROR_HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -248,4 +175,108 @@ def get_error_html(error_message: str) -> str:
         </div>
     </body>
     </html>
-    """ 
\ No newline at end of file
+    """
+
+# When set (the website's CloudFront origin), verification outcomes redirect
+# to the static verify-success.html / verify-error.html pages instead of
+# rendering HTML here.
+_VERIFY_PAGE_BASE_URL = os.getenv('VERIFY_PAGE_BASE_URL', '').rstrip('/')
+
+# The static error page only accepts these codes and shows its own text for
+# each, so nothing caller-supplied is rendered from the query string.
+_ERROR_CODES = {
+    'Verification token is required': 'missing_token',
+    'Verification token has expired': 'expired',
+    'Invalid or expired verification token': 'invalid',
+}
+
+def _redirect(headers: dict, page: str, params: dict = None) -> dict:
+    """Send the browser to a static verification page."""
+    location = f"{_VERIFY_PAGE_BASE_URL}/{page}"
+    if params:
+        location = f"{location}?{urlencode(params)}"
+    return {
+        'statusCode': 302,
+        'headers': {**headers, 'Location': location},
+        'body': ''
+    }
+
+def _html_response(status_code: int, headers: dict, body: str) -> dict:
+    """Build the proxy response for a rendered page."""
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': body
+    }
+
+def lambda_handler(event, context):
+    """
+    Handle email verification requests from API Gateway.
+    
+    Expected event structure:
+    {
+        "queryStringParameters": {
+            "token": "verification-token-uuid"
+        }
+    }
+    """
+    
+    # CORS headers
+    headers = {
+        'Content-Type': 'text/html',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Allow-Methods': 'GET, OPTIONS'
+    }
+    
+    # Scheduled keep-warm ping; return before touching config or AWS clients
+    if event.get('warmer'):
+        return {'statusCode': 200, 'body': 'warm'}
+    
+    try:
+        # Handle preflight OPTIONS request
+        if event.get('httpMethod') == 'OPTIONS':
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps({'message': 'CORS preflight'})
+            }
+        
+        # Validate environment variables
+        if not config.validate_required_env_vars():
+            return _html_response(500, headers, get_error_html('Server configuration error'))
+        
+        # Get verification token from query parameters
+        query_params = event.get('queryStringParameters') or {}
+        verification_token = query_params.get('token')
+        
+        if not verification_token:
+            if _VERIFY_PAGE_BASE_URL:
+                return _redirect(headers, 'verify-error.html', {'code': 'missing_token'})
+            return _html_response(400, headers, get_error_html('Verification token is required'))
+        
+        # Verify the email
+        verification_service = EmailVerificationService()
+        result = verification_service.verify_email(verification_token)
+        
+        if _VERIFY_PAGE_BASE_URL:
+            if result['success']:
+                return _redirect(headers, 'verify-success.html')
+            return _redirect(headers, 'verify-error.html', {'code': _ERROR_CODES.get(result['message'], 'failed')})
+        
+        if result['success']:
+            return _html_response(200, headers, get_success_html(result['email']))
+        else:
+            return _html_response(400, headers, get_error_html(result['message']))
+    
+    except Exception as e:
+        print(f"Error in verification handler: {str(e)}")
+        return _html_response(500, headers, get_error_html('Internal server error'))
+
+def get_success_html(email: str) -> str:
+    """Generate success HTML page."""
+    return _SUCCESS_HTML_TEMPLATE.format(email=html.escape(email))
+
+def get_error_html(error_message: str) -> str:
+    """Generate error HTML page."""
+    return _ERROR_HTML_TEMPLATE.format(error_message=html.escape(error_message))
@@ -1,6 +1,7 @@
 import os
 import json
 import boto3
+from functools import lru_cache
 from typing import List, Optional
 
 class LambdaConfig:
@@ -26,6 +27,10 @@ class LambdaConfig:
         
         # Email Configuration
         self.from_email = os.getenv("FROM_EMAIL", "digest@genai-tweets.com")
+        # Optional SES template for verification emails; inline bodies are sent when unset
+        self.verification_email_template = os.getenv("VERIFICATION_EMAIL_TEMPLATE", "")
+        # HMAC key for signed verification tokens; random UUID tokens when unset
+        self.verification_signing_key = os.getenv("VERIFICATION_SIGNING_KEY", "")
         
         # S3 Configuration
         self.s3_bucket = os.getenv("S3_BUCKET", "genai-tweets-digest")
@@ -37,11 +42,59 @@ class LambdaConfig:
         
         # API Gateway Configuration
         self.api_gateway_url = os.getenv("API_GATEWAY_URL", "")
+        # Fallback set during deployment; read once rather than per link built
+        self.api_base_url = os.getenv("API_BASE_URL", "https://dzin6h5zvf.execute-api.us-east-1.amazonaws.com/production")
         
-        # Initialize AWS clients
-        self.s3_client = boto3.client('s3', region_name=self.aws_region)
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.aws_region)
-        self.ses_client = boto3.client('ses', region_name=self.aws_region)
+        # AWS clients are built on first access so each handler only pays
+        # for the ones it uses (the verify endpoint never touches S3)
+        self._s3_client = None
+        self._dynamodb = None
+        self._ses_client = None
+    
+    @property
+    def s3_client(self):
+        """S3 client, created on first use."""
+        if self._s3_client is None:
+            self._s3_client = boto3.client('s3', region_name=self.aws_region)
+        return self._s3_client
+    
+    @s3_client.setter
+    def s3_client(self, value):
+        self._s3_client = value
+    
+    @s3_client.deleter
+    def s3_client(self):
+        self._s3_client = None
+    
+    @property
+    def dynamodb(self):
+        """DynamoDB resource, created on first use."""
+        if self._dynamodb is None:
+            self._dynamodb = boto3.resource('dynamodb', region_name=self.aws_region)
+        return self._dynamodb
+    
+    @dynamodb.setter
+    def dynamodb(self, value):
+        self._dynamodb = value
+    
+    @dynamodb.deleter
+    def dynamodb(self):
+        self._dynamodb = None
+    
+    @property
+    def ses_client(self):
+        """SES client, created on first use."""
+        if self._ses_client is None:
+            self._ses_client = boto3.client('ses', region_name=self.aws_region)
+        return self._ses_client
+    
+    @ses_client.setter
+    def ses_client(self, value):
+        self._ses_client = value
+    
+    @ses_client.deleter
+    def ses_client(self):
+        self._ses_client = None
     
     def get_influential_accounts(self) -> List[str]:
         """Load influential accounts from S3."""
@@ -79,12 +132,16 @@ class LambdaConfig:
     
     def get_api_base_url(self) -> str:
         """Get the API Gateway base URL for generating links."""
-        if self.api_gateway_url:
-            return self.api_gateway_url
-        
-        # Fallback: try to construct from environment
-        # This would be set during deployment
-        return os.getenv("API_BASE_URL", "https://dzin6h5zvf.execute-api.us-east-1.amazonaws.com/production")
+        return self.api_gateway_url or self.api_base_url
+
+@lru_cache(maxsize=1)
+def get_config() -> LambdaConfig:
+    """Return the process-wide config, built on first use."""
+    return LambdaConfig()
 
-# Global config instance
-config = LambdaConfig() 
\ No newline at end of file
+def __getattr__(name: str):
+    # ``from .config import config`` keeps working without building the
+    # config at import time
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
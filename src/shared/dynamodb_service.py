@@ -4,12 +4,15 @@ Replaces the SQLAlchemy database models with serverless DynamoDB.
 """
 
 import boto3
+import re
 import uuid
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from botocore.exceptions import ClientError
 from .config import config
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class SubscriberService:
     """Manage subscribers in DynamoDB."""
     
@@ -133,6 +136,4 @@ class SubscriberService:
 
 def validate_email(email: str) -> bool:
     """Simple email validation."""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None 
\ No newline at end of file
+    return _EMAIL_RE.match(email) is not None 
\ No newline at end of file
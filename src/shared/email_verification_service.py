@@ -2,34 +2,67 @@
 Email verification service for double opt-in subscriptions.
 """
 
-import boto3
+import base64
+import hashlib
+import hmac
+import time
 import uuid
 import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 from .config import config
 
-class EmailVerificationService:
-    """Manage email verification for subscribers."""
-    
-    def __init__(self):
-        self.dynamodb = config.dynamodb
-        self.ses = boto3.client('ses', region_name=config.aws_region)
-        self.table_name = config.subscribers_table
-        self.table = self.dynamodb.Table(self.table_name)
-        self.from_email = config.from_email
-    
-    def send_verification_email(self, email: str, verification_token: str) -> bool:
-        """Send verification email to the subscriber."""
-        
-        # Create verification URL using the actual API Gateway URL
-        verification_url = f"{config.get_api_base_url()}/verify?token={verification_token}"
-        
-        # Email content
-        subject = "Confirm your subscription to GenAI Weekly Digest"
-        
-        html_body = f"""
+# Global secondary indexes on the subscribers table (see the CloudFormation
+# template); lookups query these instead of scanning every subscriber.
+VERIFICATION_TOKEN_INDEX = 'VerificationTokenIndex'
+EMAIL_INDEX = 'EmailIndex'
+
+# Lifetime of a verification link. The epoch expiry is also the table's TTL
+# attribute, so unconfirmed sign-ups are removed by DynamoDB.
+VERIFICATION_TTL_SECONDS = 24 * 60 * 60
+
+# Link scanners and mail previews often fetch the verification URL several
+# times in a row; successful results are remembered briefly per container.
+VERIFY_CACHE_TTL_SECONDS = 60
+VERIFY_CACHE_MAX_SIZE = 10000
+_verify_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _verify_cache_key(verification_token: str) -> str:
+    return hashlib.sha256(verification_token.encode()).hexdigest()[:32]
+
+
+def _get_cached_verification(key: str) -> Optional[Dict[str, Any]]:
+    entry = _verify_cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() > entry[0]:
+        _verify_cache.pop(key, None)
+        return None
+    return entry[1]
+
+
+def _cache_verification(key: str, result: Dict[str, Any]) -> None:
+    now = time.monotonic()
+    if len(_verify_cache) >= VERIFY_CACHE_MAX_SIZE:
+        for stale in [k for k, (expires, _) in _verify_cache.items() if expires < now]:
+            del _verify_cache[stale]
+        if len(_verify_cache) >= VERIFY_CACHE_MAX_SIZE:
+            # Oldest insert goes first
+            del _verify_cache[next(iter(_verify_cache))]
+    _verify_cache[key] = (now + VERIFY_CACHE_TTL_SECONDS, result)
+
+
+# Verification email content. Placeholders use SES template syntax so the
+# same text backs both the inline send and the VerificationEmailTemplate SES
+# template in the CloudFormation stack; keep the two in sync.
+VERIFICATION_EMAIL_SUBJECT = "Confirm your subscription to GenAI Weekly Digest"
+
+VERIFICATION_EMAIL_HTML = """
         <html>
         <head></head>
         <body>
@@ -38,7 +71,7 @@ class EmailVerificationService:
             <p>To complete your subscription, please click the button below to verify your email address:</p>
             
             <div style="text-align: center; margin: 30px 0;">
-                <a href="{verification_url}" 
+                <a href="{{verification_url}}" 
                    style="background-color: #4CAF50; color: white; padding: 15px 32px; 
                           text-decoration: none; display: inline-block; border-radius: 4px; 
                           font-size: 16px;">
@@ -47,7 +80,7 @@ class EmailVerificationService:
             </div>
             
             <p>Or copy and paste this link into your browser:</p>
-            <p><a href="{verification_url}">{verification_url}</a></p>
+            <p><a href="{{verification_url}}">{{verification_url}}</a></p>
             
             <p>This verification link will expire in 24 hours.</p>
             
@@ -60,14 +93,14 @@ class EmailVerificationService:
         </body>
         </html>
         """
-        
-        text_body = f"""
+
+VERIFICATION_EMAIL_TEXT = """
         Welcome to GenAI Weekly Digest!
         
         Thank you for subscribing to our weekly digest of the latest in Generative AI.
         
         To complete your subscription, please visit this link to verify your email address:
-        {verification_url}
+        {{verification_url}}
         
         This verification link will expire in 24 hours.
         
@@ -76,18 +109,133 @@ class EmailVerificationService:
         ---
         GenAI Weekly Digest - Your weekly dose of AI insights
         """
+
+def _render(template: str, verification_url: str) -> str:
+    return template.replace('{{verification_url}}', verification_url)
+
+
+def _build_verification_mime(from_email: str, to_email: str, verification_url: str) -> bytes:
+    """Serialize the verification email as multipart/alternative MIME."""
+    msg = EmailMessage()
+    msg['Subject'] = VERIFICATION_EMAIL_SUBJECT
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg.set_content(_render(VERIFICATION_EMAIL_TEXT, verification_url))
+    msg.add_alternative(_render(VERIFICATION_EMAIL_HTML, verification_url), subtype='html')
+    return msg.as_bytes()
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+_JWT_HEADER = _b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT'}, separators=(',', ':')).encode())
+
+
+def encode_verification_token(subscriber_id: str, email: str, expires_at_epoch: int, key: str) -> str:
+    """Issue an HS256 JWT naming the pending subscriber."""
+    payload = _b64url(json.dumps(
+        {'sub': subscriber_id, 'email': email, 'exp': expires_at_epoch},
+        separators=(',', ':')
+    ).encode())
+    signing_input = f"{_JWT_HEADER}.{payload}"
+    signature = hmac.new(key.encode(), signing_input.encode('ascii'), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+def decode_verification_token(token: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return the claims of a correctly signed token, or None.
+    
+    Expiry is not checked here so callers can tell expired links apart.
+    """
+    try:
+        header, payload, signature = token.split('.')
+        if header != _JWT_HEADER:
+            return None
+        expected = hmac.new(key.encode(), f"{header}.{payload}".encode('ascii'), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        claims = json.loads(_b64url_decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(claims, dict) or not {'sub', 'email', 'exp'} <= claims.keys():
+        return None
+    return claims
+
+
+@lru_cache(maxsize=8)
+def _get_table(dynamodb, table_name: str):
+    """Table handle per (resource, name), reused across warm invocations."""
+    return dynamodb.Table(table_name)
+
+
+def _utc_now() -> Tuple[datetime, int]:
+    """Return the current time as an aware UTC datetime and as epoch seconds.
+    
+    Both come from a single clock read so every timestamp written by one
+    request agrees. ISO strings built from it carry an explicit +00:00.
+    """
+    ts = time.time()
+    return datetime.fromtimestamp(ts, timezone.utc), int(ts)
+
+
+class EmailVerificationService:
+    """Manage email verification for subscribers."""
+    
+    def __init__(self):
+        self.dynamodb = config.dynamodb
+        self.ses = config.ses_client
+        self.table_name = config.subscribers_table
+        self.table = _get_table(self.dynamodb, self.table_name)
+        self.from_email = config.from_email
+        # Links differ only by token, so the prefix is resolved once
+        self.verify_url_base = f"{config.get_api_base_url()}/verify?token="
+        self.signing_key = config.verification_signing_key
+    
+    def _new_token(self, subscriber_id: str, email: str, expires_at_epoch: int) -> str:
+        """Signed token when a signing key is configured.
+        
+        Otherwise '<subscriber_id>.<random hex>': the prefix locates the row
+        and the stored token must still match in full.
+        """
+        if self.signing_key:
+            return encode_verification_token(subscriber_id, email, expires_at_epoch, self.signing_key)
+        return f"{subscriber_id}.{uuid.uuid4().hex}"
+    
+    def send_verification_email(self, email: str, verification_token: str) -> bool:
+        """Send verification email to the subscriber."""
+        
+        # Create verification URL using the actual API Gateway URL
+        verification_url = self.verify_url_base + verification_token
+        
+        if config.verification_email_template:
+            return self._send_templated_verification(email, verification_url)
         
         try:
-            response = self.ses.send_email(
+            response = self.ses.send_raw_email(
+                Source=self.from_email,
+                Destinations=[email],
+                RawMessage={'Data': _build_verification_mime(self.from_email, email, verification_url)}
+            )
+            print(f"Verification email sent to {email}. MessageId: {response['MessageId']}")
+            return True
+            
+        except ClientError as e:
+            print(f"Error sending verification email: {e}")
+            return False
+    
+    def _send_templated_verification(self, email: str, verification_url: str) -> bool:
+        """Send through the SES template so only the URL travels per message."""
+        try:
+            response = self.ses.send_templated_email(
                 Source=self.from_email,
                 Destination={'ToAddresses': [email]},
-                Message={
-                    'Subject': {'Data': subject, 'Charset': 'UTF-8'},
-                    'Body': {
-                        'Text': {'Data': text_body, 'Charset': 'UTF-8'},
-                        'Html': {'Data': html_body, 'Charset': 'UTF-8'}
-                    }
-                }
+                Template=config.verification_email_template,
+                TemplateData=json.dumps({'verification_url': verification_url})
             )
             print(f"Verification email sent to {email}. MessageId: {response['MessageId']}")
             return True
@@ -99,11 +247,16 @@ class EmailVerificationService:
     def create_pending_subscriber(self, email: str) -> Dict[str, Any]:
         """Create a pending subscriber with verification token."""
         
-        # Generate verification token
-        verification_token = str(uuid.uuid4())
         subscriber_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
-        expires_at = (datetime.now() + timedelta(hours=24)).isoformat()
+        now, now_epoch = _utc_now()
+        timestamp = now.isoformat()
+        # Expiry is enforced on the epoch attribute; the ISO copy is for people
+        # reading the table and only consulted for rows that lack the epoch
+        expires_at = (now + timedelta(seconds=VERIFICATION_TTL_SECONDS)).isoformat()
+        expires_at_epoch = now_epoch + VERIFICATION_TTL_SECONDS
+        
+        # Generate verification token
+        verification_token = self._new_token(subscriber_id, email, expires_at_epoch)
         
         try:
             # Store with pending status
@@ -114,6 +267,7 @@ class EmailVerificationService:
                     'status': 'pending_verification',
                     'verification_token': verification_token,
                     'verification_expires_at': expires_at,
+                    'verification_expires_at_epoch': expires_at_epoch,
                     'subscribed_at': timestamp,
                     'created_at': timestamp,
                     'updated_at': timestamp
@@ -150,50 +304,105 @@ class EmailVerificationService:
     def verify_email(self, verification_token: str) -> Dict[str, Any]:
         """Verify email using the verification token."""
         
+        cache_key = _verify_cache_key(verification_token)
+        cached = _get_cached_verification(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        now, now_epoch = _utc_now()
+        now_iso = now.isoformat()
+        # Pre-migration expiries were written as naive ISO strings
+        legacy_now_iso = now.replace(tzinfo=None).isoformat()
+        
         try:
-            # Find subscriber by verification token
-            response = self.table.scan(
-                FilterExpression='verification_token = :token AND #status = :status',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':token': verification_token,
-                    ':status': 'pending_verification'
-                }
-            )
-            
-            if not response['Items']:
-                return {
-                    'success': False,
-                    'message': 'Invalid or expired verification token'
-                }
-            
-            subscriber = response['Items'][0]
+            dots = verification_token.count('.')
+            if self.signing_key and dots == 2:
+                # Signed tokens name their subscriber, so bad or expired links
+                # are rejected without touching DynamoDB
+                claims = decode_verification_token(verification_token, self.signing_key)
+                if claims is None:
+                    return {
+                        'success': False,
+                        'message': 'Invalid or expired verification token'
+                    }
+                if claims['exp'] <= now_epoch:
+                    return {
+                        'success': False,
+                        'message': 'Verification token has expired'
+                    }
+                subscriber_id = claims['sub']
+            elif dots == 1:
+                # '<subscriber_id>.<secret>' tokens locate their row directly
+                subscriber_id = verification_token.split('.', 1)[0]
+            else:
+                # Tokens issued as bare UUIDs are found through the token index
+                response = self.table.query(
+                    IndexName=VERIFICATION_TOKEN_INDEX,
+                    KeyConditionExpression=Key('verification_token').eq(verification_token),
+                    FilterExpression=Attr('status').eq('pending_verification')
+                )
+                
+                if not response['Items']:
+                    return {
+                        'success': False,
+                        'message': 'Invalid or expired verification token'
+                    }
+                
+                subscriber_id = response['Items'][0]['subscriber_id']
             
-            # Check if token has expired
-            expires_at = datetime.fromisoformat(subscriber['verification_expires_at'])
-            if datetime.now() > expires_at:
+            # Activate only if the token is still pending and unexpired. TTL
+            # deletion can lag, and concurrent clicks race, so DynamoDB
+            # enforces both in the same write.
+            try:
+                response = self.table.update_item(
+                    Key={'subscriber_id': subscriber_id},
+                    UpdateExpression='SET #status = :status, verified_at = :verified_at, updated_at = :updated_at REMOVE verification_token, verification_expires_at, verification_expires_at_epoch',
+                    # Rows written before the epoch attribute existed only carry
+                    # the naive ISO expiry, which orders correctly as a string
+                    ConditionExpression='#status = :pending AND verification_token = :token AND '
+                                        '(verification_expires_at_epoch > :now OR '
+                                        '(attribute_not_exists(verification_expires_at_epoch) AND verification_expires_at > :legacy_now))',
+                    ExpressionAttributeNames={'#status': 'status'},
+                    ExpressionAttributeValues={
+                        ':status': 'active',
+                        ':pending': 'pending_verification',
+                        ':token': verification_token,
+                        ':now': now_epoch,
+                        ':legacy_now': legacy_now_iso,
+                        ':verified_at': now_iso,
+                        ':updated_at': now_iso
+                    },
+                    ReturnValues='ALL_NEW',
+                    ReturnValuesOnConditionCheckFailure='ALL_OLD'
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                # The failed write hands back the row as it was (low-level format)
+                old = e.response.get('Item') or {}
+                expires_at_epoch = old.get('verification_expires_at_epoch', {}).get('N')
+                legacy_expires_at = old.get('verification_expires_at', {}).get('S')
+                token_matches = old.get('verification_token', {}).get('S') == verification_token
+                if expires_at_epoch is not None:
+                    expired = int(expires_at_epoch) <= now_epoch
+                else:
+                    expired = legacy_expires_at is not None and legacy_expires_at <= legacy_now_iso
+                if token_matches and expired:
+                    message = 'Verification token has expired'
+                else:
+                    message = 'Invalid or expired verification token'
                 return {
                     'success': False,
-                    'message': 'Verification token has expired'
+                    'message': message
                 }
             
-            # Update subscriber status to active
-            self.table.update_item(
-                Key={'subscriber_id': subscriber['subscriber_id']},
-                UpdateExpression='SET #status = :status, verified_at = :verified_at, updated_at = :updated_at REMOVE verification_token, verification_expires_at',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':status': 'active',
-                    ':verified_at': datetime.now().isoformat(),
-                    ':updated_at': datetime.now().isoformat()
-                }
-            )
-            
-            return {
+            result = {
                 'success': True,
                 'message': 'Email verified successfully! You are now subscribed.',
-                'email': subscriber['email']
+                'email': response['Attributes']['email']
             }
+            _cache_verification(cache_key, result)
+            return dict(result)
             
         except ClientError as e:
             print(f"Error verifying email: {e}")
@@ -207,13 +416,10 @@ class EmailVerificationService:
         
         try:
             # Find pending subscriber
-            response = self.table.scan(
-                FilterExpression='email = :email AND #status = :status',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':email': email,
-                    ':status': 'pending_verification'
-                }
+            response = self.table.query(
+                IndexName=EMAIL_INDEX,
+                KeyConditionExpression=Key('email').eq(email),
+                FilterExpression=Attr('status').eq('pending_verification')
             )
             
             if not response['Items']:
@@ -225,17 +431,20 @@ class EmailVerificationService:
             subscriber = response['Items'][0]
             
             # Generate new token and extend expiry
-            new_token = str(uuid.uuid4())
-            new_expires_at = (datetime.now() + timedelta(hours=24)).isoformat()
+            now, now_epoch = _utc_now()
+            new_expires_at = (now + timedelta(seconds=VERIFICATION_TTL_SECONDS)).isoformat()
+            new_expires_at_epoch = now_epoch + VERIFICATION_TTL_SECONDS
+            new_token = self._new_token(subscriber['subscriber_id'], email, new_expires_at_epoch)
             
             # Update with new token
             self.table.update_item(
                 Key={'subscriber_id': subscriber['subscriber_id']},
-                UpdateExpression='SET verification_token = :token, verification_expires_at = :expires, updated_at = :updated_at',
+                UpdateExpression='SET verification_token = :token, verification_expires_at = :expires, verification_expires_at_epoch = :expires_epoch, updated_at = :updated_at',
                 ExpressionAttributeValues={
                     ':token': new_token,
                     ':expires': new_expires_at,
-                    ':updated_at': datetime.now().isoformat()
+                    ':expires_epoch': new_expires_at_epoch,
+                    ':updated_at': now.isoformat()
                 }
             )
             
@@ -5,20 +5,78 @@ Minimal version focused on supporting visual tweet capture.
 
 import tweepy
 import google.generativeai as genai
+import gzip
 import json
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any, Optional
 from tweepy.errors import TweepyException
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .config import config
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover – falls back to the stdlib encoder
+    orjson = None
+
+# Tweet ID patterns, most specific first
+_TWEET_ID_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'twitter\.com/\w+/status/(\d+)',  # https://twitter.com/user/status/123
+    r'x\.com/\w+/status/(\d+)',       # https://x.com/user/status/123
+    r'/status/(\d+)',                 # /status/123
+    r'(\d{19})',                      # Raw tweet ID (19 digits)
+))
+
+# Fields in the categorization model's reply
+_CATEGORY_RE = re.compile(r'Category:\s*(.+)')
+_CONFIDENCE_RE = re.compile(r'Confidence:\s*([\d.]+)')
+
+# Tweets categorized per Gemini request
+_CATEGORIZE_BATCH_SIZE = 20
+# Markdown code fence Gemini sometimes wraps JSON replies in
+_CODE_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+# Concurrent per-user fetches; the API is I/O bound so threads overlap the round trips
+_MAX_FETCH_WORKERS = 8
+# Concurrent per-category summaries, one per digest category
+_MAX_SUMMARY_WORKERS = 5
+# Requests allowed in flight at once, matching the 15-request rate-limit window
+_MAX_CONCURRENT_REQUESTS = 15
+# Usernames accepted by a single GET /2/users/by lookup
+_USER_LOOKUP_BATCH_SIZE = 100
+# Lower-cased username -> (resolved_at, user ID); survives warm Lambda invocations
+_USER_ID_CACHE: Dict[str, tuple] = {}
+# Re-resolve cached IDs after a day so renamed accounts are eventually picked up
+_USER_ID_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+def _created_at(tweet) -> Optional[str]:
+    """Tweet creation time in datetime.isoformat() form, rewritten from the API's raw string when present."""
+    raw = getattr(tweet, 'data', None)
+    value = raw.get('created_at') if isinstance(raw, dict) else None
+    # The API sends '2024-05-01T12:00:00.000Z'; stored records and the sorts over
+    # them expect isoformat's '2024-05-01T12:00:00+00:00', so splice the string
+    # into that shape rather than formatting the parsed datetime
+    if isinstance(value, str) and len(value) == 24 and value[19] == '.' and value[23] == 'Z':
+        millis = value[19:23]
+        return value[:19] + ('' if millis == '.000' else millis + '000') + '+00:00'
+    return tweet.created_at.isoformat() if tweet.created_at else None
+
+def _json_default(value: Any) -> str:
+    """Encode values JSON lacks; dates use ISO format to match orjson's output."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
 class TweetFetcher:
     """Basic tweet fetcher for visual capture support."""
     
     def __init__(self):
         # v2 API client for basic functionality
         self.client_v2 = tweepy.Client(bearer_token=config.twitter_bearer_token)
+        self._request_slots = threading.BoundedSemaphore(_MAX_CONCURRENT_REQUESTS)
     
     def fetch_tweet_by_url(self, tweet_url: str) -> Optional[Dict[str, Any]]:
         """
@@ -79,7 +137,7 @@ class TweetFetcher:
                         'username': author_username,
                         'name': author_name
                     },
-                    'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
+                    'created_at': _created_at(tweet),
                     'conversation_id': str(tweet.conversation_id) if hasattr(tweet, 'conversation_id') else tweet_id,
                     'metrics': {
                         'likes': tweet.public_metrics.get('like_count', 0),
@@ -100,16 +158,15 @@ class TweetFetcher:
     
     def _extract_tweet_id_from_url(self, url: str) -> Optional[str]:
         """Extract tweet ID from various Twitter URL formats."""
-        # Common Twitter URL patterns
-        patterns = [
-            r'twitter\.com/\w+/status/(\d+)',  # https://twitter.com/user/status/123
-            r'x\.com/\w+/status/(\d+)',       # https://x.com/user/status/123
-            r'/status/(\d+)',                 # /status/123
-            r'(\d{19})',                      # Raw tweet ID (19 digits)
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        # A bare ID or a non-status string can skip the URL patterns entirely
+        if len(url) == 19 and url.isdigit():
+            return url
+        if '/status/' not in url:
+            match = _TWEET_ID_PATTERNS[-1].search(url)
+            return match.group(1) if match else None
+        
+        for pattern in _TWEET_ID_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
         
@@ -288,6 +345,12 @@ class TweetFetcher:
         author_username = base_tweet['author']['username']
         author_id = base_tweet['author']['id']
         
+        # A conversation root nobody replied to cannot have thread continuations,
+        # so skip the rate-limited search call
+        if conversation_id == base_tweet['id'] and not base_tweet['metrics']['replies']:
+            print(f"📝 Single tweet thread (no replies to search)")
+            return base_tweet
+        
         print(f"🧵 Fetching complete thread for conversation {conversation_id}")
         
         try:
@@ -314,7 +377,7 @@ class TweetFetcher:
                     tweet_data = {
                         'id': str(tweet.id),
                         'text': tweet.text,
-                        'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
+                        'created_at': _created_at(tweet),
                         'metrics': {
                             'likes': tweet.public_metrics.get('like_count', 0),
                             'retweets': tweet.public_metrics.get('retweet_count', 0),
@@ -329,17 +392,19 @@ class TweetFetcher:
             # Sort tweets by creation time (chronological order)
             thread_tweets.sort(key=lambda x: x['created_at'])
             
-            # Create thread summary
-            total_likes = sum(t['metrics']['likes'] for t in thread_tweets)
-            total_retweets = sum(t['metrics']['retweets'] for t in thread_tweets)
-            total_replies = sum(t['metrics']['replies'] for t in thread_tweets)
-            total_quotes = sum(t['metrics']['quotes'] for t in thread_tweets)
-            total_bookmarks = sum(t['metrics']['bookmarks'] for t in thread_tweets)
-            total_impressions = sum(t['metrics']['impressions'] for t in thread_tweets)
-            
-            # Combine thread text with numbering
+            # Create thread summary and numbered text in a single pass
+            total_likes = total_retweets = total_replies = 0
+            total_quotes = total_bookmarks = total_impressions = 0
             combined_text_parts = []
+            
             for i, tweet in enumerate(thread_tweets, 1):
+                metrics = tweet['metrics']
+                total_likes += metrics['likes']
+                total_retweets += metrics['retweets']
+                total_replies += metrics['replies']
+                total_quotes += metrics['quotes']
+                total_bookmarks += metrics['bookmarks']
+                total_impressions += metrics['impressions']
                 combined_text_parts.append(f"[{i}/{len(thread_tweets)}] {tweet['text']}")
             
             combined_text = "\n\n".join(combined_text_parts)
@@ -373,7 +438,8 @@ class TweetFetcher:
             print(f"❌ Error fetching thread: {e}")
             return base_tweet  # Fall back to single tweet
 
-    def detect_and_group_threads(self, username: str, days_back: int = 7, max_tweets: int = 25) -> List[Dict[str, Any]]:
+    def detect_and_group_threads(self, username: str, days_back: int = 7, max_tweets: int = 25,
+                                 user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Fetch recent tweets and group them by threads.
         
@@ -381,6 +447,7 @@ class TweetFetcher:
             username: Twitter username (without @)
             days_back: How many days back to search
             max_tweets: Maximum number of tweets to return (should be high enough for complete threads)
+            user_id: Already-resolved user ID; skips the get_user lookup when given
             
         Returns:
             List of tweet data (individual tweets or complete threads)
@@ -393,13 +460,15 @@ class TweetFetcher:
         # First get all recent tweets with conversation_id
         try:
             # Get user ID
-            user = self.client_v2.get_user(username=username)
-            if not user.data:
-                print(f"❌ User not found: {username}")
-                return []
-            
-            user_id = user.data.id
+            if user_id is None:
+                user = self.client_v2.get_user(username=username)
+                if not user.data:
+                    print(f"❌ User not found: {username}")
+                    return []
+                
+                user_id = user.data.id
             print(f"✅ Found user @{username} (ID: {user_id})")
+            user_id_str = str(user_id)
             
             # Calculate date range
             end_time = datetime.utcnow()
@@ -428,10 +497,8 @@ class TweetFetcher:
             # Group tweets by conversation_id
             conversation_groups = {}
             for tweet in tweets.data:
-                conv_id = str(tweet.conversation_id) if hasattr(tweet, 'conversation_id') else str(tweet.id)
-                if conv_id not in conversation_groups:
-                    conversation_groups[conv_id] = []
-                conversation_groups[conv_id].append(tweet)
+                conv_id = str(getattr(tweet, 'conversation_id', None) or tweet.id)
+                conversation_groups.setdefault(conv_id, []).append(tweet)
             
             # Process each conversation group
             grouped_results = []
@@ -445,11 +512,11 @@ class TweetFetcher:
                         'url': f"https://twitter.com/{username}/status/{tweet.id}",
                         'text': tweet.text,
                         'author': {
-                            'id': str(user_id),
+                            'id': user_id_str,
                             'username': username,
                             'name': username
                         },
-                        'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
+                        'created_at': _created_at(tweet),
                         'conversation_id': conv_id,
                         'is_thread': False,
                         'metrics': {
@@ -471,6 +538,7 @@ class TweetFetcher:
                     
                     # Process tweets (convert API objects to dicts)
                     thread_tweets = []
+                    combined_text_parts = []
                     total_likes = total_retweets = total_replies = 0
                     total_quotes = total_bookmarks = total_impressions = 0
                     
@@ -479,7 +547,7 @@ class TweetFetcher:
                         tweet_data = {
                             'id': str(tweet.id),
                             'text': tweet.text,
-                            'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
+                            'created_at': _created_at(tweet),
                             'metrics': {
                                 'likes': tweet.public_metrics.get('like_count', 0),
                                 'retweets': tweet.public_metrics.get('retweet_count', 0),
@@ -498,11 +566,9 @@ class TweetFetcher:
                         total_quotes += tweet_data['metrics']['quotes']
                         total_bookmarks += tweet_data['metrics']['bookmarks']
                         total_impressions += tweet_data['metrics']['impressions']
-                    
-                    # Combine thread text with numbering
-                    combined_text_parts = []
-                    for i, tweet_data in enumerate(thread_tweets, 1):
-                        combined_text_parts.append(f"[{i}/{len(thread_tweets)}] {tweet_data['text']}")
+                        
+                        # Number thread text as we go
+                        combined_text_parts.append(f"[{len(thread_tweets)}/{len(conv_tweets)}] {tweet.text}")
                     
                     combined_text = "\n\n".join(combined_text_parts)
                     
@@ -514,7 +580,7 @@ class TweetFetcher:
                         'url': f"https://twitter.com/{username}/status/{main_tweet['id']}",
                         'text': combined_text,
                         'author': {
-                            'id': str(user_id),
+                            'id': user_id_str,
                             'username': username,
                             'name': username
                         },
@@ -550,10 +616,86 @@ class TweetFetcher:
             print(f"❌ Error detecting threads for @{username}: {e}")
             return []
 
+    def _lookup_user_ids(self, usernames: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Resolve usernames to user IDs with batched GET /2/users/by calls.
+        
+        IDs resolved within the last day are served from a module-level
+        cache, so warm invocations only look up accounts they have not seen.
+        
+        Args:
+            usernames: List of Twitter usernames (without @)
+            
+        Returns:
+            Mapping of lower-cased username to user ID (unknown users are
+            absent), or None if the batch lookup failed
+        """
+        now = time.time()
+        user_ids = {}
+        missing = []
+        for username in usernames:
+            cached = _USER_ID_CACHE.get(username.lower())
+            if cached and now - cached[0] < _USER_ID_CACHE_TTL_SECONDS:
+                user_ids[username.lower()] = cached[1]
+            else:
+                missing.append(username)
+        
+        try:
+            for start in range(0, len(missing), _USER_LOOKUP_BATCH_SIZE):
+                batch = missing[start:start + _USER_LOOKUP_BATCH_SIZE]
+                with self._request_slots:
+                    response = self.client_v2.get_users(usernames=batch)
+                for user in response.data or []:
+                    user_ids[user.username.lower()] = user.id
+                    _USER_ID_CACHE[user.username.lower()] = (now, user.id)
+        except Exception as e:
+            print(f"⚠️ Batch user lookup failed, falling back to per-user lookups: {e}")
+            return None
+        
+        return user_ids
+
+    def _fetch_for_user(self, username: str, days_back: int = 7, max_tweets_per_user: int = 10,
+                        user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch grouped tweets for a single user; never raises.
+        
+        Args:
+            username: Twitter username (without @)
+            days_back: How many days back to search
+            max_tweets_per_user: Maximum tweets for this user
+            user_id: Already-resolved user ID, if known
+            
+        Returns:
+            List of tweet data dictionaries, empty on error
+        """
+        try:
+            with self._request_slots:
+                # Use thread detection to get comprehensive tweet data
+                user_tweets = self.detect_and_group_threads(
+                    username=username, 
+                    days_back=days_back, 
+                    max_tweets=max_tweets_per_user,
+                    user_id=user_id
+                )
+            
+            if user_tweets:
+                print(f"✅ @{username}: {len(user_tweets)} items")
+                return user_tweets
+            
+            print(f"📭 @{username}: No tweets found")
+            return []
+            
+        except Exception as e:
+            print(f"❌ Error fetching tweets for @{username}: {e}")
+            return []
+
     def fetch_tweets(self, usernames: List[str], days_back: int = 7, max_tweets_per_user: int = 10) -> List[Dict[str, Any]]:
         """
         Fetch tweets from multiple users for digest generation.
         
+        Users are fetched concurrently on a small thread pool, so total
+        latency tracks the slowest account rather than the sum of all of them.
+        
         Args:
             usernames: List of Twitter usernames (without @)
             days_back: How many days back to search
@@ -565,24 +707,23 @@ class TweetFetcher:
         print(f"🔍 Fetching tweets from {len(usernames)} accounts")
         all_tweets = []
         
-        for username in usernames:
-            try:
-                # Use thread detection to get comprehensive tweet data
-                user_tweets = self.detect_and_group_threads(
-                    username=username, 
-                    days_back=days_back, 
-                    max_tweets=max_tweets_per_user
-                )
-                
-                if user_tweets:
-                    print(f"✅ @{username}: {len(user_tweets)} items")
+        if usernames:
+            # One lookup call per 100 accounts instead of one per account
+            user_ids = self._lookup_user_ids(usernames)
+            if user_ids is not None:
+                for username in usernames:
+                    if username.lower() not in user_ids:
+                        print(f"❌ User not found: {username}")
+                usernames = [u for u in usernames if u.lower() in user_ids]
+            
+            def fetch(username: str) -> List[Dict[str, Any]]:
+                user_id = user_ids.get(username.lower()) if user_ids is not None else None
+                return self._fetch_for_user(username, days_back, max_tweets_per_user, user_id)
+            
+            with ThreadPoolExecutor(max_workers=max(1, min(len(usernames), _MAX_FETCH_WORKERS))) as executor:
+                results = executor.map(fetch, usernames)
+                for user_tweets in results:
                     all_tweets.extend(user_tweets)
-                else:
-                    print(f"📭 @{username}: No tweets found")
-                    
-            except Exception as e:
-                print(f"❌ Error fetching tweets for @{username}: {e}")
-                continue
         
         # Sort all tweets by engagement (likes + retweets) descending
         all_tweets.sort(key=lambda x: x['metrics']['likes'] + x['metrics']['retweets'], reverse=True)
@@ -606,9 +747,37 @@ class TweetCategorizer:
             "Ethical discussions and regulations",
             "Tools and resources"
         ]
+        self._categories_set = frozenset(self.categories)
     
     def categorize_tweets(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Categorize tweets using Gemini."""
+        """Categorize tweets using Gemini, one request per batch of tweets."""
+        categorized_tweets = []
+        
+        for start in range(0, len(tweets), _CATEGORIZE_BATCH_SIZE):
+            chunk = tweets[start:start + _CATEGORIZE_BATCH_SIZE]
+            try:
+                results = self._categorize_batch(chunk)
+            except Exception as e:
+                print(f"Error categorizing batch of {len(chunk)} tweets: {e}")
+                results = None
+            
+            if results is None:
+                # Malformed or failed batch reply: categorize these tweets one by one
+                categorized_tweets.extend(self._categorize_individually(chunk))
+                continue
+            
+            for tweet, (category, confidence) in zip(chunk, results):
+                tweet_with_category = tweet.copy()
+                tweet_with_category.update({
+                    'category': category,
+                    'confidence': confidence
+                })
+                categorized_tweets.append(tweet_with_category)
+        
+        return categorized_tweets
+    
+    def _categorize_individually(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Categorize tweets with one Gemini request each."""
         categorized_tweets = []
         
         for tweet in tweets:
@@ -634,6 +803,57 @@ class TweetCategorizer:
         
         return categorized_tweets
     
+    def _categorize_batch(self, tweets: List[Dict[str, Any]]) -> Optional[List[tuple[str, float]]]:
+        """
+        Categorize several tweets with a single Gemini request.
+        
+        Returns:
+            (category, confidence) per tweet in input order, or None if the
+            reply is not a JSON array covering every tweet
+        """
+        numbered = "\n".join(f"{i}. {json.dumps(tweet['text'])}" for i, tweet in enumerate(tweets, 1))
+        prompt = f"""
+        Categorize each of these tweets about Generative AI into one of these categories:
+        1. New AI model releases
+        2. Breakthrough research findings
+        3. Applications and case studies
+        4. Ethical discussions and regulations
+        5. Tools and resources
+
+        Tweets:
+        {numbered}
+
+        Respond with only a JSON array containing one object per tweet in this format:
+        [{{"id": 1, "category": "[category name]", "confidence": 0.XX}}]
+        """
+        
+        response = self.model.generate_content(prompt)
+        try:
+            items = json.loads(_CODE_FENCE_RE.sub('', response.text.strip()))
+        except ValueError:
+            return None
+        if not isinstance(items, list):
+            return None
+        
+        results = {}
+        for item in items:
+            try:
+                index = int(item['id'])
+                category = item['category']
+                confidence = float(item.get('confidence', 0.5))
+            except (KeyError, TypeError, ValueError):
+                return None
+            
+            # Validate category
+            if category not in self._categories_set:
+                category = "Tools and resources"
+                confidence = 0.5
+            results[index] = (category, confidence)
+        
+        if any(i not in results for i in range(1, len(tweets) + 1)):
+            return None
+        return [results[i] for i in range(1, len(tweets) + 1)]
+    
     def _categorize_single_tweet(self, text: str) -> tuple[str, float]:
         """Categorize a single tweet."""
         prompt = f"""
@@ -655,14 +875,14 @@ class TweetCategorizer:
         response_text = response.text.strip()
         
         # Parse response
-        category_match = re.search(r'Category:\s*(.+)', response_text)
-        confidence_match = re.search(r'Confidence:\s*([\d.]+)', response_text)
+        category_match = _CATEGORY_RE.search(response_text)
+        confidence_match = _CONFIDENCE_RE.search(response_text)
         
         category = category_match.group(1).strip() if category_match else "Tools and resources"
         confidence = float(confidence_match.group(1)) if confidence_match else 0.5
         
         # Validate category
-        if category not in self.categories:
+        if category not in self._categories_set:
             category = "Tools and resources"
             confidence = 0.5
         
@@ -686,12 +906,17 @@ class TweetSummarizer:
         
         summaries = {}
         
-        for category, tweets in tweets_by_category.items():
-            if not tweets:
-                continue
-                
+        # Categories are independent, so their Gemini calls run concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(len(tweets_by_category), _MAX_SUMMARY_WORKERS))) as executor:
+            futures = {
+                category: executor.submit(self._generate_category_summary, category, tweets)
+                for category, tweets in tweets_by_category.items() if tweets
+            }
+        
+        for category, future in futures.items():
+            tweets = tweets_by_category[category]
             try:
-                summary = self._generate_category_summary(category, tweets)
+                summary = future.result()
                 summaries[category] = {
                     'summary': summary,
                     'tweet_count': len(tweets),
@@ -752,11 +977,15 @@ class S3DataManager:
         return digest_key
     
     def _save_json_to_s3(self, key: str, data: Any) -> None:
-        """Save JSON data to S3."""
-        json_data = json.dumps(data, indent=2, default=str)
+        """Save compact, gzip-encoded JSON data to S3."""
+        if orjson is not None:
+            json_data = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            json_data = json.dumps(data, separators=(',', ':'), default=_json_default).encode('utf-8')
         self.s3_client.put_object(
             Bucket=self.bucket,
             Key=key,
-            Body=json_data,
-            ContentType='application/json'
+            Body=gzip.compress(json_data, mtime=0),
+            ContentType='application/json',
+            ContentEncoding='gzip'
         ) 
\ No newline at end of file
@@ -50,6 +50,11 @@ from .config import config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns applied to scraped profile text
+_HANDLE_RE = re.compile(r'@(\w+)')
+_USERNAME_PATH_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_COUNT_RE = re.compile(r'([0-9,]+\.?[0-9]*[KMkm]?)')
+
 @dataclass
 class ProfileInfo:
     """Data class for Twitter profile information."""
@@ -457,8 +462,10 @@ class TwitterAccountDiscoveryService:
                     for element in text_elements:
                         try:
                             text = element.text
+                            if '@' not in text:
+                                continue
                             # Look for @username patterns
-                            at_handles = re.findall(r'@(\w+)', text)
+                            at_handles = _HANDLE_RE.findall(text)
                             for handle in at_handles:
                                 if handle != username:  # Don't include self
                                     discovered_handles.add(handle)
@@ -620,7 +627,7 @@ class TwitterAccountDiscoveryService:
                 return False
             
             # Username should be alphanumeric/underscore only
-            if not re.match(r'^[a-zA-Z0-9_]+$', path):
+            if not _USERNAME_PATH_RE.match(path):
                 return False
             
             return True
@@ -712,7 +719,7 @@ Response:"""
         
         try:
             # Extract number part (remove "Followers", "Following", etc.)
-            number_text = re.search(r'([0-9,]+\.?[0-9]*[KMkm]?)', text)
+            number_text = _COUNT_RE.search(text)
             if not number_text:
                 return None
             
@@ -19,8 +19,12 @@ Features:
 """
 
 import os
+import io
+import base64
+import re
 import json
 import time
+import random
 import boto3
 import tempfile
 import shutil
@@ -38,6 +42,10 @@ from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
 import logging
 
+# Silence webdriver-manager's per-install logging. WDM_LOCAL is deliberately not set:
+# the Lambda package directory is read-only.
+os.environ.setdefault('WDM_LOG_LEVEL', '0')
+
 from .tweet_services import TweetFetcher
 from .config import config
 
@@ -45,14 +53,52 @@ from .config import config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Browser setup errors that might resolve with retry
+_TRANSIENT_BROWSER_ERRORS = [
+    'timeout', 'connection', 'network', 'temporary', 'busy',
+    'resource temporarily unavailable', 'address already in use',
+    'chromedriver', 'webdriver', 'session not created'
+]
+_TRANSIENT_RE = re.compile("|".join(map(re.escape, _TRANSIENT_BROWSER_ERRORS)))
+
+# Browser setup errors that won't resolve with retry
+_PERMANENT_BROWSER_ERRORS = [
+    'chrome not found', 'executable not found', 'no such file',
+    'permission denied', 'access denied', 'not installed',
+    'unsupported chrome version'
+]
+_PERMANENT_RE = re.compile("|".join(map(re.escape, _PERMANENT_BROWSER_ERRORS)))
+
+# WebDriver errors meaning the browser itself is gone and must be recreated
+_DRIVER_DEAD_RE = re.compile(r'crashed|disconnected')
+
+# Retry delay ceiling (seconds) and attempt limit for uncategorized setup errors
+_MAX_RETRY_DELAY = 30.0
+_MAX_UNKNOWN_ERROR_ATTEMPTS = 2
+
+# Scrolls by arguments[0] and returns [offset before, offset after, page height, article count]
+# in one round trip
+_SCROLL_AND_MEASURE_JS = (
+    "var before = window.pageYOffset; window.scrollBy(0, arguments[0]); "
+    "return [before, window.pageYOffset, document.body.scrollHeight, "
+    "document.getElementsByTagName('article').length];"
+)
+
+# Page height and rendered article count, polled while waiting for a scroll to load content
+_CONTENT_STATE_JS = "return [document.body.scrollHeight, document.getElementsByTagName('article').length]"
+
 class VisualTweetCaptureService:
     """
     Production service for visual tweet capture with S3 storage.
     """
     
+    # Chromedriver path resolved once per process and shared by all instances
+    _chromedriver_path_cache: Optional[str] = None
+    
     def __init__(self, s3_bucket: str, zoom_percent: int = 60, crop_enabled: bool = False, 
                  crop_x1: int = 0, crop_y1: int = 0, crop_x2: int = 100, crop_y2: int = 100,
-                 max_browser_retries: int = 3, retry_delay: float = 2.0, retry_backoff: float = 2.0):
+                 max_browser_retries: int = 3, retry_delay: float = 2.0, retry_backoff: float = 2.0,
+                 disable_images: bool = False, png_compress_level: int = 1):
         """
         Initialize the visual tweet capture service.
         
@@ -67,6 +113,8 @@ class VisualTweetCaptureService:
             max_browser_retries: Number of browser setup attempts (default: 3)
             retry_delay: Initial delay between retries in seconds (default: 2.0)
             retry_backoff: Exponential backoff multiplier (default: 2.0)
+            disable_images: Skip image downloads for layout-only captures (default: False)
+            png_compress_level: zlib level 0-9 for cropped screenshots; 1 favours speed (default: 1)
         """
         self.s3_bucket = s3_bucket
         self.zoom_percent = zoom_percent
@@ -77,12 +125,18 @@ class VisualTweetCaptureService:
         self.retry_delay = retry_delay
         self.retry_backoff = retry_backoff
         
+        # Page load configuration
+        self.disable_images = disable_images
+        
         # Cropping parameters
         self.crop_enabled = crop_enabled
         self.crop_x1 = crop_x1
         self.crop_y1 = crop_y1
         self.crop_x2 = crop_x2
         self.crop_y2 = crop_y2
+        self.png_compress_level = png_compress_level
+        self._crop_box = None
+        self._crop_box_size = None
         
         # Validate crop parameters
         if self.crop_enabled:
@@ -97,6 +151,10 @@ class VisualTweetCaptureService:
         # Browser setup
         self.driver = None
         self.temp_dir = None
+        self._cdp_screenshots = True  # Cleared once Chrome rejects a CDP screenshot
+        
+        # Running error counts by category, kept across captures for rate-limit tuning
+        self.error_counts = {'transient': 0, 'permanent': 0, 'unknown': 0}
         
         logger.info(f"VisualTweetCaptureService initialized with bucket: {s3_bucket}, date folder: {self.date_folder}, zoom: {zoom_percent}%")
         logger.info(f"Retry configuration: max_retries={max_browser_retries}, delay={retry_delay}s, backoff={retry_backoff}x")
@@ -110,6 +168,20 @@ class VisualTweetCaptureService:
         if not (0 <= self.crop_y1 < self.crop_y2 <= 100):
             raise ValueError(f"Invalid crop Y coordinates: y1={self.crop_y1}, y2={self.crop_y2}. Must be 0 <= y1 < y2 <= 100")
     
+    def _get_crop_box(self, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """
+        Pixel crop box for a screenshot size, computed once per distinct size.
+        
+        Screenshots within a capture share the viewport size, so this is
+        normally computed once per capture.
+        """
+        if self._crop_box_size != size:
+            width, height = size
+            self._crop_box = (int(width * self.crop_x1 / 100), int(height * self.crop_y1 / 100),
+                              int(width * self.crop_x2 / 100), int(height * self.crop_y2 / 100))
+            self._crop_box_size = size
+        return self._crop_box
+    
     def crop_image(self, image_path: str, output_path: str = None) -> str:
         """
         Crop an image based on percentage coordinates.
@@ -126,28 +198,70 @@ class VisualTweetCaptureService:
         
         try:
             with Image.open(image_path) as img:
-                width, height = img.size
+                crop_box = self._get_crop_box(img.size)
                 
-                # Calculate pixel coordinates from percentages
-                left = int(width * self.crop_x1 / 100)
-                top = int(height * self.crop_y1 / 100)
-                right = int(width * self.crop_x2 / 100)
-                bottom = int(height * self.crop_y2 / 100)
+                # Full-image crop box - nothing to do
+                if crop_box == (0, 0) + img.size:
+                    return image_path
                 
                 # Crop the image
-                cropped_img = img.crop((left, top, right, bottom))
+                cropped_img = img.crop(crop_box)
                 
                 # Save the cropped image
                 crop_output_path = output_path or image_path
-                cropped_img.save(crop_output_path, 'PNG', optimize=True)
+                cropped_img.save(crop_output_path, 'PNG', compress_level=self.png_compress_level)
                 
-                logger.debug(f"Cropped image {image_path} to ({left},{top},{right},{bottom})")
+                logger.debug(f"Cropped image {image_path} to {crop_box}")
                 return crop_output_path
                 
         except Exception as e:
             logger.warning(f"Error cropping image {image_path}: {e}")
             return image_path  # Return original path if cropping fails
     
+    def _grab_png(self) -> bytes:
+        """
+        Grab the viewport as PNG bytes via Chrome DevTools, letting Chrome favour encode speed.
+        
+        Falls back to Selenium's screenshot for the rest of the session if CDP is unavailable.
+        """
+        if self._cdp_screenshots:
+            try:
+                data = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "png", "optimizeForSpeed": True
+                })["data"]
+                return base64.b64decode(data)
+            except Exception as e:
+                logger.debug(f"CDP screenshot unavailable, using WebDriver screenshots: {e}")
+                self._cdp_screenshots = False
+        return self.driver.get_screenshot_as_png()
+    
+    def _save_screenshot(self, screenshot_path: str) -> str:
+        """
+        Grab the viewport as PNG bytes and write it once, cropping in memory if enabled.
+        
+        Args:
+            screenshot_path: Path to write the screenshot to
+            
+        Returns:
+            Path to the saved screenshot
+        """
+        png = self._grab_png()
+        
+        if self.crop_enabled:
+            try:
+                img = Image.open(io.BytesIO(png))
+                crop_box = self._get_crop_box(img.size)
+                if crop_box != (0, 0) + img.size:
+                    img.crop(crop_box).save(screenshot_path, 'PNG', compress_level=self.png_compress_level)
+                    logger.debug(f"Cropped screenshot {screenshot_path} to {crop_box}")
+                    return screenshot_path
+            except Exception as e:
+                logger.warning(f"Error cropping screenshot {screenshot_path}: {e}")
+        
+        with open(screenshot_path, 'wb') as f:
+            f.write(png)
+        return screenshot_path
+    
     def capture_account_content(
         self, 
         account_name: str, 
@@ -183,8 +297,10 @@ class VisualTweetCaptureService:
                 }
             
             # Step 2: Separate threads and individual tweets
-            threads = [item for item in grouped_content if item.get('is_thread', False)]
-            individual_tweets = [item for item in grouped_content if not item.get('is_thread', False)]
+            threads = []
+            individual_tweets = []
+            for item in grouped_content:
+                (threads if item.get('is_thread', False) else individual_tweets).append(item)
             
             logger.info(f"Found {len(threads)} threads and {len(individual_tweets)} individual tweets")
             
@@ -456,9 +572,7 @@ class VisualTweetCaptureService:
                 logger.error(f"Failed to load tweet page for {tweet_id} after retries")
                 return None
             
-            # Wait for dynamic content
-            time.sleep(3.0)
-            
+            # Navigation has already waited for the first article to render
             # Capture screenshots with scrolling
             screenshots = self._capture_scrolling_screenshots(tweet_id)
             
@@ -494,31 +608,30 @@ class VisualTweetCaptureService:
         
         # Get initial page info (same as exploration)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        viewport_height = self.driver.execute_script("return window.innerHeight")
+        last_scroll_position, viewport_height, page_height = self.driver.execute_script(
+            "return [window.pageYOffset, window.innerHeight, document.body.scrollHeight]"
+        )
         
         # Take initial screenshot at top of page (same filename format as exploration)
         screenshot_path = os.path.join(self.temp_dir, f"{tweet_id}_{timestamp}_page_{screenshot_count:02d}.png")
-        self.driver.save_screenshot(screenshot_path)
-        
-        # Apply cropping if enabled
-        cropped_path = self.crop_image(screenshot_path)
-        screenshots.append(cropped_path)
+        screenshots.append(self._save_screenshot(screenshot_path))
         screenshot_count += 1
         
-        last_scroll_position = self.driver.execute_script("return window.pageYOffset")
-        
-        # Scroll and capture remaining screenshots (same as exploration)
-        while screenshot_count < max_screenshots:
-            # Scroll down
+        # Scroll and capture remaining screenshots (same as exploration), unless the page fits on one screen
+        while screenshot_count < max_screenshots and last_scroll_position + viewport_height < page_height:
+            # Scroll down, reading positions before and after in the same call
             scroll_amount = int(viewport_height * 0.8)
-            self.driver.execute_script(f"window.scrollBy(0, {scroll_amount})")
+            current_scroll_position, new_scroll_position, page_height, article_count = self.driver.execute_script(
+                _SCROLL_AND_MEASURE_JS, scroll_amount
+            )
             
-            # Wait for content to load
-            time.sleep(2.0)
+            # Already at the bottom before this scroll - waiting for content would only repeat the last frame
+            if current_scroll_position + viewport_height >= page_height:
+                logger.debug(f"Reached bottom of page for {tweet_id}")
+                break
             
-            # Get current scroll position
-            new_scroll_position = self.driver.execute_script("return window.pageYOffset")
-            current_scroll_position = new_scroll_position
+            # Wait for content to load
+            self._wait_for_new_content(page_height, article_count)
             
             # Check if we actually scrolled (same logic as exploration)
             if new_scroll_position <= last_scroll_position:
@@ -533,11 +646,7 @@ class VisualTweetCaptureService:
                 scroll_progress = new_scroll_position - current_scroll_position
                 if scroll_progress > (viewport_height * 0.3):  # Only if scrolled more than 30% of viewport
                     screenshot_path = os.path.join(self.temp_dir, f"{tweet_id}_{timestamp}_page_{screenshot_count:02d}.png")
-                    self.driver.save_screenshot(screenshot_path)
-                    
-                    # Apply cropping if enabled
-                    cropped_path = self.crop_image(screenshot_path)
-                    screenshots.append(cropped_path)
+                    screenshots.append(self._save_screenshot(screenshot_path))
                     screenshot_count += 1
                 else:
                     logger.debug(f"Skipped screenshot for {tweet_id} - minimal scroll progress ({scroll_progress}px)")
@@ -549,6 +658,34 @@ class VisualTweetCaptureService:
             logger.debug(f"Applied cropping to all screenshots: ({self.crop_x1}%, {self.crop_y1}%) → ({self.crop_x2}%, {self.crop_y2}%)")
         return screenshots
     
+    def _wait_for_new_content(self, previous_height: int, article_count: int, timeout: float = 3.0):
+        """
+        Wait for a scroll to load more content instead of sleeping a fixed time.
+        
+        Returns as soon as the page grows or more articles render; if neither
+        happens within timeout seconds, pauses briefly for trailing layout.
+        """
+        def content_loaded(driver):
+            height, articles = driver.execute_script(_CONTENT_STATE_JS)
+            return height > previous_height or articles > article_count
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(content_loaded)
+        except TimeoutException:
+            time.sleep(0.5)
+    
+    @classmethod
+    def _get_chromedriver_path(cls) -> str:
+        """
+        Resolve the chromedriver path, hitting webdriver-manager only on first use.
+        
+        A preinstalled driver named by CHROME_DRIVER (set in the Fargate image) skips
+        webdriver-manager entirely.
+        """
+        if cls._chromedriver_path_cache is None:
+            cls._chromedriver_path_cache = os.environ.get('CHROME_DRIVER') or ChromeDriverManager().install()
+        return cls._chromedriver_path_cache
+    
     def _cleanup_failed_driver(self):
         """Clean up any existing driver instance that may have failed during setup."""
         if self.driver:
@@ -560,6 +697,10 @@ class VisualTweetCaptureService:
             finally:
                 self.driver = None
     
+    def _jittered_delay(self, delay: float) -> float:
+        """Cap a retry delay and spread it randomly to avoid synchronized retries."""
+        return min(_MAX_RETRY_DELAY, delay) * random.uniform(0.5, 1.5)
+    
     def _categorize_browser_error(self, error: Exception) -> str:
         """
         Categorize browser setup errors to determine retry strategy.
@@ -572,27 +713,11 @@ class VisualTweetCaptureService:
         """
         error_str = str(error).lower()
         
-        # Transient errors that might resolve with retry
-        transient_indicators = [
-            'timeout', 'connection', 'network', 'temporary', 'busy',
-            'resource temporarily unavailable', 'address already in use',
-            'chromedriver', 'webdriver', 'session not created'
-        ]
-        
-        # Permanent errors that won't resolve with retry
-        permanent_indicators = [
-            'chrome not found', 'executable not found', 'no such file',
-            'permission denied', 'access denied', 'not installed',
-            'unsupported chrome version'
-        ]
+        if _TRANSIENT_RE.search(error_str):
+            return 'transient'
         
-        for indicator in transient_indicators:
-            if indicator in error_str:
-                return 'transient'
-        
-        for indicator in permanent_indicators:
-            if indicator in error_str:
-                return 'permanent'
+        if _PERMANENT_RE.search(error_str):
+            return 'permanent'
         
         return 'unknown'  # Default to retry for unknown errors
     
@@ -632,23 +757,33 @@ class VisualTweetCaptureService:
                 
             except TimeoutException as e:
                 logger.warning(f"Page load timeout on attempt {attempt}: {e}")
+                self.error_counts['transient'] += 1
                 if attempt < max_retries:
-                    delay = 2.0 * attempt  # Progressive delay
-                    logger.debug(f"Waiting {delay} seconds before retry...")
+                    delay = self._jittered_delay(2.0 * attempt)  # Progressive delay
+                    logger.debug(f"Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 
             except WebDriverException as e:
                 logger.warning(f"WebDriver error on attempt {attempt}: {e}")
+                self.error_counts[self._categorize_browser_error(e)] += 1
+                if _DRIVER_DEAD_RE.search(str(e).lower()):
+                    # Retrying get() on a dead driver cannot succeed - start a fresh browser
+                    logger.warning("Browser is no longer responsive - recreating it")
+                    if not self._setup_browser_with_fallback():
+                        break
+                    continue
                 if attempt < max_retries:
-                    delay = 3.0 * attempt  # Longer delay for WebDriver issues
-                    logger.debug(f"Waiting {delay} seconds before retry...")
+                    delay = self._jittered_delay(3.0 * attempt)  # Longer delay for WebDriver issues
+                    logger.debug(f"Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 
             except Exception as e:
                 logger.warning(f"Unexpected error on attempt {attempt}: {e}")
+                self.error_counts['unknown'] += 1
                 if attempt < max_retries:
-                    logger.debug("Waiting 5 seconds before retry...")
-                    time.sleep(5.0)
+                    delay = self._jittered_delay(5.0)
+                    logger.debug(f"Waiting {delay:.1f} seconds before retry...")
+                    time.sleep(delay)
         
         logger.error(f"Failed to load page after {max_retries} attempts: {url}")
         return False
@@ -661,6 +796,7 @@ class VisualTweetCaptureService:
             True if successful, False otherwise
         """
         logger.debug("Setting up browser with retry mechanism...")
+        unknown_failures = 0
         
         for attempt in range(1, self.max_browser_retries + 1):
             try:
@@ -684,9 +820,22 @@ class VisualTweetCaptureService:
                 # Set user agent to avoid detection
                 chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
                 
+                # Block video autoplay (a common source of long waits on Twitter) and optionally images
+                chrome_options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2 if self.disable_images else 1,
+                    "profile.default_content_setting_values.media_stream": 2,
+                    "profile.default_content_setting_values.autoplay": 2,
+                    "profile.default_content_setting_values.notifications": 2
+                })
+                chrome_options.add_argument("--autoplay-policy=document-user-activation-required")
+                if self.disable_images:
+                    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+                    # Layout-only captures wait for their own elements, not for every subresource
+                    chrome_options.page_load_strategy = 'eager'
+                
                 # Use webdriver-manager to automatically handle chromedriver
                 logger.debug("Installing/updating ChromeDriver...")
-                service = Service(ChromeDriverManager().install())
+                service = Service(self._get_chromedriver_path())
                 
                 logger.debug("Starting Chrome browser...")
                 self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -707,6 +856,7 @@ class VisualTweetCaptureService:
                 
             except Exception as e:
                 error_category = self._categorize_browser_error(e)
+                self.error_counts[error_category] += 1
                 logger.warning(f"Browser setup failed (attempt {attempt}): {e}")
                 logger.debug(f"Error category: {error_category}")
                 
@@ -718,9 +868,16 @@ class VisualTweetCaptureService:
                     logger.error("Permanent error detected - not retrying")
                     break
                 
+                # Unrecognized errors get fewer attempts than known-transient ones
+                if error_category == 'unknown':
+                    unknown_failures += 1
+                    if unknown_failures >= _MAX_UNKNOWN_ERROR_ATTEMPTS:
+                        logger.error("Repeated unrecognized errors - not retrying")
+                        break
+                
                 # If this isn't the last attempt, wait before retrying
                 if attempt < self.max_browser_retries:
-                    delay = self.retry_delay * (self.retry_backoff ** (attempt - 1))
+                    delay = self._jittered_delay(self.retry_delay * (self.retry_backoff ** (attempt - 1)))
                     logger.debug(f"Waiting {delay:.1f} seconds before retry...")
                     time.sleep(delay)
                 else:
@@ -759,7 +916,7 @@ class VisualTweetCaptureService:
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
             
-            service = Service(ChromeDriverManager().install())
+            service = Service(self._get_chromedriver_path())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             
             # Test basic functionality
@@ -0,0 +1,13 @@
+"""
+Pytest configuration for tests of the archived exploration scripts.
+"""
+
+import os
+import sys
+
+# The archived capturer is a standalone script, not a package; import it from its folder
+capture_dir = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, 'archive', 'exploration', 'visual_tweet_capture'
+))
+if capture_dir not in sys.path:
+    sys.path.insert(0, capture_dir)
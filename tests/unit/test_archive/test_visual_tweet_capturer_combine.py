@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Test combining captured screenshots
+
+Feeds synthetic PNG screenshots through VisualTweetCapturer's store and combine
+steps (no browser needed) and checks the combined image pixel for pixel.
+"""
+
+import io
+import os
+import struct
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import visual_tweet_capturer
+from visual_tweet_capturer import VisualTweetCapturer
+
+TWEET_ID = "1234567890123456789"
+
+
+def _png(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _filtered_png(pixels: np.ndarray, filter_type: int) -> bytes:
+    """Encode an RGB array as a PNG whose every scanline uses the given filter type."""
+    height, width, bpp = pixels.shape
+    rows = pixels.reshape(height, width * bpp).astype(np.int32)
+    scanlines = []
+    for y in range(height):
+        row, up = rows[y], rows[y - 1] if y else np.zeros_like(rows[y])
+        left = np.concatenate([np.zeros(bpp, np.int32), row[:-bpp]])
+        up_left = np.concatenate([np.zeros(bpp, np.int32), up[:-bpp]])
+        if filter_type == 2:
+            predictor = up
+        elif filter_type == 3:
+            predictor = (left + up) // 2
+        else:
+            p = left + up - up_left
+            pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+            predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+        scanlines.append(bytes([filter_type]) + ((row - predictor) % 256).astype(np.uint8).tobytes())
+
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(b''.join(scanlines))) + chunk(b'IEND', b''))
+
+
+def _screenshots(count: int = 3, width: int = 40, height: int = 30) -> list:
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+@pytest.fixture
+def make_capturer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def make(**kwargs):
+        capturer = VisualTweetCapturer(verbose=False, combine_enabled=True, **kwargs)
+        capturer.output_dir = str(tmp_path)
+        return capturer
+    return make
+
+
+def _use_backend(monkeypatch, backend):
+    """Make combine_screenshots pick the given optional backend ('pyvips', 'cv2', or None for Pillow)."""
+    if backend is not None and getattr(visual_tweet_capturer, backend) is None:
+        pytest.skip(f"{backend} not installed")
+    for module in ('pyvips', 'cv2'):
+        if module != backend:
+            monkeypatch.setattr(visual_tweet_capturer, module, None)
+
+
+def _store_all(capturer, frames):
+    for i, frame in enumerate(frames):
+        capturer._store_screenshot(
+            _png(frame), f"{capturer.output_dir}/{TWEET_ID}_20240101_000000_page_{i:02d}.{capturer.output_format}"
+        )
+
+
+def test_persisted_screenshots_are_combined_from_disk(make_capturer):
+    capturer = make_capturer(persist_individual=True)
+    frames = _screenshots()
+    _store_all(capturer, frames)
+
+    assert capturer._images == []
+    assert all(os.path.exists(path) for path in capturer.screenshots)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert np.array_equal(np.asarray(combined.convert('RGB')), np.vstack(frames))
+
+
+def test_unpersisted_screenshots_are_combined_in_memory(make_capturer):
+    capturer = make_capturer(persist_individual=False)
+    frames = _screenshots()
+    _store_all(capturer, frames)
+
+    assert len(capturer._images) == len(frames)
+    assert not any(os.path.exists(path) for path in capturer.screenshots)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert np.array_equal(np.asarray(combined.convert('RGB')), np.vstack(frames))
+
+
+@pytest.mark.parametrize('backend', ['pyvips', 'cv2', None])
+def test_persisted_grayscale_combine(make_capturer, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    capturer = make_capturer(persist_individual=True, combine_mode='L')
+    frames = _screenshots()
+    _store_all(capturer, frames)
+
+    combined_path = capturer.combine_screenshots()
+    expected = np.vstack([np.asarray(Image.fromarray(frame).convert('L')) for frame in frames])
+    with Image.open(combined_path) as combined:
+        assert combined.mode == 'L'
+        # OpenCV's grayscale PNG decode truncates luma where Pillow rounds
+        assert np.abs(np.asarray(combined, np.int16) - expected).max() <= 1
+
+
+@pytest.mark.parametrize('filter_type', [2, 3, 4])
+def test_same_width_pngs_are_stitched_without_decoding(make_capturer, monkeypatch, filter_type):
+    capturer = make_capturer(persist_individual=True)
+    frames = _screenshots()
+    # Each source's first scanline is filtered against the implicit zero row, so
+    # stitching has to rewrite Up (2), Average (3) and Paeth (4) filters
+    for i, frame in enumerate(frames):
+        capturer._store_screenshot(
+            _filtered_png(frame, filter_type), f"{capturer.output_dir}/{TWEET_ID}_20240101_000000_page_{i:02d}.png"
+        )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("screenshots should have been stitched")
+    monkeypatch.setattr(capturer, '_combine_from_disk', fail)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert np.array_equal(np.asarray(combined), np.vstack(frames))
+
+
+@pytest.mark.parametrize('backend', ['pyvips', 'cv2', None])
+def test_mixed_width_pngs_fall_back_to_decoding(make_capturer, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    capturer = make_capturer(persist_individual=True)
+    frames = _screenshots(2) + _screenshots(1, width=30)
+    _store_all(capturer, frames)
+
+    combined_path = capturer.combine_screenshots()
+    expected = np.full((90, 40, 3), 255, np.uint8)
+    for i, frame in enumerate(frames):
+        expected[i * 30:(i + 1) * 30, :frame.shape[1]] = frame
+    with Image.open(combined_path) as combined:
+        assert np.array_equal(np.asarray(combined.convert('RGB')), expected)
+
+
+@pytest.mark.parametrize('backend', ['pyvips', 'cv2'])
+def test_webp_screenshots_are_combined_with_backend(make_capturer, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    capturer = make_capturer(persist_individual=True, output_format='webp')
+    frames = _screenshots()
+    _store_all(capturer, frames)
+
+    def fail(*args, **kwargs):
+        raise AssertionError(f"screenshots should have been combined with {backend}")
+    monkeypatch.setattr(capturer, '_combine_from_disk', fail)
+
+    combined_path = capturer.combine_screenshots()
+    assert combined_path.endswith('.webp')
+    with Image.open(combined_path) as combined:
+        assert combined.format == 'WEBP'
+        assert np.array_equal(np.asarray(combined.convert('RGB')), np.vstack(frames))
+
+
+@pytest.mark.parametrize('backend', ['pyvips', 'cv2', None])
+def test_cropped_rgba_screenshots_are_combined_as_rgb(make_capturer, monkeypatch, backend):
+    _use_backend(monkeypatch, backend)
+    capturer = make_capturer(persist_individual=True, output_format='webp', crop_enabled=True, crop_x1=25, crop_x2=75)
+    frames = [np.dstack([frame, np.full(frame.shape[:2], 255, np.uint8)]) for frame in _screenshots()]
+    _store_all(capturer, frames)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert combined.mode == 'RGB'
+        assert np.array_equal(np.asarray(combined), np.vstack([frame[:, 10:30, :3] for frame in frames]))
+
+
+def test_palette_quantize_combines_text_pages_from_disk(make_capturer):
+    capturer = make_capturer(persist_individual=True, palette_quantize=True)
+    # Flat background with a few solid bands of text colour, as on a text-only tweet page
+    frames = []
+    for i in range(3):
+        frame = np.full((32, 40, 3), 255, np.uint8)
+        frame[8:16] = (15, 20, 25)
+        frame[16 + 8 * (i % 2):24 + 8 * (i % 2), :24] = (29, 155, 240)
+        frames.append(frame)
+    _store_all(capturer, frames)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert combined.mode == 'P'
+        assert np.array_equal(np.asarray(combined.convert('RGB')), np.vstack(frames))
+
+
+def test_palette_quantize_keeps_photo_pages_in_rgb(make_capturer):
+    capturer = make_capturer(persist_individual=True, palette_quantize=True)
+    frames = _screenshots()
+    _store_all(capturer, frames)
+
+    combined_path = capturer.combine_screenshots()
+    with Image.open(combined_path) as combined:
+        assert combined.mode == 'RGB'
+        assert np.array_equal(np.asarray(combined), np.vstack(frames))
+
+
+@pytest.mark.parametrize('outcome', ['optimized', 'timeout'])
+def test_post_optimize_swaps_in_only_a_finished_file(make_capturer, monkeypatch, tmp_path, outcome):
+    capturer = make_capturer(persist_individual=True, post_optimize_png=True)
+    png_path = tmp_path / "combined.png"
+    png_path.write_bytes(b"original")
+    monkeypatch.setattr(visual_tweet_capturer.shutil, 'which', lambda name: f"/usr/bin/{name}")
+
+    def run(args, timeout, **kwargs):
+        out_path = args[args.index("--out") + 1]
+        with open(out_path, 'wb') as out:
+            out.write(b"optimized" if outcome == 'optimized' else b"partial")
+        if outcome == 'timeout':
+            raise visual_tweet_capturer.subprocess.TimeoutExpired(args, timeout)
+    monkeypatch.setattr(visual_tweet_capturer.subprocess, 'run', run)
+
+    capturer._post_optimize(str(png_path))
+
+    assert png_path.read_bytes() == (b"optimized" if outcome == 'optimized' else b"original")
+    assert list(tmp_path.glob("combined.png.*")) == []
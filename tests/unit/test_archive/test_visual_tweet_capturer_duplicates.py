@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Test duplicate-frame handling in the scrolling capture loops
+
+Replays scripted scroll positions and viewport frames through
+VisualTweetCapturer's capture loops (no browser needed) and checks which
+frames end up stored.
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import visual_tweet_capturer
+from visual_tweet_capturer import VisualTweetCapturer
+
+TWEET_ID = "1234567890123456789"
+VIEWPORT_HEIGHT = 100
+PAGE_HEIGHT = 1000
+
+
+def _feed_pixels(seed: int, shortest_line: int = 352) -> np.ndarray:
+    """A wide feed page: static sidebars around a column of text lines."""
+    rng = np.random.default_rng(seed)
+    frame = np.full((540, 960, 3), 255, np.uint8)
+    frame[:, :280] = 20
+    frame[:, 680:] = 240
+    for y in range(30, 532, 24):
+        frame[y:y + 8, 320:320 + rng.integers(shortest_line, 358)] = 60
+    return frame
+
+
+def _encode(frame: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(frame).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _feed_frame(seed: int, shortest_line: int = 352) -> bytes:
+    return _encode(_feed_pixels(seed, shortest_line))
+
+
+def _frames(count: int) -> list:
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)).save(buffer, 'PNG')
+        frames.append(buffer.getvalue())
+    return frames
+
+
+class ScriptedDriver:
+    """Answers the capture loops' scroll scripts from a list of (offset before, offset after) pairs."""
+
+    def __init__(self, scrolls):
+        self.scrolls = iter(scrolls)
+
+    def execute_script(self, script, *args):
+        if script == visual_tweet_capturer._SCROLL_STATE_JS:
+            return [0, VIEWPORT_HEIGHT, PAGE_HEIGHT]
+        if script == visual_tweet_capturer._SCROLL_AND_MEASURE_JS:
+            before, after = next(self.scrolls)
+            return [before, after, PAGE_HEIGHT, 1]
+        if script == "return window.innerHeight":
+            return VIEWPORT_HEIGHT
+        if script == "return document.readyState":
+            return "complete"
+        return None
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def delete_all_cookies(self):
+        pass
+
+
+@pytest.fixture
+def scripted_capturer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(visual_tweet_capturer._SCROLL_ONLY_ENV, '1')
+
+    def make(scrolls, grabbed_frames, **kwargs):
+        capturer = VisualTweetCapturer(verbose=False, **kwargs)
+        capturer.output_dir = str(tmp_path)
+        capturer.driver = ScriptedDriver(scrolls)
+        capturer._owns_driver = False
+        grabs = iter(grabbed_frames)
+        capturer._grab_png = lambda: next(grabs)
+        capturer._wait_for_new_content = lambda previous_height, article_count: PAGE_HEIGHT
+        capturer._wait_scroll_settled = lambda: None
+        capturer._navigate_to_page_with_retry = lambda url: True
+        return capturer
+    return make
+
+
+@pytest.fixture
+def capture(scripted_capturer):
+    def capture(scrolls, grabbed_frames):
+        capturer = scripted_capturer(scrolls, grabbed_frames, persist_individual=False)
+        capturer.capture_scrolling_screenshots(f"https://x.com/user/status/{TWEET_ID}", TWEET_ID)
+        return [image.tobytes() for image in capturer._images]
+    return capture
+
+
+def _pixels(pngs):
+    return [Image.open(io.BytesIO(png)).tobytes() for png in pngs]
+
+
+def test_is_duplicate_leaves_last_hash_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    capturer = VisualTweetCapturer(verbose=False)
+    first, second = _frames(2)
+    capturer._last_dhash = visual_tweet_capturer._dhash(first)
+
+    assert capturer._is_duplicate(first)
+    assert not capturer._is_duplicate(second)
+    assert capturer._last_dhash == visual_tweet_capturer._dhash(first)
+
+
+def test_frame_seen_while_stalled_is_not_dropped_later(capture):
+    a, b, c, d = _frames(4)
+    stored = capture(
+        scrolls=[(0, 80), (80, 80), (80, 160), (160, 160)],
+        # top, after scroll, while stalled (new content rendered in place), after scroll, stalled again
+        grabbed_frames=[a, b, c, d, d],
+    )
+    assert stored == _pixels([a, b, c, d])
+
+
+def test_scrolled_frames_with_same_layout_are_kept(capture):
+    # The sidebars dominate a whole-viewport hash, so these frames hash alike
+    # even though the feed column shows different lines
+    frames = [_feed_frame(seed) for seed in range(4)]
+    stored = capture(
+        scrolls=[(0, 80), (80, 160), (160, 240), (240, 240)],
+        grabbed_frames=frames + [frames[-1]],
+    )
+    assert stored == _pixels(frames)
+
+
+def test_in_place_change_in_content_column_is_not_a_duplicate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    capturer = VisualTweetCapturer(verbose=False, crop_enabled=True, crop_x1=30, crop_x2=70)
+    # Same offset, but the lines in the kept column re-rendered (e.g. a reply expanded)
+    first, second = _feed_frame(0, shortest_line=200), _feed_frame(1, shortest_line=200)
+    capturer._last_dhash = capturer._frame_hash(first)
+
+    assert capturer._is_duplicate(first)
+    assert not capturer._is_duplicate(second)
+
+
+def test_frame_seen_while_stalled_is_stored(capture):
+    a, b, c = _frames(3)
+    stored = capture(
+        scrolls=[(0, 80), (80, 80), (80, 80)],
+        # top, after scroll, while stalled (new content rendered in place), stalled again
+        grabbed_frames=[a, b, c, c],
+    )
+    assert stored == _pixels([a, b, c])
+
+
+@pytest.mark.parametrize('output_format', ['png', 'webp'])
+def test_individual_tweet_pages_use_output_format(scripted_capturer, tmp_path, output_format):
+    a, b, c = _frames(3)
+    capturer = scripted_capturer(
+        scrolls=[(0, 80), (80, 80), (80, 80)], grabbed_frames=[a, b, c, c], output_format=output_format
+    )
+    result = capturer.capture_individual_tweet(f"https://x.com/user/status/{TWEET_ID}", TWEET_ID, str(tmp_path))
+
+    assert result['screenshots'] == [f"page_{i:02d}.{output_format}" for i in range(3)]
+    for name, pixels in zip(result['screenshots'], _pixels([a, b, c])):
+        with Image.open(tmp_path / name) as img:
+            assert img.format == output_format.upper()
+            assert img.convert('RGB').tobytes() == pixels
+
+
+def test_individual_tweet_pages_are_cropped(scripted_capturer, tmp_path):
+    a, b = _frames(2)
+    capturer = scripted_capturer(
+        scrolls=[(0, 80), (80, 80)], grabbed_frames=[a, b, b], crop_enabled=True, crop_x1=25, crop_x2=75
+    )
+    result = capturer.capture_individual_tweet(f"https://x.com/user/status/{TWEET_ID}", TWEET_ID, str(tmp_path))
+
+    assert result['screenshots'] == ["page_00.png", "page_01.png"]
+    for name, png in zip(result['screenshots'], [a, b]):
+        with Image.open(tmp_path / name) as img, Image.open(io.BytesIO(png)) as source:
+            assert img.size == (20, 30)
+            assert img.tobytes() == source.crop((10, 0, 30, 30)).tobytes()
+
+
+def test_small_in_place_change_is_kept(capture):
+    page = _feed_pixels(0, shortest_line=200)
+    edited = page.copy()
+    # One line re-rendered shorter, as when a count or a truncated reply updates in place;
+    # this flips only two bits of the frame hash
+    edited[102:110, 320:680] = 255
+    edited[102:110, 320:360] = 60
+    before, after = _encode(page), _encode(edited)
+    stored = capture(scrolls=[(0, 0), (0, 0)], grabbed_frames=[before, after, after])
+    assert stored == _pixels([before, after])
+
+
+class TallPageDriver(ScriptedDriver):
+    """Reports a document taller than a single CDP capture allows."""
+
+    def __init__(self, scrolls):
+        super().__init__(scrolls)
+        self.cdp_commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append(cmd)
+        if cmd == "Page.getLayoutMetrics":
+            return {'contentSize': {'width': 960, 'height': visual_tweet_capturer._MAX_FULL_PAGE_HEIGHT + 1}}
+        return {}
+
+
+def test_tall_page_falls_back_to_scrolling(scripted_capturer, monkeypatch):
+    monkeypatch.delenv(visual_tweet_capturer._SCROLL_ONLY_ENV)
+    a, b = _frames(2)
+    capturer = scripted_capturer(scrolls=[(0, 80), (80, 80)], grabbed_frames=[a, b, b], persist_individual=False)
+    capturer.driver = TallPageDriver(capturer.driver.scrolls)
+    capturer.capture_scrolling_screenshots(f"https://x.com/user/status/{TWEET_ID}", TWEET_ID)
+
+    assert "Page.captureScreenshot" not in capturer.driver.cdp_commands
+    assert [image.tobytes() for image in capturer._images] == _pixels([a, b])
+
+
+def test_worker_clones_do_not_share_mutable_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    capturer = VisualTweetCapturer(verbose=False)
+    capturer._api_cache[TWEET_ID] = {'id': TWEET_ID}
+    first, second = capturer._worker_clone(), capturer._worker_clone()
+
+    first._api_cache["1"] = {}
+    first._ensured_dirs.add("worker")
+    assert second._api_cache == capturer._api_cache == {TWEET_ID: {'id': TWEET_ID}}
+    assert "worker" not in second._ensured_dirs | capturer._ensured_dirs
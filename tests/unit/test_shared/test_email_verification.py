@@ -4,9 +4,12 @@ Test cases for email verification service.
 
 import pytest
 import boto3
+import time
 import uuid
 import json
 from datetime import datetime, timedelta
+from email import message_from_bytes
+from email.policy import default as default_policy
 from moto import mock_aws
 from unittest.mock import patch, MagicMock
 import sys
@@ -37,7 +40,21 @@ class TestEmailVerificationService:
                 {'AttributeName': 'subscriber_id', 'KeyType': 'HASH'}
             ],
             AttributeDefinitions=[
-                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'}
+                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'},
+                {'AttributeName': 'verification_token', 'AttributeType': 'S'},
+                {'AttributeName': 'email', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'VerificationTokenIndex',
+                    'KeySchema': [{'AttributeName': 'verification_token', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                },
+                {
+                    'IndexName': 'EmailIndex',
+                    'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             BillingMode='PAY_PER_REQUEST'
         )
@@ -81,6 +98,9 @@ class TestEmailVerificationService:
         assert subscriber['status'] == 'pending_verification'
         assert 'verification_token' in subscriber
         assert 'verification_expires_at' in subscriber
+        assert subscriber['verification_expires_at_epoch'] > time.time()
+        assert subscriber['subscribed_at'] == subscriber['created_at'] == subscriber['updated_at']
+        assert subscriber['created_at'].endswith('+00:00')
     
     def test_create_pending_subscriber_duplicate_active(self):
         """Test creating subscriber when email already exists and is active."""
@@ -123,6 +143,7 @@ class TestEmailVerificationService:
                 'status': 'pending_verification',
                 'verification_token': verification_token,
                 'verification_expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) + 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
@@ -160,6 +181,7 @@ class TestEmailVerificationService:
                 'status': 'pending_verification',
                 'verification_token': verification_token,
                 'verification_expires_at': (datetime.now() - timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) - 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
@@ -205,6 +227,7 @@ class TestEmailVerificationService:
                 'status': 'pending_verification',
                 'verification_token': old_token,
                 'verification_expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) + 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
@@ -250,8 +273,8 @@ class TestEmailVerificationService:
              patch.object(config, 'from_email', self.from_email), \
              patch.object(config, 'aws_region', 'us-east-1'):
             
-            # Mock the send_email method to capture the content
-            with patch.object(self.verification_service.ses, 'send_email') as mock_send:
+            # Mock the send_raw_email method to capture the content
+            with patch.object(self.verification_service.ses, 'send_raw_email') as mock_send:
                 mock_send.return_value = {'MessageId': 'test-message-id'}
                 
                 result = self.verification_service.send_verification_email(email, token)
@@ -263,13 +286,34 @@ class TestEmailVerificationService:
                 # Check email content
                 call_args = mock_send.call_args[1]
                 assert call_args['Source'] == self.from_email
-                assert call_args['Destination']['ToAddresses'] == [email]
+                assert call_args['Destinations'] == [email]
                 
-                message = call_args['Message']
-                assert 'GenAI Weekly Digest' in message['Subject']['Data']
-                assert token in message['Body']['Html']['Data']
-                assert token in message['Body']['Text']['Data']
-                assert 'verify' in message['Body']['Html']['Data'].lower()
+                message = message_from_bytes(call_args['RawMessage']['Data'], policy=default_policy)
+                assert message['To'] == email
+                assert 'GenAI Weekly Digest' in message['Subject']
+                html_body = message.get_body(preferencelist=('html',)).get_content()
+                text_body = message.get_body(preferencelist=('plain',)).get_content()
+                assert token in html_body
+                assert token in text_body
+                assert 'verify' in html_body.lower()
+    
+    def test_send_verification_email_uses_ses_template(self):
+        """Test that a configured SES template replaces the inline bodies."""
+        token = str(uuid.uuid4())
+        
+        with patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'verification_email_template', 'verify-template'):
+            
+            with patch.object(self.verification_service.ses, 'send_templated_email') as mock_send:
+                mock_send.return_value = {'MessageId': 'test-message-id'}
+                
+                result = self.verification_service.send_verification_email(self.test_email, token)
+        
+        assert result is True
+        call_args = mock_send.call_args[1]
+        assert call_args['Template'] == 'verify-template'
+        assert call_args['Destination']['ToAddresses'] == [self.test_email]
+        assert token in json.loads(call_args['TemplateData'])['verification_url']
 
 
 @mock_aws
@@ -289,7 +333,21 @@ class TestSubscriptionWithVerification:
                 {'AttributeName': 'subscriber_id', 'KeyType': 'HASH'}
             ],
             AttributeDefinitions=[
-                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'}
+                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'},
+                {'AttributeName': 'verification_token', 'AttributeType': 'S'},
+                {'AttributeName': 'email', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'VerificationTokenIndex',
+                    'KeySchema': [{'AttributeName': 'verification_token', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                },
+                {
+                    'IndexName': 'EmailIndex',
+                    'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             BillingMode='PAY_PER_REQUEST'
         )
@@ -310,12 +368,10 @@ class TestSubscriptionWithVerification:
              patch.object(config, 'from_email', self.from_email), \
              patch.object(config, 'aws_region', 'us-east-1'), \
              patch.object(config, 'validate_required_env_vars', return_value=True), \
-             patch('src.shared.email_verification_service.boto3.client') as mock_ses:
+             patch.object(config, 'ses_client') as mock_ses:
             
             # Mock SES client
-            mock_ses_instance = MagicMock()
-            mock_ses_instance.send_email.return_value = {'MessageId': 'test-id'}
-            mock_ses.return_value = mock_ses_instance
+            mock_ses.send_raw_email.return_value = {'MessageId': 'test-id'}
             
             response = lambda_handler(event, {})
         
@@ -339,6 +395,7 @@ class TestSubscriptionWithVerification:
                 'status': 'pending_verification',
                 'verification_token': str(uuid.uuid4()),
                 'verification_expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) + 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
@@ -354,12 +411,10 @@ class TestSubscriptionWithVerification:
              patch.object(config, 'from_email', self.from_email), \
              patch.object(config, 'aws_region', 'us-east-1'), \
              patch.object(config, 'validate_required_env_vars', return_value=True), \
-             patch('src.shared.email_verification_service.boto3.client') as mock_ses:
+             patch.object(config, 'ses_client') as mock_ses:
             
             # Mock SES client
-            mock_ses_instance = MagicMock()
-            mock_ses_instance.send_email.return_value = {'MessageId': 'test-id'}
-            mock_ses.return_value = mock_ses_instance
+            mock_ses.send_raw_email.return_value = {'MessageId': 'test-id'}
             
             response = lambda_handler(event, {})
         
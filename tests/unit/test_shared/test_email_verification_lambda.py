@@ -14,17 +14,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
 
 from lambda_function import lambda_handler
 
+HANDLER_MODULE = 'src.lambda_functions.email_verification.handler'
+
 
 class TestEmailVerificationLambda(unittest.TestCase):
     """Test the email verification Lambda function."""
     
     def setUp(self):
         """Set up test fixtures."""
-        self.config_patcher = patch('lambda_function.config')
+        self.config_patcher = patch(f'{HANDLER_MODULE}.config')
         self.mock_config = self.config_patcher.start()
         self.mock_config.validate_required_env_vars.return_value = True
         
-        self.service_patcher = patch('lambda_function.EmailVerificationService')
+        self.service_patcher = patch(f'{HANDLER_MODULE}.EmailVerificationService')
         self.MockEmailVerificationService = self.service_patcher.start()
         self.mock_service_instance = self.MockEmailVerificationService.return_value
     
@@ -156,6 +158,55 @@ class TestEmailVerificationLambda(unittest.TestCase):
         self.assertEqual(response['statusCode'], 400)
         self.assertIn('Verification token is required', response['body'])
     
+    def test_warmer_event_short_circuits(self):
+        """Test that scheduled warmer pings skip verification entirely."""
+        response = lambda_handler({'warmer': True}, None)
+        
+        self.assertEqual(response['statusCode'], 200)
+        self.MockEmailVerificationService.assert_not_called()
+    
+    def test_verify_email_redirects_to_static_page_when_configured(self):
+        """Test that outcomes redirect to the static pages when a base URL is set."""
+        self.mock_service_instance.verify_email.return_value = {
+            'success': True,
+            'message': 'Email verified successfully',
+            'email': 'test@example.com'
+        }
+        event = {
+            'httpMethod': 'GET',
+            'queryStringParameters': {'token': 'test-token-123'}
+        }
+        
+        with patch(f'{HANDLER_MODULE}._VERIFY_PAGE_BASE_URL', 'https://digest.example.com'):
+            response = lambda_handler(event, None)
+        
+        self.assertEqual(response['statusCode'], 302)
+        self.assertEqual(
+            response['headers']['Location'],
+            'https://digest.example.com/verify-success.html'
+        )
+        self.assertEqual(response['body'], '')
+    
+    def test_verify_error_redirect_carries_only_an_error_code(self):
+        """Test that failed verifications redirect with a fixed code, not the message text."""
+        self.mock_service_instance.verify_email.return_value = {
+            'success': False,
+            'message': 'Verification token has expired'
+        }
+        event = {
+            'httpMethod': 'GET',
+            'queryStringParameters': {'token': 'test-token-123'}
+        }
+        
+        with patch(f'{HANDLER_MODULE}._VERIFY_PAGE_BASE_URL', 'https://digest.example.com'):
+            response = lambda_handler(event, None)
+        
+        self.assertEqual(response['statusCode'], 302)
+        self.assertEqual(
+            response['headers']['Location'],
+            'https://digest.example.com/verify-error.html?code=expired'
+        )
+    
     def test_html_response_structure(self):
         """Test that HTML responses have correct structure."""
         self.mock_service_instance.verify_email.return_value = {
@@ -229,6 +280,13 @@ class TestEmailVerificationHTMLGeneration(unittest.TestCase):
         self.assertIn('GenAI Weekly Digest', html)
         self.assertIn('Verification Failed', html)
     
+    def test_error_page_escapes_message(self):
+        """Test that markup in the error message is escaped."""
+        html = self.get_error_html('<script>alert(1)</script>')
+        
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;', html)
+    
     def test_success_page_contains_required_elements(self):
         """Test that success page contains all required elements."""
         email = 'test@example.com'
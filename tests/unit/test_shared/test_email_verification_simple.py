@@ -4,6 +4,7 @@ Simple test cases for email verification service.
 
 import pytest
 import boto3
+import time
 import uuid
 from datetime import datetime, timedelta
 from moto import mock_aws
@@ -14,7 +15,7 @@ import os
 # Add the shared directory to the Python path for testing
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
 
-from src.shared.email_verification_service import EmailVerificationService
+from src.shared.email_verification_service import EmailVerificationService, encode_verification_token
 from src.shared.config import config
 
 @mock_aws
@@ -35,7 +36,21 @@ class TestEmailVerificationService:
                 {'AttributeName': 'subscriber_id', 'KeyType': 'HASH'}
             ],
             AttributeDefinitions=[
-                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'}
+                {'AttributeName': 'subscriber_id', 'AttributeType': 'S'},
+                {'AttributeName': 'verification_token', 'AttributeType': 'S'},
+                {'AttributeName': 'email', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'VerificationTokenIndex',
+                    'KeySchema': [{'AttributeName': 'verification_token', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                },
+                {
+                    'IndexName': 'EmailIndex',
+                    'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             BillingMode='PAY_PER_REQUEST'
         )
@@ -64,6 +79,20 @@ class TestEmailVerificationService:
         assert result['subscriber_id'] is not None
         assert result['verification_token'] is not None
     
+    def test_create_pending_subscriber_removes_row_when_email_fails(self):
+        """Test that a failed verification email leaves no pending row behind."""
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            with patch.object(verification_service, 'send_verification_email', return_value=False):
+                result = verification_service.create_pending_subscriber(self.test_email)
+        
+        assert result['success'] is False
+        assert self.table.scan()['Items'] == []
+    
     def test_verify_email_success(self):
         """Test successful email verification."""
         email = self.test_email
@@ -78,6 +107,7 @@ class TestEmailVerificationService:
                 'status': 'pending_verification',
                 'verification_token': verification_token,
                 'verification_expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) + 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
@@ -96,6 +126,198 @@ class TestEmailVerificationService:
         assert 'verified successfully' in result['message']
         assert result['email'] == email
     
+    def test_verify_email_ignores_iso_expiry(self):
+        """Test that expiry comes from the epoch attribute, not the ISO string."""
+        verification_token = str(uuid.uuid4())
+        
+        self.table.put_item(
+            Item={
+                'subscriber_id': str(uuid.uuid4()),
+                'email': self.test_email,
+                'status': 'pending_verification',
+                'verification_token': verification_token,
+                'verification_expires_at': 'not-a-timestamp',
+                'verification_expires_at_epoch': int(time.time()) + 3600
+            }
+        )
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            result = verification_service.verify_email(verification_token)
+        
+        assert result['success'] is True
+    
+    def test_verify_email_pre_migration_row(self):
+        """Test that a pending row with only the legacy ISO expiry still verifies."""
+        verification_token = str(uuid.uuid4())
+        
+        self.table.put_item(
+            Item={
+                'subscriber_id': str(uuid.uuid4()),
+                'email': self.test_email,
+                'status': 'pending_verification',
+                'verification_token': verification_token,
+                'verification_expires_at': (datetime.utcnow() + timedelta(hours=1)).isoformat()
+            }
+        )
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            result = verification_service.verify_email(verification_token)
+        
+        assert result['success'] is True
+        assert result['email'] == self.test_email
+    
+    def test_verify_email_pre_migration_row_expired(self):
+        """Test that a pre-migration row past its ISO expiry reports expiry."""
+        verification_token = str(uuid.uuid4())
+        
+        self.table.put_item(
+            Item={
+                'subscriber_id': str(uuid.uuid4()),
+                'email': self.test_email,
+                'status': 'pending_verification',
+                'verification_token': verification_token,
+                'verification_expires_at': (datetime.utcnow() - timedelta(hours=1)).isoformat()
+            }
+        )
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            result = verification_service.verify_email(verification_token)
+        
+        assert result['success'] is False
+        assert 'expired' in result['message']
+        assert 'Invalid' not in result['message']
+    
+    def test_verify_email_repeat_click_served_from_cache(self):
+        """Test that a second click on the same link still reports success."""
+        verification_token = str(uuid.uuid4())
+        
+        self.table.put_item(
+            Item={
+                'subscriber_id': str(uuid.uuid4()),
+                'email': self.test_email,
+                'status': 'pending_verification',
+                'verification_token': verification_token,
+                'verification_expires_at': (datetime.now() + timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) + 3600,
+                'created_at': datetime.now().isoformat(),
+                'updated_at': datetime.now().isoformat()
+            }
+        )
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            first = verification_service.verify_email(verification_token)
+            
+            with patch.object(verification_service.table, 'query') as mock_query:
+                second = verification_service.verify_email(verification_token)
+        
+        assert first['success'] is True
+        assert second == first
+        mock_query.assert_not_called()
+    
+    def test_verify_email_rejects_already_activated_subscriber(self):
+        """Test that a stale pending read cannot re-activate a subscriber."""
+        verification_token = str(uuid.uuid4())
+        pending = {
+            'subscriber_id': str(uuid.uuid4()),
+            'email': self.test_email,
+            'status': 'pending_verification',
+            'verification_token': verification_token,
+            'verification_expires_at_epoch': int(time.time()) + 3600
+        }
+        # A concurrent click already activated the row
+        self.table.put_item(Item={**pending, 'status': 'active'})
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'):
+            
+            verification_service = EmailVerificationService()
+            with patch.object(verification_service.table, 'query', return_value={'Items': [pending]}):
+                result = verification_service.verify_email(verification_token)
+        
+        assert result['success'] is False
+        assert 'verified_at' not in self.table.get_item(Key={'subscriber_id': pending['subscriber_id']})['Item']
+    
+    def test_signed_token_round_trip(self):
+        """Test that signed tokens verify without a token-index lookup."""
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'), \
+             patch.object(config, 'verification_signing_key', 'test-signing-key'):
+            
+            verification_service = EmailVerificationService()
+            created = verification_service.create_pending_subscriber(self.test_email)
+            token = created['verification_token']
+            
+            with patch.object(verification_service.table, 'query') as mock_query:
+                result = verification_service.verify_email(token)
+        
+        assert token.count('.') == 2
+        assert result['success'] is True
+        assert result['email'] == self.test_email
+        mock_query.assert_not_called()
+    
+    def test_unsigned_token_verifies_with_single_write(self):
+        """Test that new unsigned tokens skip the token-index query."""
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'from_email', self.from_email), \
+             patch.object(config, 'aws_region', 'us-east-1'), \
+             patch.object(config, 'verification_signing_key', ''):
+            
+            verification_service = EmailVerificationService()
+            created = verification_service.create_pending_subscriber(self.test_email)
+            token = created['verification_token']
+            
+            with patch.object(verification_service.table, 'query') as mock_query:
+                result = verification_service.verify_email(token)
+                forged = verification_service.verify_email(f"{created['subscriber_id']}.{uuid.uuid4().hex}")
+        
+        assert token.startswith(created['subscriber_id'] + '.')
+        assert result['success'] is True
+        assert result['email'] == self.test_email
+        assert forged['success'] is False
+        mock_query.assert_not_called()
+    
+    def test_tampered_signed_token_rejected_without_dynamodb(self):
+        """Test that a bad signature short-circuits before any DynamoDB call."""
+        token = encode_verification_token('sub-1', self.test_email, int(time.time()) + 3600, 'other-key')
+        
+        with patch.object(config, 'dynamodb', self.dynamodb), \
+             patch.object(config, 'subscribers_table', self.table_name), \
+             patch.object(config, 'verification_signing_key', 'test-signing-key'):
+            
+            verification_service = EmailVerificationService()
+            with patch.object(verification_service.table, 'query') as mock_query, \
+                 patch.object(verification_service.table, 'update_item') as mock_update:
+                result = verification_service.verify_email(token)
+        
+        assert result['success'] is False
+        mock_query.assert_not_called()
+        mock_update.assert_not_called()
+    
     def test_verify_email_expired_token(self):
         """Test verification with expired token."""
         email = self.test_email
@@ -110,6 +332,7 @@ class TestEmailVerificationService:
                 'status': 'pending_verification',
                 'verification_token': verification_token,
                 'verification_expires_at': (datetime.now() - timedelta(hours=1)).isoformat(),
+                'verification_expires_at_epoch': int(time.time()) - 3600,
                 'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
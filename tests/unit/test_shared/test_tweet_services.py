@@ -5,6 +5,7 @@ Tests the core business logic without external dependencies.
 
 import unittest
 from unittest.mock import Mock, patch, MagicMock
+import gzip
 import json
 from datetime import datetime, timedelta
 import sys
@@ -13,6 +14,7 @@ import os
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
+from src.shared import tweet_services
 from src.shared.tweet_services import TweetFetcher, TweetCategorizer, TweetSummarizer, S3DataManager
 
 class TestTweetFetcher(unittest.TestCase):
@@ -20,6 +22,7 @@ class TestTweetFetcher(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures."""
+        tweet_services._USER_ID_CACHE.clear()
         with patch('src.shared.tweet_services.config') as mock_config:
             mock_config.twitter_bearer_token = "test_token"
             self.fetcher = TweetFetcher()
@@ -87,6 +90,106 @@ class TestTweetFetcher(unittest.TestCase):
             tweets = fetcher.fetch_tweets(["testuser"])
         self.assertEqual(len(tweets), 0)
     
+    def test_extract_tweet_id_from_url(self):
+        """Test tweet ID extraction from URLs and bare IDs."""
+        self.assertEqual(self.fetcher._extract_tweet_id_from_url("https://x.com/user/status/123"), "123")
+        self.assertEqual(self.fetcher._extract_tweet_id_from_url("https://twitter.com/user/status/456?s=20"), "456")
+        self.assertEqual(self.fetcher._extract_tweet_id_from_url("1234567890123456789"), "1234567890123456789")
+        self.assertEqual(self.fetcher._extract_tweet_id_from_url("see 1234567890123456789"), "1234567890123456789")
+        self.assertIsNone(self.fetcher._extract_tweet_id_from_url("https://x.com/user"))
+    
+    def test_created_at_matches_isoformat(self):
+        """Test that the API's RFC 3339 string is stored in the same form as datetime.isoformat()."""
+        for raw in ('2024-05-01T12:00:00.000Z', '2024-05-01T12:00:00.123Z'):
+            tweet = tweet_services.tweepy.Tweet({'id': '1', 'text': 'hi', 'edit_history_tweet_ids': ['1'], 'created_at': raw})
+            self.assertEqual(tweet_services._created_at(tweet), tweet.created_at.isoformat())
+        self.assertEqual(tweet_services._created_at(tweet), '2024-05-01T12:00:00.123000+00:00')
+        
+        mock_tweet = Mock()
+        mock_tweet.created_at = datetime(2024, 5, 1, 12, 0)
+        self.assertEqual(tweet_services._created_at(mock_tweet), '2024-05-01T12:00:00')
+    
+    @patch('src.shared.tweet_services.tweepy.Client')
+    def test_fetch_thread_skips_search_for_unreplied_root(self, mock_client_class):
+        """Test that a root tweet with no replies is returned without a search call."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+        
+        mock_tweet = Mock()
+        mock_tweet.text = "Standalone tweet"
+        mock_tweet.author_id = "123456789"
+        mock_tweet.created_at = datetime.now()
+        mock_tweet.conversation_id = "1234567890123456789"
+        mock_tweet.public_metrics = {"like_count": 1, "retweet_count": 0, "reply_count": 0}
+        mock_response = Mock()
+        mock_response.data = mock_tweet
+        mock_response.includes = None
+        mock_client.get_tweet.return_value = mock_response
+        
+        with patch('src.shared.tweet_services.config') as mock_config:
+            mock_config.twitter_bearer_token = "test_token"
+            fetcher = TweetFetcher()
+            result = fetcher.fetch_thread_by_tweet_id("1234567890123456789")
+        
+        self.assertEqual(result['text'], "Standalone tweet")
+        mock_client.search_recent_tweets.assert_not_called()
+    
+    @patch('src.shared.tweet_services.tweepy.Client')
+    def test_fetch_tweets_no_usernames(self, mock_client_class):
+        """Test that an empty account list makes no API calls."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+        
+        with patch('src.shared.tweet_services.config') as mock_config:
+            mock_config.twitter_bearer_token = "test_token"
+            fetcher = TweetFetcher()
+            tweets = fetcher.fetch_tweets([])
+        self.assertEqual(tweets, [])
+        mock_client.get_user.assert_not_called()
+        mock_client.get_users.assert_not_called()
+    
+    @patch('src.shared.tweet_services.tweepy.Client')
+    def test_fetch_tweets_batches_user_lookup(self, mock_client_class):
+        """Test that accounts are resolved with one get_users call."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+        
+        mock_user1 = Mock()
+        mock_user1.username = "User1"
+        mock_user1.id = "111111111"
+        mock_users_response = Mock()
+        mock_users_response.data = [mock_user1]
+        mock_client.get_users.return_value = mock_users_response
+        
+        mock_tweet = Mock()
+        mock_tweet.id = "tweet1"
+        mock_tweet.text = "Tweet from user1"
+        mock_tweet.created_at = datetime.now()
+        mock_tweet.public_metrics = {"like_count": 1, "retweet_count": 0, "reply_count": 0, "quote_count": 0, "bookmark_count": 0, "impression_count": 10}
+        mock_tweet.conversation_id = "conv1"
+        mock_tweets_response = Mock()
+        mock_tweets_response.data = [mock_tweet]
+        mock_client.get_users_tweets.return_value = mock_tweets_response
+        
+        with patch('src.shared.tweet_services.config') as mock_config:
+            mock_config.twitter_bearer_token = "test_token"
+            fetcher = TweetFetcher()
+            tweets = fetcher.fetch_tweets(["user1", "missinguser"])
+        
+        self.assertEqual(len(tweets), 1)
+        mock_client.get_users.assert_called_once_with(usernames=["user1", "missinguser"])
+        mock_client.get_user.assert_not_called()
+        mock_client.get_users_tweets.assert_called_once()
+        self.assertEqual(mock_client.get_users_tweets.call_args.kwargs['id'], "111111111")
+        
+        # A warm re-run resolves the known account from the cache
+        mock_client.get_users.reset_mock()
+        with patch('src.shared.tweet_services.config') as mock_config:
+            mock_config.twitter_bearer_token = "test_token"
+            fetcher = TweetFetcher()
+            fetcher.fetch_tweets(["user1"])
+        mock_client.get_users.assert_not_called()
+    
     @patch('src.shared.tweet_services.tweepy.Client')
     def test_fetch_tweets_thread_detection(self, mock_client_class):
         """Test thread detection and reconstruction."""
@@ -277,6 +380,25 @@ class TestTweetCategorizer(unittest.TestCase):
         self.assertEqual(categorized[0]['category'], 'New AI model releases')
         self.assertEqual(categorized[0]['confidence'], 0.95)
     
+    @patch('src.shared.tweet_services.genai.GenerativeModel')
+    @patch('src.shared.tweet_services.genai.configure')
+    def test_categorize_tweets_batched(self, mock_configure, mock_model_class):
+        """Test that a JSON batch reply categorizes all tweets in one request."""
+        mock_model = Mock()
+        mock_response = Mock()
+        mock_response.text = '```json\n[{"id": 2, "category": "Breakthrough research findings", "confidence": 0.8}, {"id": 1, "category": "New AI model releases", "confidence": 0.95}]\n```'
+        mock_model.generate_content.return_value = mock_response
+        mock_model_class.return_value = mock_model
+        tweets = [{'id': 'tweet1', 'text': 'OpenAI just released GPT-5!'}, {'id': 'tweet2', 'text': 'New scaling law paper'}]
+        with patch('src.shared.tweet_services.config') as mock_config:
+            mock_config.gemini_api_key = "test_key"
+            categorizer = TweetCategorizer()
+            categorized = categorizer.categorize_tweets(tweets)
+        self.assertEqual(mock_model.generate_content.call_count, 1)
+        self.assertEqual(categorized[0]['category'], 'New AI model releases')
+        self.assertEqual(categorized[0]['confidence'], 0.95)
+        self.assertEqual(categorized[1]['category'], 'Breakthrough research findings')
+    
     @patch('src.shared.tweet_services.genai.GenerativeModel')
     @patch('src.shared.tweet_services.genai.configure')
     def test_categorize_tweets_invalid_response(self, mock_configure, mock_model_class):
@@ -401,17 +523,34 @@ class TestS3DataManager(unittest.TestCase):
         self.mock_s3_client_for_manager.put_object.assert_any_call(
             Bucket="test-bucket",
             Key=result_key.replace("digests", "raw").replace("_digest.json", "_tweets.json"), # Approximate raw key
-            Body=json.dumps(tweets, indent=2, default=str),
-            ContentType='application/json'
+            Body=gzip.compress(json.dumps(tweets, separators=(',', ':'), default=str).encode('utf-8'), mtime=0),
+            ContentType='application/json',
+            ContentEncoding='gzip'
         )
         self.mock_s3_client_for_manager.put_object.assert_any_call(
             Bucket="test-bucket",
             Key=result_key,
-            Body=json.dumps(digest_data, indent=2, default=str),
-            ContentType='application/json'
+            Body=gzip.compress(json.dumps(digest_data, separators=(',', ':'), default=str).encode('utf-8'), mtime=0),
+            ContentType='application/json',
+            ContentEncoding='gzip'
         )
         self.assertEqual(self.mock_s3_client_for_manager.put_object.call_count, 2)
     
+    def test_save_tweets_serializes_datetimes(self):
+        """Test that datetimes serialize identically with and without orjson."""
+        digest_data = {'generated_at': datetime(2024, 5, 1, 12, 0, 30, 5), 'total_tweets': 0}
+        
+        bodies = []
+        for encoder in (tweet_services.orjson, None):
+            with patch.object(tweet_services, 'orjson', encoder):
+                self.manager.save_tweets([], digest_data)
+            body = self.mock_s3_client_for_manager.put_object.call_args.kwargs['Body']
+            bodies.append(json.loads(gzip.decompress(body)))
+        
+        for saved in bodies:
+            self.assertEqual(saved['generated_at'], '2024-05-01T12:00:30.000005')
+            self.assertEqual(saved['total_tweets'], 0)
+    
     def test_save_tweets_s3_error(self):
         """Test handling of S3 errors."""
         self.mock_s3_client_for_manager.put_object.side_effect = Exception("S3 Error")
@@ -5,10 +5,14 @@ Test cases for visual tweet capture service with retry mechanism.
 import unittest
 from unittest.mock import Mock, patch, MagicMock, call
 import tempfile
+import base64
+import io
 import os
+import shutil
 import time
 import json
 from datetime import datetime
+from PIL import Image
 
 # Add path for imports
 import sys
@@ -34,6 +38,9 @@ class TestVisualTweetCaptureService(unittest.TestCase):
             retry_backoff=2.0
         )
         
+        # Each test resolves chromedriver through its own mocked ChromeDriverManager
+        VisualTweetCaptureService._chromedriver_path_cache = None
+        
         # Mock external dependencies
         self.tweet_fetcher_patcher = patch('src.shared.visual_tweet_capture_service.TweetFetcher')
         self.mock_tweet_fetcher_class = self.tweet_fetcher_patcher.start()
@@ -132,6 +139,37 @@ class TestRetryMechanism(TestVisualTweetCaptureService):
         self.assertEqual(mock_chrome.call_count, 3)  # max_browser_retries attempts
         self.assertEqual(mock_sleep.call_count, 2)  # Two delays between attempts
     
+    @patch('src.shared.visual_tweet_capture_service.webdriver.Chrome')
+    @patch('src.shared.visual_tweet_capture_service.ChromeDriverManager')
+    @patch('src.shared.visual_tweet_capture_service.Service')
+    def test_browser_setup_disables_images_when_requested(self, mock_service, mock_driver_manager, mock_chrome):
+        """Test that image loading is blocked via Chrome prefs when disable_images is set."""
+        mock_driver_manager.return_value.install.return_value = "/path/to/chromedriver"
+        self.service.disable_images = True
+        
+        self.assertTrue(self.service._setup_browser())
+        
+        options = mock_chrome.call_args.kwargs['options']
+        prefs = options.experimental_options['prefs']
+        self.assertEqual(prefs['profile.managed_default_content_settings.images'], 2)
+        self.assertEqual(prefs['profile.default_content_setting_values.autoplay'], 2)
+        self.assertEqual(prefs['profile.default_content_setting_values.notifications'], 2)
+        self.assertIn("--blink-settings=imagesEnabled=false", options.arguments)
+        self.assertEqual(options.page_load_strategy, 'eager')
+    
+    @patch('src.shared.visual_tweet_capture_service.webdriver.Chrome')
+    @patch('src.shared.visual_tweet_capture_service.ChromeDriverManager')
+    @patch('src.shared.visual_tweet_capture_service.Service')
+    def test_browser_setup_loads_images_by_default(self, mock_service, mock_driver_manager, mock_chrome):
+        """Test visual captures keep images and wait for full page loads."""
+        mock_driver_manager.return_value.install.return_value = "/path/to/chromedriver"
+        
+        self.assertTrue(self.service._setup_browser())
+        
+        options = mock_chrome.call_args.kwargs['options']
+        self.assertEqual(options.experimental_options['prefs']['profile.managed_default_content_settings.images'], 1)
+        self.assertEqual(options.page_load_strategy, 'normal')
+    
     def test_error_categorization_transient(self):
         """Test categorization of transient errors."""
         transient_errors = [
@@ -258,10 +296,15 @@ class TestPageNavigationRetry(TestVisualTweetCaptureService):
         self.sleep_patcher = patch('src.shared.visual_tweet_capture_service.time.sleep')
         self.mock_sleep = self.sleep_patcher.start()
         
+        # Pin retry jitter so delays are deterministic
+        self.jitter_patcher = patch('src.shared.visual_tweet_capture_service.random.uniform', return_value=1.0)
+        self.jitter_patcher.start()
+        
     def tearDown(self):
         super().tearDown()
         self.wait_patcher.stop()
         self.sleep_patcher.stop()
+        self.jitter_patcher.stop()
     
     def test_page_navigation_success_first_attempt(self):
         """Test successful page navigation on first attempt."""
@@ -323,6 +366,33 @@ class TestPageNavigationRetry(TestVisualTweetCaptureService):
         self.assertEqual(self.mock_driver.get.call_count, max_retries)
         self.assertEqual(self.mock_wait.until.call_count, max_retries)
         self.assertEqual(self.mock_sleep.call_count, max_retries - 1)
+        self.assertEqual(self.service.error_counts['transient'], max_retries)
+    
+    @patch.object(VisualTweetCaptureService, '_setup_browser_with_fallback')
+    def test_page_navigation_recreates_crashed_browser(self, mock_setup_browser):
+        """Test a crashed browser is recreated instead of retried with a backoff."""
+        url = "https://twitter.com/test/status/123"
+        mock_setup_browser.return_value = True
+        
+        self.mock_wait.until.side_effect = [WebDriverException("tab crashed"), None]
+        
+        result = self.service._navigate_to_page_with_retry(url, max_retries=3)
+        
+        self.assertTrue(result)
+        mock_setup_browser.assert_called_once()
+        # Only the content loading wait - no backoff delay before recreation
+        self.mock_sleep.assert_called_once_with(4)
+    
+    @patch.object(VisualTweetCaptureService, '_setup_browser_with_fallback')
+    def test_page_navigation_gives_up_when_recreation_fails(self, mock_setup_browser):
+        """Test navigation fails when a crashed browser cannot be recreated."""
+        mock_setup_browser.return_value = False
+        self.mock_wait.until.side_effect = WebDriverException("chrome not reachable: disconnected")
+        
+        result = self.service._navigate_to_page_with_retry("https://twitter.com/test/status/123", max_retries=3)
+        
+        self.assertFalse(result)
+        mock_setup_browser.assert_called_once()
 
 
 class TestTweetScreenshotCapture(TestVisualTweetCaptureService):
@@ -466,8 +536,9 @@ class TestRetryConfiguration(TestVisualTweetCaptureService):
         self.assertEqual(service.retry_delay, 2.0)
         self.assertEqual(service.retry_backoff, 2.0)
     
+    @patch('src.shared.visual_tweet_capture_service.random.uniform', return_value=1.0)
     @patch('src.shared.visual_tweet_capture_service.time.sleep')
-    def test_exponential_backoff_calculation(self, mock_sleep):
+    def test_exponential_backoff_calculation(self, mock_sleep, mock_uniform):
         """Test that exponential backoff is calculated correctly."""
         # Create service with specific backoff settings
         service = VisualTweetCaptureService(
@@ -490,6 +561,230 @@ class TestRetryConfiguration(TestVisualTweetCaptureService):
         ]
         
         mock_sleep.assert_has_calls(expected_calls)
+        self.assertEqual(service.error_counts['transient'], 3)
+    
+    def test_jittered_delay_is_capped_and_bounded(self):
+        """Test retry delays are capped and spread within +/-50%."""
+        for _ in range(50):
+            delay = self.service._jittered_delay(4.0)
+            self.assertGreaterEqual(delay, 2.0)
+            self.assertLessEqual(delay, 6.0)
+        
+        self.assertLessEqual(self.service._jittered_delay(1000.0), vtcs_module._MAX_RETRY_DELAY * 1.5)
+    
+    @patch('src.shared.visual_tweet_capture_service.time.sleep')
+    def test_unknown_errors_get_fewer_attempts(self, mock_sleep):
+        """Test unrecognized setup errors stop retrying before max_browser_retries."""
+        service = VisualTweetCaptureService(s3_bucket="test-bucket", max_browser_retries=5)
+        
+        with patch('src.shared.visual_tweet_capture_service.webdriver.Chrome') as mock_chrome:
+            mock_chrome.side_effect = Exception("something odd happened")
+            with patch('src.shared.visual_tweet_capture_service.ChromeDriverManager'):
+                with patch('src.shared.visual_tweet_capture_service.Service'):
+                    result = service._setup_browser()
+        
+        self.assertFalse(result)
+        self.assertEqual(mock_chrome.call_count, vtcs_module._MAX_UNKNOWN_ERROR_ATTEMPTS)
+        self.assertEqual(service.error_counts['unknown'], vtcs_module._MAX_UNKNOWN_ERROR_ATTEMPTS)
+
+
+
+class TestScrollingScreenshots(TestVisualTweetCaptureService):
+    """Test the scrolling screenshot loop."""
+    
+    def setUp(self):
+        # Real directory created before the base class patches tempfile/shutil
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        super().setUp()
+    
+    @patch('src.shared.visual_tweet_capture_service.time.sleep')
+    def test_scroll_and_measure_in_one_call(self, mock_sleep):
+        """Test each scroll step is one round trip and progress is measured across the scroll."""
+        self.service.driver = Mock()
+        self.service.driver.get_screenshot_as_png.return_value = b"png"
+        self.service.temp_dir = self.output_dir
+        self.service.driver.execute_script.side_effect = [
+            [0, 1000, 5000],     # initial offset, viewport and page height
+            [0, 800, 5000, 3],   # scrolled 800px - screenshot
+            [800, 800, 5000, 3], # no progress
+            [800, 800, 5000, 3], # no progress - stop
+        ]
+        
+        with patch.object(self.service, '_wait_for_new_content') as mock_wait:
+            screenshots = self.service._capture_scrolling_screenshots("123")
+        
+        self.assertEqual(len(screenshots), 2)
+        self.assertEqual(self.service.driver.execute_script.call_count, 4)
+        self.service.driver.execute_script.assert_called_with(vtcs_module._SCROLL_AND_MEASURE_JS, 800)
+        self.service.driver.save_screenshot.assert_not_called()
+        mock_wait.assert_called_with(5000, 3)
+        mock_sleep.assert_not_called()
+    
+    def test_single_screen_page_skips_scrolling(self):
+        """Test a page that fits in the viewport takes one screenshot and never scrolls."""
+        self.service.driver = Mock()
+        self.service.driver.get_screenshot_as_png.return_value = b"png"
+        self.service.temp_dir = self.output_dir
+        self.service.driver.execute_script.return_value = [0, 1000, 900]
+        
+        with patch.object(self.service, '_wait_for_new_content') as mock_wait:
+            screenshots = self.service._capture_scrolling_screenshots("123")
+        
+        self.assertEqual(len(screenshots), 1)
+        self.assertEqual(self.service.driver.execute_script.call_count, 1)
+        mock_wait.assert_not_called()
+    
+    def test_bottom_reached_without_waiting(self):
+        """Test a scroll that starts at the bottom stops before waiting for content."""
+        self.service.driver = Mock()
+        self.service.driver.get_screenshot_as_png.return_value = b"png"
+        self.service.temp_dir = self.output_dir
+        self.service.driver.execute_script.side_effect = [
+            [0, 1000, 1800],        # initial offset, viewport and page height
+            [0, 800, 1800, 2],      # scrolled 800px to the bottom - screenshot
+            [800, 800, 1800, 2],    # already at the bottom - stop
+        ]
+        
+        with patch.object(self.service, '_wait_for_new_content') as mock_wait:
+            screenshots = self.service._capture_scrolling_screenshots("123")
+        
+        self.assertEqual(len(screenshots), 2)
+        mock_wait.assert_called_once_with(1800, 2)
+    
+    def test_wait_returns_once_page_grows(self):
+        """Test the content wait stops polling as soon as the page grows."""
+        self.service.driver = Mock()
+        self.service.driver.execute_script.side_effect = [[5000, 3], [6200, 3]]
+        
+        with patch('src.shared.visual_tweet_capture_service.time.sleep') as mock_sleep:
+            self.service._wait_for_new_content(5000, 3)
+        
+        self.assertEqual(self.service.driver.execute_script.call_count, 2)
+        self.assertNotIn(call(0.5), mock_sleep.call_args_list)
+    
+    @patch('src.shared.visual_tweet_capture_service.time.sleep')
+    def test_wait_falls_back_to_short_sleep(self, mock_sleep):
+        """Test a scroll that loads nothing costs only a short pause after the timeout."""
+        self.service.driver = Mock()
+        self.service.driver.execute_script.return_value = [5000, 3]
+        
+        self.service._wait_for_new_content(5000, 3, timeout=0)
+        
+        mock_sleep.assert_called_with(0.5)
+
+
+class TestSaveScreenshot(TestVisualTweetCaptureService):
+    """Test screenshots are written once from in-memory PNG bytes."""
+    
+    def setUp(self):
+        # Real directory created before the base class patches tempfile/shutil
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        super().setUp()
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 100), "white").save(buffer, 'PNG')
+        self.png = buffer.getvalue()
+    
+    def test_uncropped_bytes_written_verbatim(self):
+        """Test screenshots without cropping are written without decoding."""
+        self.service.driver = Mock()
+        self.service.driver.get_screenshot_as_png.return_value = self.png
+        path = os.path.join(self.output_dir, "page_00.png")
+        
+        self.assertEqual(self.service._save_screenshot(path), path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.png)
+    
+    def test_cropped_in_memory(self):
+        """Test cropping is applied before the single write."""
+        service = VisualTweetCaptureService(s3_bucket="test-bucket", crop_enabled=True,
+                                            crop_x1=10, crop_y1=20, crop_x2=60, crop_y2=80)
+        service.driver = Mock()
+        service.driver.get_screenshot_as_png.return_value = self.png
+        path = os.path.join(self.output_dir, "page_00.png")
+        
+        service._save_screenshot(path)
+        
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (100, 60))
+    
+    def test_cdp_screenshot_preferred(self):
+        """Test the CDP screenshot is used when Chrome supports it."""
+        self.service.driver = Mock()
+        self.service.driver.execute_cdp_cmd.return_value = {'data': base64.b64encode(self.png).decode()}
+        
+        self.assertEqual(self.service._grab_png(), self.png)
+        self.service.driver.get_screenshot_as_png.assert_not_called()
+    
+    def test_cdp_failure_falls_back_for_session(self):
+        """Test a failed CDP screenshot switches to WebDriver screenshots without retrying CDP."""
+        self.service.driver = Mock()
+        self.service.driver.execute_cdp_cmd.side_effect = WebDriverException("unknown command")
+        self.service.driver.get_screenshot_as_png.return_value = self.png
+        
+        self.assertEqual(self.service._grab_png(), self.png)
+        self.assertEqual(self.service._grab_png(), self.png)
+        self.service.driver.execute_cdp_cmd.assert_called_once()
+
+
+class TestCropImage(TestVisualTweetCaptureService):
+    """Test screenshot cropping."""
+    
+    def setUp(self):
+        super().setUp()
+        fd, self.image_path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        Image.new("RGB", (200, 100), "white").save(self.image_path)
+    
+    def tearDown(self):
+        super().tearDown()
+        os.remove(self.image_path)
+    
+    def test_crop_box_computed_once_per_size(self):
+        """Test the pixel crop box is cached and applied."""
+        service = VisualTweetCaptureService(s3_bucket="test-bucket", crop_enabled=True,
+                                            crop_x1=10, crop_y1=20, crop_x2=60, crop_y2=80)
+        
+        service.crop_image(self.image_path, self.image_path + ".1.png")
+        self.assertEqual(service._crop_box, (20, 20, 120, 80))
+        
+        with patch.object(service, '_crop_box', (0, 0, 50, 50)):
+            # Same screenshot size - cached box is reused without recomputation
+            result = service.crop_image(self.image_path, self.image_path + ".2.png")
+        
+        with Image.open(result) as img:
+            self.assertEqual(img.size, (50, 50))
+        os.remove(self.image_path + ".1.png")
+        os.remove(self.image_path + ".2.png")
+    
+    def test_full_image_crop_is_noop(self):
+        """Test a 0-100% crop returns the original image untouched."""
+        service = VisualTweetCaptureService(s3_bucket="test-bucket", crop_enabled=True)
+        
+        self.assertEqual(service.crop_image(self.image_path, self.image_path + ".out.png"), self.image_path)
+        self.assertFalse(os.path.exists(self.image_path + ".out.png"))
+
+
+class TestChromedriverPathCache(TestVisualTweetCaptureService):
+    """Test chromedriver path resolution is shared across instances."""
+    
+    @patch('src.shared.visual_tweet_capture_service.ChromeDriverManager')
+    def test_chromedriver_path_resolved_once(self, mock_driver_manager):
+        """Test webdriver-manager is only consulted on first use."""
+        mock_driver_manager.return_value.install.return_value = "/path/to/chromedriver"
+        other_service = VisualTweetCaptureService(s3_bucket="other-bucket")
+        
+        self.assertEqual(self.service._get_chromedriver_path(), "/path/to/chromedriver")
+        self.assertEqual(other_service._get_chromedriver_path(), "/path/to/chromedriver")
+        mock_driver_manager.return_value.install.assert_called_once()
+    
+    @patch('src.shared.visual_tweet_capture_service.ChromeDriverManager')
+    def test_preinstalled_chromedriver_skips_manager(self, mock_driver_manager):
+        """Test CHROME_DRIVER short-circuits webdriver-manager."""
+        with patch.dict(os.environ, {'CHROME_DRIVER': '/usr/local/bin/chromedriver'}):
+            self.assertEqual(self.service._get_chromedriver_path(), '/usr/local/bin/chromedriver')
+        mock_driver_manager.assert_not_called()
 
 
 if __name__ == '__main__':